@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional: responses are then encoded through their pydantic models.
+    orjson = None
+
+GZIP_MIN_BYTES = 512
+
+# orjson writes floats >= 1e16 as `1e16` where pydantic writes `1e+16`: such bodies go through pydantic.
+# orjson never writes `e+`, so any digit-e-digit is a positive exponent; the first pattern is a
+# cheap scan, the second the actual check.
+_EXPONENT_HINT = re.compile(rb"e[0-9]")
+_UNSIGNED_EXPONENT = re.compile(rb"[0-9]e[0-9]")
+
+
+@dataclass(frozen=True)
+class EncodedJson:
+    """A response body encoded once, with its gzip variant and strong ETags."""
+
+    body: bytes
+    etag: str
+    gzip_body: Optional[bytes] = None
+    gzip_etag: Optional[str] = None
+
+
+def encode_json(content: Any, response_type: Any = None) -> EncodedJson:
+    """Encode `content` the way FastAPI would for `response_model=response_type`."""
+    if response_type is None:
+        body = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    else:
+        adapter = _type_adapter(response_type)
+        body = adapter.dump_json(adapter.validate_python(content))
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    if len(body) < GZIP_MIN_BYTES:
+        return EncodedJson(body=body, etag=f'"{digest}"')
+    # mtime=0 keeps the compressed bytes (and so their ETag) identical across workers.
+    return EncodedJson(
+        body=body,
+        etag=f'"{digest}"',
+        gzip_body=gzip.compress(body, compresslevel=6, mtime=0),
+        gzip_etag=f'"{digest}-gzip"',
+    )
+
+
+def encode_model_json(content: Any, response_type: Any) -> bytes:
+    """The JSON of `response_type` validated from `content`, as FastAPI sends it for `response_model=response_type`.
+
+    `content` must already hold what the model would: plain dicts with the
+    model's fields in declaration order, floats for float fields. With orjson
+    installed it is then encoded directly, skipping pydantic validation and
+    model construction; orjson and pydantic write the same bytes for these
+    values except for large float exponents, which fall back to pydantic.
+
+    >>> encode_model_json({"score": 1e45}, dict)
+    b'{"score":1e+45}'
+    >>> encode_model_json({"score": -5.89e98}, dict)
+    b'{"score":-5.89e+98}'
+    """
+    if orjson is not None:
+        try:
+            body = orjson.dumps(content)
+        except TypeError:
+            body = None
+        if body is not None and not (_EXPONENT_HINT.search(body) and _UNSIGNED_EXPONENT.search(body)):
+            return body
+    adapter = _type_adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(content))
+
+
+def model_json_response(content: Any, response_type: Any) -> Response:
+    """`encode_model_json` as a response, for routes returning large lists."""
+    return Response(content=encode_model_json(content, response_type), media_type="application/json")
+
+
+def cached_json_response(request: Request, encoded: EncodedJson) -> Response:
+    """Serve pre-encoded JSON, honoring `If-None-Match` and `Accept-Encoding: gzip`."""
+    use_gzip = encoded.gzip_body is not None and _accepts_gzip(request.headers.get("accept-encoding", ""))
+    etag = encoded.gzip_etag if use_gzip else encoded.etag
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, encoded):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=encoded.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=encoded.body, media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _etag_matches(if_none_match: str, encoded: EncodedJson) -> bool:
+    # If-None-Match uses weak comparison, and both encodings are the same representation.
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {encoded.etag, encoded.gzip_etag}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in candidates:
+            return True
+    return False
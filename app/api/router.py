@@ -5,6 +5,9 @@ from app.api.routes.profiles import router as profiles_router
 from app.api.routes.drafts import router as drafts_router
 from app.api.routes.configs import router as configs_router
 from app.api.routes.recommendations import router as recommendations_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.history import router as history_router
+from app.api.routes.debug import router as debug_router
 
 router = APIRouter()
 router.include_router(health_router, tags=["health"])
@@ -13,3 +16,6 @@ router.include_router(profiles_router, prefix="/profiles", tags=["profiles"])
 router.include_router(drafts_router, prefix="/drafts", tags=["drafts"])
 router.include_router(recommendations_router, prefix="/draft", tags=["draft"])
 router.include_router(configs_router,  prefix="/configs", tags=["configs"])
+router.include_router(metrics_router, tags=["metrics"])
+router.include_router(history_router, prefix="/history", tags=["history"])
+router.include_router(debug_router, prefix="/debug", tags=["debug"])
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
+from typing import Optional
 from app.core.config import settings
 from app.services.storage.json_repository import JsonRepository
-from app.services.storage.data_loader import DataLoader
+from app.services.storage.data_loader import DataLoader, ROLE_ORDER
 from app.models.schemas.champion_schemas import ChampionOut
+from app.api.responses import cached_json_response, encode_json
 from fastapi import HTTPException
 
 router = APIRouter()
@@ -12,12 +14,28 @@ def get_loader():
     return DataLoader(repo)
 
 @router.get("", response_model=list[ChampionOut])
-def list_champions(loader: DataLoader = Depends(get_loader)):
-    return loader.champions()
+def list_champions(request: Request, loader: DataLoader = Depends(get_loader)):
+    encoded = loader.snapshot.derive(
+        ("response", "champions"),
+        ["champions.json"],
+        lambda champions: encode_json(champions, list[ChampionOut]),
+    )
+    return cached_json_response(request, encoded)
+
+@router.get("/search", response_model=list[ChampionOut])
+def search_champions(
+    q: str = "",
+    role: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+    loader: DataLoader = Depends(get_loader),
+):
+    if role is not None and role not in ROLE_ORDER:
+        raise HTTPException(status_code=400, detail=f"Unknown role: {role}")
+    return loader.champion_index().search(q, role=role, limit=limit)
 
 @router.get("/{champion_id}", response_model=ChampionOut)
 def get_champion(champion_id: int, loader: DataLoader = Depends(get_loader)):
-    for c in loader.champions():
-        if c["id"] == champion_id:
-            return c
-    raise HTTPException(status_code=404, detail="Champion not found")
\ No newline at end of file
+    champion = loader.champion_index().get(champion_id)
+    if champion is None:
+        raise HTTPException(status_code=404, detail="Champion not found")
+    return champion
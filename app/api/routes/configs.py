@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.core.config import settings
 from app.services.storage.json_repository import JsonRepository
 from app.services.storage.data_loader import DataLoader
+from app.api.responses import cached_json_response, encode_json
 
 router = APIRouter()
 
@@ -10,15 +11,20 @@ def get_loader():
     return DataLoader(repo)
 
 @router.get("/draft-formats")
-def get_draft_formats(loader: DataLoader = Depends(get_loader)):
+def get_draft_formats(request: Request, loader: DataLoader = Depends(get_loader)):
     """
     Retourne le JSON complet des formats (flex/tournament).
     Le fichier attendu est: data/configs/draft_formats.json
     """
     try:
-        return loader.draft_formats()
+        encoded = loader.snapshot.derive(
+            ("response", "draft_formats"),
+            ["configs/draft_formats.json"],
+            encode_json,
+        )
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="draft_formats.json not found")
+    return cached_json_response(request, encoded)
 
 @router.get("/draft-formats/{format_key}")
 def get_draft_format(format_key: str, loader: DataLoader = Depends(get_loader)):
@@ -0,0 +1,79 @@
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.tracing import REQUEST_PROFILER, RequestProfiler
+from app.models.schemas.debug_schemas import ProfilerConfigIn, ProfilerStateOut, ProfileTraceOut
+
+router = APIRouter()
+
+PSTATS_SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls", "time")
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)) -> None:
+    # Without a configured token the debug routes do not exist.
+    if not settings.debug_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_debug_token is None or not hmac.compare_digest(x_debug_token, settings.debug_token):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+def get_profiler() -> RequestProfiler:
+    return REQUEST_PROFILER
+
+@router.get("/profile", response_model=ProfilerStateOut, dependencies=[Depends(require_debug_token)])
+def get_profile_state(profiler: RequestProfiler = Depends(get_profiler)):
+    return _state(profiler)
+
+@router.put("/profile", response_model=ProfilerStateOut, dependencies=[Depends(require_debug_token)])
+def configure_profile(payload: ProfilerConfigIn, profiler: RequestProfiler = Depends(get_profiler)):
+    """
+    Trace a `sampleRate` fraction of requests, optionally only those matching the `route` template
+    (e.g. `/drafts/{draft_id}/action`). `cprofile` also runs cProfile inside the traced stages.
+    """
+    profiler.configure(
+        enabled=payload.enabled,
+        sample_rate=payload.sampleRate,
+        route=payload.route,
+        cprofile=payload.cprofile,
+        max_traces=payload.maxTraces,
+    )
+    return _state(profiler)
+
+@router.delete("/profile", response_model=ProfilerStateOut, dependencies=[Depends(require_debug_token)])
+def reset_profile(profiler: RequestProfiler = Depends(get_profiler)):
+    profiler.reset()
+    return _state(profiler)
+
+@router.get("/profile/traces", response_model=List[ProfileTraceOut], dependencies=[Depends(require_debug_token)])
+def list_traces(
+    limit: int = Query(20, ge=1, le=10_000),
+    profiler: RequestProfiler = Depends(get_profiler),
+):
+    return profiler.traces(limit)
+
+@router.get("/profile/flamegraph", response_class=PlainTextResponse, dependencies=[Depends(require_debug_token)])
+def flamegraph(route: Optional[str] = None, profiler: RequestProfiler = Depends(get_profiler)):
+    """Folded stacks (`GET /route;request;stage;... microseconds`) for flamegraph.pl or speedscope."""
+    return PlainTextResponse(profiler.folded(route))
+
+@router.get("/profile/pstats", response_class=PlainTextResponse, dependencies=[Depends(require_debug_token)])
+def profile_stats(
+    route: Optional[str] = None,
+    sort: str = "cumulative",
+    limit: int = Query(30, ge=1, le=1000),
+    profiler: RequestProfiler = Depends(get_profiler),
+):
+    if sort not in PSTATS_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(PSTATS_SORT_KEYS)}")
+    return PlainTextResponse(profiler.pstats_text(route, sort=sort, limit=limit))
+
+def _state(profiler: RequestProfiler) -> ProfilerStateOut:
+    return ProfilerStateOut(
+        enabled=profiler.enabled,
+        sampleRate=profiler.sample_rate,
+        route=profiler.route,
+        cprofile=profiler.cprofile,
+        maxTraces=profiler.max_traces,
+        requests=profiler.requests(),
+    )
@@ -1,80 +1,380 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import contextlib
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 from uuid import uuid4
 
+from app.api.responses import model_json_response
 from app.core.config import settings
 from app.services.storage.json_repository import JsonRepository
 from app.services.storage.data_loader import DataLoader
-from app.services.draft_engine.format_engine import FormatEngine
-from app.services.draft_engine.validators import ensure_not_picked_or_banned, DraftValidationError
-from app.models.schemas.draft_schemas import DraftCreateIn, DraftStateOut, DraftActionIn, DraftSideState, DraftTurn
+from app.services.storage.draft_store import DraftConflictError, DraftStore, StoredDraft, get_draft_store
+from app.services.draft_engine.format_engine import get_format_engine
+from app.services.draft_engine.draft_state import apply_draft_action, new_draft_state
+from app.services.draft_engine.draft_hub import RESYNC, DraftHub, DraftSubscriber, get_draft_hub
+from app.services.draft_engine.validators import DraftValidationError
+from app.services.history.history_service import DraftHistory, get_draft_history
+from app.services.scoring.incremental_engine import DraftScorerCache, get_draft_scorers
+from app.models.domain.draft import Draft
+from app.models.schemas.draft_schemas import (
+    DraftCreateIn,
+    DraftStateOut,
+    DraftActionIn,
+    DraftActionOut,
+    DraftLiveAction,
+    DraftLiveSnapshot,
+    DraftSideState,
+    DraftTurn,
+    Side,
+)
+from app.models.schemas.recommendation_schemas import (
+    DraftRecommendationResponse,
+    RecommendationItem,
+    recommendation_items,
+    recommendation_json,
+)
 
 router = APIRouter()
-_DRAFTS: dict[str, dict] = {}
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+# (version, encoded message) of the full draft state, or None once the draft is gone.
+SnapshotSource = Callable[[], Awaitable[Optional[Tuple[int, str]]]]
+# Stored version of the draft, or None once it is gone.
+VersionSource = Callable[[], Awaitable[Optional[int]]]
 
 def get_loader():
     repo = JsonRepository(settings.data_dir)
     return DataLoader(repo)
 
 @router.post("", response_model=DraftStateOut)
-def create_draft(payload: DraftCreateIn, loader: DataLoader = Depends(get_loader)):
+def create_draft(
+    payload: DraftCreateIn,
+    loader: DataLoader = Depends(get_loader),
+    store: DraftStore = Depends(get_draft_store),
+    history: Optional[DraftHistory] = Depends(get_draft_history),
+):
+    if not get_format_engine(loader).has_format(payload.mode):
+        raise HTTPException(status_code=400, detail=f"Unknown draft format: {payload.mode}")
     draft_id = str(uuid4())
-    state = {
-        "draftId": draft_id,
-        "mode": payload.mode,
-        "status": "building",
-        "blue": {"picks": [], "bans": []},
-        "red": {"picks": [], "bans": []},
-        "actionsDone": 0,
-    }
-    _DRAFTS[draft_id] = state
-    return _to_out(state, loader)
+    state = new_draft_state(draft_id, payload.mode)
+    stored = store.create(draft_id, state)
+    if history is not None:
+        history.record_created(state)
+    return _to_out(Draft.from_state(stored.state), stored.version, loader)
 
 @router.get("/{draft_id}", response_model=DraftStateOut)
-def get_draft(draft_id: str, loader: DataLoader = Depends(get_loader)):
-    if draft_id not in _DRAFTS:
+def get_draft(
+    draft_id: str,
+    loader: DataLoader = Depends(get_loader),
+    store: DraftStore = Depends(get_draft_store),
+):
+    stored = store.get(draft_id)
+    if stored is None:
         raise HTTPException(status_code=404, detail="Draft not found")
-    return _to_out(_DRAFTS[draft_id], loader)
+    return _to_out(Draft.from_state(stored.state), stored.version, loader)
 
 @router.post("/{draft_id}/action", response_model=DraftStateOut)
-def apply_action(draft_id: str, action: DraftActionIn, loader: DataLoader = Depends(get_loader)):
-    if draft_id not in _DRAFTS:
+def apply_action(
+    draft_id: str,
+    action: DraftActionIn,
+    background_tasks: BackgroundTasks,
+    loader: DataLoader = Depends(get_loader),
+    store: DraftStore = Depends(get_draft_store),
+    history: Optional[DraftHistory] = Depends(get_draft_history),
+    hub: DraftHub = Depends(get_draft_hub),
+    scorers: DraftScorerCache = Depends(get_draft_scorers),
+):
+    stored = store.get(draft_id)
+    if stored is None:
         raise HTTPException(status_code=404, detail="Draft not found")
+    if action.expectedVersion is not None and action.expectedVersion != stored.version:
+        raise HTTPException(status_code=409, detail="Draft was modified by another action")
 
-    st = _DRAFTS[draft_id]
-    fmt = FormatEngine(loader.draft_formats())
-    turn = fmt.get_turn(st["mode"], st["actionsDone"])
-
-    if action.side != turn.side_to_act or action.type != turn.action_type:
-        raise HTTPException(status_code=400, detail="Not your turn / invalid action for this phase")
-
+    st = stored.state
+    fmt = get_format_engine(loader)
     try:
-        ensure_not_picked_or_banned(action.championId, st["blue"], st["red"])
+        apply_draft_action(st, action.type, action.side, action.championId, fmt)
     except DraftValidationError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    bucket = st[action.side]
-    key = "picks" if action.type == "pick" else "bans"
-    bucket[key].append(action.championId)
-    st["actionsDone"] += 1
+    try:
+        saved = store.save(draft_id, st, expected_version=stored.version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    except DraftConflictError:
+        raise HTTPException(status_code=409, detail="Draft was modified by another action")
+    if history is not None:
+        history.record_action(saved.state, action.type, action.side, action.championId)
+    draft = Draft.from_state(saved.state)
+    if draft.is_full:
+        # Full drafts have no recommendations left to update.
+        scorers.discard(draft_id)
+    if hub.has_subscribers(draft_id):
+        background_tasks.add_task(publish_action, hub, saved, action, loader, scorers)
+    return _to_out(draft, saved.version, loader)
 
-    if st["actionsDone"] >= fmt.total_actions(st["mode"]):
-        st["status"] = "full"
+@router.get("/{draft_id}/recommendations", response_model=DraftRecommendationResponse)
+def draft_recommendations(
+    draft_id: str,
+    side: Side,
+    limit: Optional[int] = Query(default=None, ge=1),
+    offset: int = Query(default=0, ge=0),
+    minScore: Optional[float] = None,
+    loader: DataLoader = Depends(get_loader),
+    store: DraftStore = Depends(get_draft_store),
+    scorers: DraftScorerCache = Depends(get_draft_scorers),
+):
+    """
+    Recommendations for `side` in the stored draft, same ranking as POST /draft/recommendations.
+    Scores are kept per draft and side, and each new action only rescores the candidates it affects.
+    """
+    stored = store.get(draft_id)
+    if stored is None:
+        # Expired or deleted, possibly by another worker: its scorers are dead weight.
+        scorers.discard(draft_id)
+        raise HTTPException(status_code=404, detail="Draft not found")
+    draft = Draft.from_state(stored.state)
+    if draft.is_full:
+        scorers.discard(draft_id)
+        return DraftRecommendationResponse(recommendations=[])
+    try:
+        ranked = scorers.ranked(draft, side, loader)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=f"Role profile not found: {exc.filename}")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return model_json_response(
+        {"recommendations": recommendation_json(ranked.select(limit, offset, minScore))},
+        DraftRecommendationResponse,
+    )
 
-    return _to_out(st, loader)
+@router.websocket("/{draft_id}/live")
+async def live_draft_socket(
+    websocket: WebSocket,
+    draft_id: str,
+    side: Optional[Side] = None,
+    loader: DataLoader = Depends(get_loader),
+    store: DraftStore = Depends(get_draft_store),
+    hub: DraftHub = Depends(get_draft_hub),
+    scorers: DraftScorerCache = Depends(get_draft_scorers),
+):
+    """
+    Live draft channel: a `snapshot` message on connect, then one `action` delta per applied action.
+    With `side`, every message also carries recommendations for that side.
+    """
+    if await run_in_threadpool(store.get, draft_id) is None:
+        await websocket.close(code=4404, reason="Draft not found")
+        return
+    await websocket.accept()
 
-def _to_out(st: dict, loader: DataLoader) -> DraftStateOut:
-    fmt = FormatEngine(loader.draft_formats())
-    t = fmt.get_turn(st["mode"], st["actionsDone"])
-    return DraftStateOut(
-        draftId=st["draftId"],
-        mode=st["mode"],
-        status=st["status"],
-        blue=DraftSideState(**st["blue"]),
-        red=DraftSideState(**st["red"]),
-        turn=DraftTurn(
-            phaseIndex=t.phase_index,
-            sideToAct=t.side_to_act,
-            type=t.action_type,
-            remainingInPhase=t.remaining_in_phase,
+    subscriber = hub.subscribe(draft_id, side)
+    messages = _live_messages(
+        subscriber,
+        lambda: _snapshot(store, draft_id, side, loader, scorers),
+        stored_version=_stored_version(store, draft_id),
+    )
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(websocket))
+    try:
+        while True:
+            next_message = asyncio.ensure_future(messages.__anext__())
+            done, _pending = await asyncio.wait({next_message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if next_message not in done:
+                next_message.cancel()
+                with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+                    await next_message
+                break
+            try:
+                message = next_message.result()
+            except StopAsyncIteration:
+                await websocket.close(code=4404, reason="Draft not found")
+                break
+            await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        hub.unsubscribe(subscriber)
+        await messages.aclose()
+
+@router.get("/{draft_id}/live")
+async def live_draft_events(
+    request: Request,
+    draft_id: str,
+    side: Optional[Side] = None,
+    loader: DataLoader = Depends(get_loader),
+    store: DraftStore = Depends(get_draft_store),
+    hub: DraftHub = Depends(get_draft_hub),
+    scorers: DraftScorerCache = Depends(get_draft_scorers),
+):
+    """Server-Sent Events fallback for the live draft channel; same messages as the WebSocket."""
+    if await run_in_threadpool(store.get, draft_id) is None:
+        raise HTTPException(status_code=404, detail="Draft not found")
+
+    subscriber = hub.subscribe(draft_id, side)
+
+    async def events() -> AsyncIterator[str]:
+        messages = _live_messages(
+            subscriber,
+            lambda: _snapshot(store, draft_id, side, loader, scorers),
+            keepalive=SSE_KEEPALIVE_SECONDS,
+            stored_version=_stored_version(store, draft_id),
         )
+        try:
+            async for message in messages:
+                if message is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"data: {message}\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+            await messages.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def publish_action(
+    hub: DraftHub,
+    saved: StoredDraft,
+    action: DraftActionIn,
+    loader: DataLoader,
+    scorers: DraftScorerCache,
+) -> None:
+    """Push one action delta to the draft's subscribers (run after the action response is sent)."""
+    draft = Draft.from_state(saved.state)
+    turn = _turn_out(draft, loader)
+
+    def build_message(side: Optional[str]) -> str:
+        return DraftLiveAction(
+            draftId=draft.draft_id,
+            version=saved.version,
+            action=DraftActionOut(type=action.type, side=action.side, championId=action.championId),
+            status=draft.status.value,
+            turn=turn,
+            recommendations=_recommendations(draft, side, loader, scorers),
+        ).model_dump_json(exclude_none=True)
+
+    hub.publish(draft.draft_id, saved.version, build_message)
+
+async def _live_messages(
+    subscriber: DraftSubscriber,
+    snapshot: SnapshotSource,
+    keepalive: Optional[float] = None,
+    stored_version: Optional[VersionSource] = None,
+) -> AsyncIterator[Optional[str]]:
+    """Snapshot first, then newer deltas; a lagging subscriber gets a fresh snapshot. None = keepalive.
+
+    With `stored_version` (a draft store shared by several workers), the stored
+    version is checked every `LIVE_SYNC_SECONDS` without a delta: actions
+    applied by another worker never reach this process's hub, so a version
+    that moved is sent as a fresh snapshot.
+    """
+    loop = asyncio.get_running_loop()
+    current = await snapshot()
+    if current is None:
+        return
+    last_version, message = current
+    yield message
+    sync = settings.live_sync_seconds if stored_version is not None and settings.live_sync_seconds > 0 else None
+    timeout = min(filter(None, (keepalive, sync)), default=None)
+    last_sent = loop.time()
+    while True:
+        try:
+            version, message = await asyncio.wait_for(subscriber.next_message(), timeout=timeout)
+        except asyncio.TimeoutError:
+            if sync is not None:
+                version = await stored_version()
+                if version is None:
+                    return
+                if version > last_version:
+                    current = await snapshot()
+                    if current is None:
+                        return
+                    last_version, message = current
+                    last_sent = loop.time()
+                    yield message
+                    continue
+            # Timers may fire a little early: without sync checks, every timeout is a keepalive.
+            if keepalive is not None and (sync is None or loop.time() - last_sent >= keepalive):
+                last_sent = loop.time()
+                yield None
+            continue
+        if (version, message) == RESYNC:
+            current = await snapshot()
+            if current is None:
+                return
+            version, message = current
+        elif version <= last_version:
+            continue
+        last_version = version
+        last_sent = loop.time()
+        yield message
+
+def _stored_version(store: DraftStore, draft_id: str) -> Optional[VersionSource]:
+    # Only a shared store can change behind this process's hub.
+    if not store.shared:
+        return None
+    return lambda: run_in_threadpool(store.version, draft_id)
+
+async def _snapshot(store: DraftStore, draft_id: str, side: Optional[str], loader: DataLoader, scorers: DraftScorerCache):
+    def build() -> Optional[Tuple[int, str]]:
+        stored = store.get(draft_id)
+        if stored is None:
+            scorers.discard(draft_id)
+            return None
+        draft = Draft.from_state(stored.state)
+        message = DraftLiveSnapshot(
+            draft=_to_out(draft, stored.version, loader),
+            recommendations=_recommendations(draft, side, loader, scorers),
+        ).model_dump_json(exclude_none=True)
+        return stored.version, message
+
+    return await run_in_threadpool(build)
+
+def _recommendations(
+    draft: Draft,
+    side: Optional[str],
+    loader: DataLoader,
+    scorers: DraftScorerCache,
+) -> Optional[List[RecommendationItem]]:
+    if side is None:
+        return None
+    if draft.is_full:
+        return []
+    try:
+        return recommendation_items(scorers.ranked(draft, side, loader).select(settings.live_recommendation_limit))
+    except (FileNotFoundError, ValueError):
+        return []
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    # Clients only listen; reading is how a closed connection is noticed while no update is due.
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        return
+
+def _to_out(draft: Draft, version: int, loader: DataLoader) -> DraftStateOut:
+    return DraftStateOut(
+        draftId=draft.draft_id,
+        mode=draft.mode,
+        status=draft.status.value,
+        version=version,
+        blue=DraftSideState(picks=draft.blue.picks, bans=draft.blue.bans),
+        red=DraftSideState(picks=draft.red.picks, bans=draft.red.bans),
+        turn=_turn_out(draft, loader),
+    )
+
+def _turn_out(draft: Draft, loader: DataLoader) -> DraftTurn:
+    t = get_format_engine(loader).get_turn(draft.mode, draft.actions_done)
+    return DraftTurn(
+        phaseIndex=t.phase_index,
+        sideToAct=t.side_to_act,
+        type=t.action_type,
+        remainingInPhase=t.remaining_in_phase,
     )
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.storage.json_repository import JsonRepository
+from app.services.storage.data_loader import DataLoader
+from app.services.draft_engine.format_engine import get_format_engine
+from app.services.draft_engine.validators import DraftValidationError
+from app.services.history.history_service import DraftHistory, DraftHistoryError, get_draft_history
+from app.models.schemas.draft_schemas import DraftSideState
+from app.models.schemas.history_schemas import (
+    DraftHistoryEvent,
+    DraftHistoryEventsOut,
+    DraftHistorySummary,
+    DraftReplayOut,
+)
+
+router = APIRouter()
+
+def get_loader():
+    repo = JsonRepository(settings.data_dir)
+    return DataLoader(repo)
+
+def require_history(history: Optional[DraftHistory] = Depends(get_draft_history)) -> DraftHistory:
+    if history is None:
+        raise HTTPException(status_code=404, detail="Draft history is disabled")
+    return history
+
+@router.get("/drafts", response_model=List[DraftHistorySummary])
+def list_drafts(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    history: DraftHistory = Depends(require_history),
+):
+    return [
+        DraftHistorySummary(draftId=draft_id, actionCount=count)
+        for draft_id, count in history.list_drafts(offset=offset, limit=limit)
+    ]
+
+@router.get("/drafts/{draft_id}/events", response_model=DraftHistoryEventsOut)
+def list_events(draft_id: str, history: DraftHistory = Depends(require_history)):
+    try:
+        events = history.events(draft_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Draft not found in history")
+    return DraftHistoryEventsOut(
+        draftId=draft_id,
+        events=[
+            DraftHistoryEvent(actionIndex=e["n"], type=e["t"], side=e["s"], championId=e["c"], timestamp=e["ts"])
+            for e in events
+        ],
+    )
+
+@router.get("/drafts/{draft_id}/replay", response_model=DraftReplayOut)
+def replay_draft(
+    draft_id: str,
+    actionIndex: Optional[int] = Query(None, ge=0),
+    loader: DataLoader = Depends(get_loader),
+    history: DraftHistory = Depends(require_history),
+):
+    fmt = get_format_engine(loader)
+    try:
+        st = history.replay(draft_id, fmt, action_index=actionIndex)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Draft not found in history")
+    except (DraftHistoryError, DraftValidationError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return DraftReplayOut(
+        draftId=st["draftId"],
+        mode=st["mode"],
+        status=st["status"],
+        actionIndex=st["actionsDone"],
+        blue=DraftSideState(**st["blue"]),
+        red=DraftSideState(**st["red"]),
+    )
@@ -1,12 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Iterator, List, Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.responses import encode_model_json, model_json_response
 from app.core.config import settings
 from app.services.storage.json_repository import JsonRepository
 from app.services.storage.data_loader import DataLoader
-from app.services.scoring.scoring_engine import build_recommendations
+from app.services.draft_engine.validators import DraftValidationError
+from app.services.scoring.scoring_engine import build_recommendations, rank_recommendations
+from app.services.scoring.draft_search import search_recommendations
+from app.services.scoring.draft_simulation import simulate_draft
+from app.services.scoring.profile_comparison import compare_profiles
 from app.models.schemas.recommendation_schemas import (
+    DraftRecommendationBatchItem,
     DraftRecommendationRequest,
     DraftRecommendationResponse,
+    DraftSearchRequest,
+    DraftSearchResponse,
+    DraftSimulationRequest,
+    DraftSimulationResponse,
+    ProfileComparisonRequest,
+    ProfileComparisonResponse,
+    RecommendationItem,
+    recommendation_dict,
+    recommendation_json,
 )
 
 router = APIRouter()
@@ -15,12 +33,186 @@ def get_loader():
     repo = JsonRepository(settings.data_dir)
     return DataLoader(repo)
 
+def get_recommendation_builder():
+    if settings.scoring_engine == "numpy":
+        from app.services.scoring.vectorized_engine import build_recommendations_vectorized
+        return build_recommendations_vectorized
+    return build_recommendations
+
+def get_recommendation_ranker():
+    if settings.scoring_engine == "numpy":
+        from app.services.scoring.vectorized_engine import rank_recommendations_vectorized
+        return rank_recommendations_vectorized
+    return rank_recommendations
+
 @router.post("/recommendations", response_model=DraftRecommendationResponse)
-def recommend(payload: DraftRecommendationRequest, loader: DataLoader = Depends(get_loader)):
+def recommend(
+    payload: DraftRecommendationRequest,
+    limit: Optional[int] = Query(default=None, ge=1),
+    offset: int = Query(default=0, ge=0),
+    minScore: Optional[float] = None,
+    stream: bool = False,
+    loader: DataLoader = Depends(get_loader),
+    rank=Depends(get_recommendation_ranker),
+):
+    """
+    `limit`/`offset` page through the ranked list; only the top `offset + limit` items are built.
+    `stream=true` returns the full ranked list lazily as NDJSON, one RecommendationItem per line.
+    """
+    try:
+        ranked = rank(payload, loader)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=f"Role profile not found: {exc.filename}")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if stream:
+        lines = (
+            encode_model_json(recommendation_dict(recommendation), RecommendationItem) + b"\n"
+            for recommendation in ranked.stream(minScore)
+        )
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    return model_json_response(
+        {"recommendations": recommendation_json(ranked.select(limit, offset, minScore))},
+        DraftRecommendationResponse,
+    )
+
+@router.post("/recommendations/search", response_model=DraftSearchResponse)
+def recommend_search(payload: DraftSearchRequest, loader: DataLoader = Depends(get_loader)):
+    """
+    Lookahead recommendations: minimax over the remaining format turns within `budgetMs`.
+    Scores are lookahead values from our side's point of view.
+    """
+    try:
+        result = search_recommendations(
+            payload,
+            loader,
+            budget_ms=payload.budgetMs,
+            max_depth=payload.maxDepth,
+            branching=payload.branching,
+        )
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=f"Role profile not found: {exc.filename}")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    stats = result.stats
+    return model_json_response(
+        {
+            "recommendations": recommendation_json(result.recommendations),
+            "search": {
+                "sideToAct": result.side_to_act or None,
+                "actionType": result.action_type or None,
+                "depthReached": stats.depth_reached,
+                "nodes": stats.nodes,
+                "nodesPerSecond": float(stats.nodes_per_second),
+                "tableHits": stats.table_hits,
+                "elapsedMs": float(stats.elapsed_ms),
+                "budgetMs": stats.budget_ms,
+                "timedOut": stats.timed_out,
+            },
+        },
+        DraftSearchResponse,
+    )
+
+@router.post("/recommendations/simulate", response_model=DraftSimulationResponse)
+def recommend_simulate(payload: DraftSimulationRequest, loader: DataLoader = Depends(get_loader)):
+    """
+    Monte Carlo robustness of the side to act's moves: `rollouts` random completions of the draft per candidate,
+    reporting the mean and variance of the final composition score (ours minus theirs).
+    Runs on a process pool; the same request and `seed` always give the same numbers.
+    """
+    try:
+        result = simulate_draft(
+            payload,
+            loader,
+            rollouts=payload.rollouts,
+            candidate_ids=payload.candidates,
+            candidate_count=payload.candidateCount,
+            policy=payload.policy,
+            seed=payload.seed,
+        )
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=f"Role profile not found: {exc.filename}")
+    except (ValueError, DraftValidationError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return model_json_response(
+        {
+            "sideToAct": result.side_to_act,
+            "actionType": result.action_type,
+            "policy": result.policy,
+            "workers": result.workers,
+            "elapsedMs": float(result.elapsed_ms),
+            "candidates": [
+                {
+                    "championId": candidate.champion_id,
+                    "greedyScore": None if candidate.greedy_score is None else float(candidate.greedy_score),
+                    "mean": float(candidate.stats.mean),
+                    "variance": float(candidate.stats.variance),
+                    "stdev": float(candidate.stats.variance ** 0.5),
+                    "min": float(candidate.stats.minimum),
+                    "max": float(candidate.stats.maximum),
+                    "rollouts": candidate.stats.count,
+                }
+                for candidate in result.candidates
+            ],
+        },
+        DraftSimulationResponse,
+    )
+
+@router.post("/recommendations/profiles", response_model=ProfileComparisonResponse)
+def recommend_profiles(payload: ProfileComparisonRequest, loader: DataLoader = Depends(get_loader)):
+    """
+    Rank the open roles against every stored profile of each role (or the `profiles` subset) in one pass,
+    plus the best lineup: one profile and one distinct champion per open role, maximizing the total score.
+    """
     try:
-        recommendations = build_recommendations(payload, loader)
+        comparison = compare_profiles(payload, loader, payload.profiles, payload.limit)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=f"Role profile not found: {exc.filename}")
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
-    return DraftRecommendationResponse(recommendations=recommendations)
+    return model_json_response(
+        {
+            "profiles": [
+                {
+                    "role": ranking.role,
+                    "profile": ranking.profile,
+                    "active": ranking.active,
+                    "bestScore": None if ranking.best_score is None else float(ranking.best_score),
+                    "recommendations": recommendation_json(ranking.recommendations),
+                }
+                for ranking in comparison.rankings
+            ],
+            "lineup": [
+                {"role": slot.role, "profile": slot.profile, "championId": slot.champion_id, "score": float(slot.score)}
+                for slot in comparison.lineup
+            ],
+            "lineupScore": float(comparison.lineup_score),
+        },
+        ProfileComparisonResponse,
+    )
+
+@router.post("/recommendations/batch")
+def recommend_batch(
+    payloads: List[DraftRecommendationRequest],
+    loader: DataLoader = Depends(get_loader),
+    build=Depends(get_recommendation_builder),
+):
+    """
+    Score many draft states against one pinned data snapshot.
+    Streams one DraftRecommendationBatchItem per state as NDJSON, in request order.
+    """
+    pinned_loader = DataLoader(loader.repo, loader.snapshot.pin())
+
+    def lines() -> Iterator[bytes]:
+        for index, payload in enumerate(payloads):
+            try:
+                recommendations = recommendation_json(build(payload, pinned_loader))
+                item = {"recommendations": recommendations, "index": index, "error": None}
+            except FileNotFoundError as exc:
+                item = {"recommendations": [], "index": index, "error": f"Role profile not found: {exc.filename}"}
+            except ValueError as exc:
+                item = {"recommendations": [], "index": index, "error": str(exc)}
+            yield encode_model_json(item, DraftRecommendationBatchItem) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -3,6 +3,30 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     app_name: str = "DraftAdvisor API"
     data_dir: str = "data"  # chemin relatif depuis DraftAPI/
+    scoring_engine: str = "python"  # "python" | "numpy"
+    shared_snapshot: bool = False  # numpy engine: workers map one compiled snapshot file instead of compiling their own
+    shared_snapshot_path: str = "compiled_snapshot.bin"
+    role_pressure: str = "locked"  # "locked" | "soft"
+    simulation_workers: int = 0  # draft simulator processes; 0 = one per CPU, 1 = in-process
+    log_level: str = "INFO"
+    log_json: bool = True
+    draft_store: str = "memory"  # "memory" | "sqlite"
+    draft_store_path: str = "drafts.sqlite3"
+    draft_max_entries: int = 10_000
+    draft_ttl_seconds: float = 6 * 3600
+    json_write_delay_ms: float = 0  # > 0 coalesces bursts of writes to the same file
+    json_compact_writes: bool = False
+    live_queue_size: int = 32
+    live_recommendation_limit: int = 10
+    live_sync_seconds: float = 1.0  # shared draft store: how often live channels check for other workers' actions
+    history_enabled: bool = True
+    history_dir: str = "history"
+    history_snapshot_interval: int = 5
+    history_segment_bytes: int = 8 * 1024 * 1024
+    match_stats_path: str = "match_stats.npz"  # written by app.services.history.match_ingest
+    pair_stats_path: str = "pair_stats.bin"  # memory-mapped pair deltas, also written by match_ingest
+    pair_stats_scoring: bool = False  # adds the pairSynergy / pairMatchup terms to recommendation scores
+    debug_token: str = ""  # enables /debug routes for requests sending it as X-Debug-Token
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
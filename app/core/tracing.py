@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import io
+import pstats
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import ContextManager, Deque, Dict, List, Optional, Pattern
+
+# Trace of the request being handled, if it was selected for profiling.
+_active: ContextVar[Optional["Trace"]] = ContextVar("draftapi_trace", default=None)
+
+_NO_SPAN = contextlib.nullcontext()
+
+ROOT_SPAN = "request"
+
+
+def span(name: str) -> ContextManager[None]:
+    """Time a stage of the current request when it is being profiled; a shared no-op otherwise."""
+    trace = _active.get()
+    if trace is None:
+        return _NO_SPAN
+    return _Span(trace, name)
+
+
+class Trace:
+    """Span timings of one profiled request, kept as self time per stack path.
+
+    Spans may be entered from the event loop and from threadpool workers; each
+    thread keeps its own stack. With `profile`, a cProfile profiler runs in a
+    thread while its outermost span is open, so profiles cover traced stages.
+    """
+
+    def __init__(self, method: str, path: str, profile: bool):
+        self.method = method
+        self.path = path
+        self.profile = profile
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.route = ""
+        self.status = 0
+        self.self_times: Dict[str, float] = {}
+        self.profiles: List[cProfile.Profile] = []
+        # Restores the previous `_active` value once the request is finished.
+        self.token: Optional[Token] = None
+        self._stacks: Dict[int, List[_Frame]] = {}
+        self._top_level = 0.0
+        self._lock = threading.Lock()
+
+    def _enter(self, name: str) -> None:
+        stack = self._stacks.setdefault(threading.get_ident(), [])
+        path = f"{stack[-1].path};{name}" if stack else name
+        profiler = None
+        if self.profile and not stack:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per process: while another
+                # request's span is profiled, this span is timed but not profiled.
+                profiler = None
+        stack.append(_Frame(path, time.perf_counter(), profiler))
+
+    def _exit(self) -> None:
+        ended = time.perf_counter()
+        stack = self._stacks[threading.get_ident()]
+        frame = stack.pop()
+        duration = ended - frame.started
+        if frame.profiler is not None:
+            frame.profiler.disable()
+        with self._lock:
+            self.self_times[frame.path] = self.self_times.get(frame.path, 0.0) + duration - frame.children
+            if stack:
+                stack[-1].children += duration
+            else:
+                self._top_level += duration
+            if frame.profiler is not None:
+                self.profiles.append(frame.profiler)
+
+    def finish(self, route: str, status: int) -> None:
+        self.duration = time.perf_counter() - self.started
+        self.route = route
+        self.status = status
+        # Spans run in worker threads may overlap; never report a negative root self time.
+        self.self_times[ROOT_SPAN] = max(0.0, self.duration - self._top_level)
+
+    def folded(self) -> Dict[str, float]:
+        """`route;request;stage;...` -> self seconds, the input format of flame graph tools."""
+        prefix = f"{self.method} {self.route}"
+        return {
+            f"{prefix};{path}" if path == ROOT_SPAN else f"{prefix};{ROOT_SPAN};{path}": seconds
+            for path, seconds in self.self_times.items()
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "duration": self.duration,
+            "spans": dict(sorted(self.self_times.items())),
+        }
+
+
+@dataclass
+class _Frame:
+    path: str
+    started: float
+    profiler: Optional[cProfile.Profile]
+    children: float = 0.0
+
+
+class _Span:
+    __slots__ = ("trace", "name")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.trace._enter(self.name)
+
+    def __exit__(self, *exc_info) -> None:
+        self.trace._exit()
+
+
+class RequestProfiler:
+    """Selects requests to trace and aggregates their spans and profiles per route.
+
+    While disabled, the request middleware only reads `enabled`.
+    """
+
+    def __init__(self, max_traces: int = 100):
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.route: Optional[str] = None
+        self.cprofile = False
+        self._route_pattern: Optional[Pattern[str]] = None
+        self._lock = threading.Lock()
+        self._traces: Deque[Trace] = deque(maxlen=max_traces)
+        self._folded: Dict[str, float] = {}
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._requests: Dict[str, int] = {}
+
+    @property
+    def max_traces(self) -> int:
+        return self._traces.maxlen
+
+    def configure(
+        self,
+        enabled: bool,
+        sample_rate: float = 1.0,
+        route: Optional[str] = None,
+        cprofile: bool = False,
+        max_traces: Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            self.sample_rate = sample_rate
+            self.route = route
+            self._route_pattern = _template_pattern(route) if route else None
+            self.cprofile = cprofile
+            if max_traces is not None and max_traces != self._traces.maxlen:
+                self._traces = deque(self._traces, maxlen=max_traces)
+            self.enabled = enabled
+
+    def start(self, method: str, path: str) -> Optional[Trace]:
+        """Begin tracing this request if it is sampled; the caller must pass the result to `finish`."""
+        if self._route_pattern is not None and not self._route_pattern.match(path):
+            return None
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        trace = Trace(method, path, profile=self.cprofile)
+        trace.token = _active.set(trace)
+        return trace
+
+    def finish(self, trace: Trace, route: str, status: int) -> None:
+        if trace.token is not None:
+            _active.reset(trace.token)
+            trace.token = None
+        trace.finish(route, status)
+        key = f"{trace.method} {route}"
+        stats = None
+        for profile in trace.profiles:
+            try:
+                stats = pstats.Stats(profile) if stats is None else stats.add(profile)
+            except TypeError:
+                # A profiler that saw no calls has no stats.
+                continue
+        with self._lock:
+            self._traces.append(trace)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for path, seconds in trace.folded().items():
+                self._folded[path] = self._folded.get(path, 0.0) + seconds
+            if stats is not None:
+                if key in self._stats:
+                    self._stats[key].add(stats)
+                else:
+                    self._stats[key] = stats
+
+    def reset(self) -> None:
+        with self._lock:
+            self._traces.clear()
+            self._folded.clear()
+            self._stats.clear()
+            self._requests.clear()
+
+    def requests(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._requests)
+
+    def traces(self, limit: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            traces = list(self._traces)
+        if limit is not None:
+            traces = traces[-limit:]
+        return [trace.to_dict() for trace in reversed(traces)]
+
+    def folded(self, route: Optional[str] = None) -> str:
+        """Aggregated folded stacks, one `frame;frame;... microseconds` line each (flamegraph.pl, speedscope)."""
+        with self._lock:
+            items = sorted(self._folded.items())
+        lines = [
+            f"{path} {round(seconds * 1_000_000)}"
+            for path, seconds in items
+            if route is None or path.split(";", 1)[0] == route
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def pstats_text(self, route: Optional[str] = None, sort: str = "cumulative", limit: int = 30) -> str:
+        out = io.StringIO()
+        with self._lock:
+            for key, stats in sorted(self._stats.items()):
+                if route is not None and key != route:
+                    continue
+                out.write(f"=== {key} ===\n")
+                stats.stream = out
+                stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+def _template_pattern(route: str) -> Pattern[str]:
+    # `/drafts/{draft_id}/action` matches `/drafts/<anything but a slash>/action`.
+    parts = re.split(r"(\{[^}/]+\})", route)
+    return re.compile("^" + "".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts) + "$")
+
+
+REQUEST_PROFILER = RequestProfiler()
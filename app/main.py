@@ -1,7 +1,15 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import router as api_router
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.core.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS
+from app.core.tracing import REQUEST_PROFILER
+
+configure_logging(settings.log_level, settings.log_json)
 
 app = FastAPI(title="DraftAdvisor API")
 
@@ -16,4 +24,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    # Profiling is off in normal operation; this attribute read is all it costs then.
+    trace = REQUEST_PROFILER.start(request.method, request.url.path) if REQUEST_PROFILER.enabled else None
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route_path = _route_template(request)
+        HTTP_REQUESTS.inc(method=request.method, route=route_path, status=str(status))
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route_path)
+        if trace is not None:
+            REQUEST_PROFILER.finish(trace, route_path, status)
+
+def _route_template(request: Request) -> str:
+    # Label by route template (`/drafts/{draft_id}`), not raw path, to keep cardinality bounded.
+    route = request.scope.get("route")
+    if route is None or request.scope.get("endpoint") is None:
+        return "unmatched"
+    # `route.path_format` is relative to its included router; FastAPI's effective
+    # route context records the template with every router prefix applied.
+    context = request.scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(context, "path_format", None) or getattr(route, "path_format", None) or "unmatched"
+
 app.include_router(api_router)
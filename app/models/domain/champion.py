@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+from app.core.logging import get_logger
+from app.models.domain.enums import Role
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Champion:
+    id: int
+    name: str
+    slug: str
+    roles: Tuple[Role, ...]
+    img: str = ""
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Champion":
+        return cls(
+            id=data["id"],
+            name=data.get("name", ""),
+            slug=data.get("slug", ""),
+            roles=_known_roles(data),
+            img=data.get("img", ""),
+        )
+
+
+def _known_roles(data: dict) -> Tuple[Role, ...]:
+    # An unknown role only drops that role: it must not make the whole champion list unusable.
+    roles = []
+    for role in data.get("roles", []) or ():
+        try:
+            roles.append(Role(role))
+        except ValueError:
+            logger.warning("unknown champion role skipped", extra={"champion_id": data.get("id"), "role": role})
+    return tuple(roles)
+
+
+def champions_by_id(champions: Iterable[dict]) -> Dict[int, Champion]:
+    """`champions.json` entries keyed by id; entries without an id are skipped."""
+    return {
+        champion["id"]: Champion.from_dict(champion)
+        for champion in champions
+        if champion.get("id") is not None
+    }
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import FrozenSet, Tuple
+
+from app.models.domain.enums import DraftStatus, Side
+
+
+@dataclass(frozen=True, slots=True)
+class DraftSide:
+    picks: Tuple[int, ...] = ()
+    bans: Tuple[int, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DraftSide":
+        return cls(picks=tuple(data.get("picks", ())), bans=tuple(data.get("bans", ())))
+
+
+@dataclass(frozen=True, slots=True)
+class Draft:
+    """Immutable view of a stored draft state; the store and `apply_draft_action` keep working on the dict."""
+
+    draft_id: str
+    mode: str
+    status: DraftStatus
+    actions_done: int
+    blue: DraftSide
+    red: DraftSide
+
+    @classmethod
+    def from_state(cls, state: dict) -> "Draft":
+        return cls(
+            draft_id=state["draftId"],
+            mode=state["mode"],
+            status=DraftStatus(state["status"]),
+            actions_done=state["actionsDone"],
+            blue=DraftSide.from_dict(state["blue"]),
+            red=DraftSide.from_dict(state["red"]),
+        )
+
+    @property
+    def is_full(self) -> bool:
+        return self.status is DraftStatus.FULL
+
+    def side(self, side: str) -> DraftSide:
+        return self.blue if side == Side.BLUE else self.red
+
+    def banned(self) -> FrozenSet[int]:
+        return frozenset((*self.blue.bans, *self.red.bans))
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import sys
+from enum import Enum
+
+
+class _StrEnum(str, Enum):
+    """String enum that hashes, compares and formats as its value, so members and plain strings mix freely."""
+
+    __hash__ = str.__hash__
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self.value, format_spec)
+
+
+class Role(_StrEnum):
+    TOP = "top"
+    JUNGLE = "jungle"
+    MID = "mid"
+    ADC = "adc"
+    SUPPORT = "support"
+
+
+class Side(_StrEnum):
+    BLUE = "blue"
+    RED = "red"
+
+
+class DraftStatus(_StrEnum):
+    BUILDING = "building"
+    FULL = "full"
+
+
+def intern_color(color: str) -> str:
+    """Colors are an open set read from the data files; interning makes repeated ones one shared object."""
+    return sys.intern(color)
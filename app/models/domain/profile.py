@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app.models.domain.enums import Role, intern_color
+
+
+@dataclass(frozen=True, slots=True)
+class ProfileEntry:
+    """One champion of a role pool. Reference ids keep their file order and duplicates, as scoring counts them."""
+
+    id: Optional[int]
+    how_good: int
+    meta: int
+    colors: Tuple[str, ...]
+    synergy: Tuple[int, ...]
+    counters: Tuple[int, ...]
+    strong_into: Tuple[int, ...]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProfileEntry":
+        return cls(
+            id=data.get("id"),
+            how_good=data.get("howGoodIAm", 0),
+            meta=data.get("meta", 0),
+            colors=tuple(intern_color(color) for color in data.get("colors", []) or ()),
+            synergy=tuple(data.get("synergy", []) or ()),
+            counters=tuple(data.get("counters", []) or ()),
+            strong_into=tuple(data.get("strongInto", []) or ()),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RoleProfile:
+    name: str
+    role: Role
+    entries: Tuple[ProfileEntry, ...]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RoleProfile":
+        return cls(
+            name=data["profile"],
+            role=_profile_role(data["role"], data["profile"]),
+            entries=tuple(ProfileEntry.from_dict(champion) for champion in data.get("champions", [])),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RoleCatalog:
+    """Every stored profile of one role, in file order."""
+
+    role: Role
+    active: str
+    profiles: Tuple[RoleProfile, ...]
+
+    @classmethod
+    def from_store(cls, store: dict) -> "RoleCatalog":
+        return cls(
+            role=_profile_role(store["role"], store["activeProfile"]),
+            active=store["activeProfile"],
+            profiles=tuple(RoleProfile.from_dict(profile) for profile in store["profiles"]),
+        )
+
+
+def _profile_role(role: str, profile: str) -> Role:
+    try:
+        return Role(role)
+    except ValueError:
+        expected = ", ".join(member.value for member in Role)
+        raise ValueError(f"Unknown role {role!r} in profile {profile!r}: expected one of {expected}") from None
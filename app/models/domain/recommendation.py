@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Recommendation:
+    champion_id: int
+    score: float
+    roles: Tuple[str, ...] = ()
+    reasons: Tuple[str, ...] = ()
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+
+class ProfilerConfigIn(BaseModel):
+    enabled: bool
+    sampleRate: float = Field(1.0, gt=0, le=1)
+    route: Optional[str] = None
+    cprofile: bool = False
+    maxTraces: Optional[int] = Field(None, ge=1, le=10_000)
+
+class ProfilerStateOut(BaseModel):
+    enabled: bool
+    sampleRate: float
+    route: Optional[str] = None
+    cprofile: bool
+    maxTraces: int
+    requests: Dict[str, int]
+
+class ProfileTraceOut(BaseModel):
+    method: str
+    path: str
+    route: str
+    status: int
+    duration: float
+    spans: Dict[str, float]
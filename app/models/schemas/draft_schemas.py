@@ -1,9 +1,12 @@
 from pydantic import BaseModel, Field
-from typing import List, Literal
+from typing import List, Literal, Optional
+
+from app.models.schemas.recommendation_schemas import RecommendationItem
 
 Side = Literal["blue", "red"]
 ActionType = Literal["pick", "ban"]
-DraftMode = Literal["flex", "tournament"]
+# A format of draft_formats.json or one added with `register_format`; checked against FormatEngine.
+DraftMode = str
 DraftStatus = Literal["building", "full"]
 
 class DraftCreateIn(BaseModel):
@@ -23,6 +26,7 @@ class DraftStateOut(BaseModel):
     draftId: str
     mode: DraftMode
     status: DraftStatus
+    version: int
     blue: DraftSideState
     red: DraftSideState
     turn: DraftTurn
@@ -31,3 +35,23 @@ class DraftActionIn(BaseModel):
     type: ActionType
     side: Side
     championId: int
+    expectedVersion: Optional[int] = None
+
+class DraftActionOut(BaseModel):
+    type: ActionType
+    side: Side
+    championId: int
+
+class DraftLiveSnapshot(BaseModel):
+    event: Literal["snapshot"] = "snapshot"
+    draft: DraftStateOut
+    recommendations: Optional[List[RecommendationItem]] = None
+
+class DraftLiveAction(BaseModel):
+    event: Literal["action"] = "action"
+    draftId: str
+    version: int
+    action: DraftActionOut
+    status: DraftStatus
+    turn: DraftTurn
+    recommendations: Optional[List[RecommendationItem]] = None
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.models.schemas.draft_schemas import ActionType, DraftMode, DraftSideState, DraftStatus, Side
+
+class DraftHistorySummary(BaseModel):
+    draftId: str
+    actionCount: int
+
+class DraftHistoryEvent(BaseModel):
+    actionIndex: int
+    type: ActionType
+    side: Side
+    championId: int
+    timestamp: float
+
+class DraftHistoryEventsOut(BaseModel):
+    draftId: str
+    events: List[DraftHistoryEvent]
+
+class DraftReplayOut(BaseModel):
+    draftId: str
+    mode: DraftMode
+    status: DraftStatus
+    actionIndex: int
+    blue: DraftSideState
+    red: DraftSideState
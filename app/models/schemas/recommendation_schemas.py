@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import Optional, Literal
+from typing import Iterable, Optional, Literal
 from pydantic import BaseModel, Field
 
+from app.models.domain.recommendation import Recommendation
+
 
 class ChampionRef(BaseModel):
     id: int
@@ -40,6 +42,115 @@ class RecommendationItem(BaseModel):
     roles: list[str] = []
     reasons: list[str] = []
 
+    @classmethod
+    def from_domain(cls, recommendation: Recommendation) -> "RecommendationItem":
+        return cls(
+            championId=recommendation.champion_id,
+            score=recommendation.score,
+            roles=recommendation.roles,
+            reasons=recommendation.reasons,
+        )
+
+
+def recommendation_items(recommendations: Iterable[Recommendation]) -> list[RecommendationItem]:
+    return [RecommendationItem.from_domain(recommendation) for recommendation in recommendations]
+
+
+def recommendation_dict(recommendation: Recommendation) -> dict:
+    """`RecommendationItem.from_domain` as a plain dict, for `app.api.responses.encode_model_json`."""
+    return {
+        "championId": recommendation.champion_id,
+        "score": float(recommendation.score),
+        "roles": recommendation.roles,
+        "reasons": recommendation.reasons,
+    }
+
+
+def recommendation_json(recommendations: Iterable[Recommendation]) -> list[dict]:
+    return [recommendation_dict(recommendation) for recommendation in recommendations]
+
 
 class DraftRecommendationResponse(BaseModel):
     recommendations: list[RecommendationItem]
+
+
+class DraftRecommendationBatchItem(DraftRecommendationResponse):
+    index: int
+    error: Optional[str] = None
+
+
+class DraftSearchRequest(DraftRecommendationRequest):
+    budgetMs: int = Field(default=200, ge=1, le=10_000)
+    maxDepth: int = Field(default=6, ge=1, le=20)
+    branching: int = Field(default=5, ge=1, le=50)
+
+
+class DraftSearchStats(BaseModel):
+    sideToAct: Literal["blue", "red"] | None = None
+    actionType: Literal["pick", "ban"] | None = None
+    depthReached: int
+    nodes: int
+    nodesPerSecond: float
+    tableHits: int
+    elapsedMs: float
+    budgetMs: int
+    timedOut: bool
+
+
+class DraftSearchResponse(DraftRecommendationResponse):
+    search: DraftSearchStats
+
+
+class ProfileComparisonRequest(DraftRecommendationRequest):
+    # role -> profile names to compare; roles left out compare every profile.
+    profiles: Optional[dict[str, list[str]]] = None
+    limit: int = Field(default=10, ge=1, le=200)
+
+
+class ProfileRankingOut(BaseModel):
+    role: str
+    profile: str
+    active: bool
+    bestScore: Optional[float] = None
+    recommendations: list[RecommendationItem]
+
+
+class LineupSlotOut(BaseModel):
+    role: str
+    profile: str
+    championId: int
+    score: float
+
+
+class ProfileComparisonResponse(BaseModel):
+    profiles: list[ProfileRankingOut]
+    lineup: list[LineupSlotOut]
+    lineupScore: float
+
+
+class DraftSimulationRequest(DraftRecommendationRequest):
+    rollouts: int = Field(default=1000, ge=1, le=100_000)  # per candidate
+    candidates: Optional[list[int]] = Field(default=None, max_length=50)
+    candidateCount: int = Field(default=5, ge=1, le=50)
+    policy: Literal["random", "weighted"] = "weighted"
+    seed: int = 0
+
+
+class SimulatedCandidateOut(BaseModel):
+    championId: int
+    greedyScore: Optional[float] = None
+    mean: float
+    variance: float
+    stdev: float
+    min: float
+    max: float
+    rollouts: int
+
+
+class DraftSimulationResponse(BaseModel):
+    sideToAct: Literal["blue", "red"]
+    actionType: Literal["pick", "ban"]
+    policy: Literal["random", "weighted"]
+    workers: int
+    elapsedMs: float
+    candidates: list[SimulatedCandidateOut]
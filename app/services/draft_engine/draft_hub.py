@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+# Queued in place of dropped messages when a subscriber falls behind; it must reload the full state.
+RESYNC = (0, "")
+
+# (draft version, encoded message)
+LiveMessage = Tuple[int, str]
+
+
+class DraftSubscriber:
+    """One live connection: a bounded queue owned by the event loop that created it."""
+
+    def __init__(self, draft_id: str, side: Optional[str], max_queue: int):
+        self.draft_id = draft_id
+        self.side = side
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._loop = asyncio.get_running_loop()
+
+    async def next_message(self) -> LiveMessage:
+        return await self.queue.get()
+
+    def _send(self, message: LiveMessage) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, message)
+        except RuntimeError:
+            # Event loop already closed: the connection is gone.
+            pass
+
+    def _deliver(self, message: LiveMessage) -> None:
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            return
+        self.queue.put_nowait(message)
+
+
+class DraftHub:
+    """In-process fan-out of draft updates to WebSocket/SSE subscribers.
+
+    `publish` builds one message per subscribed side (None = observer without a
+    side) and sends the same encoded string to every subscriber of that side,
+    so recommendations are scored once per action however many viewers listen.
+    Nothing is computed for drafts without subscribers.
+    """
+
+    def __init__(self, max_queue: int = 32):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[DraftSubscriber]] = {}
+        self._published_versions: Dict[str, int] = {}
+
+    def subscribe(self, draft_id: str, side: Optional[str]) -> DraftSubscriber:
+        subscriber = DraftSubscriber(draft_id, side, self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(draft_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: DraftSubscriber) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.draft_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.draft_id]
+                self._published_versions.pop(subscriber.draft_id, None)
+
+    def has_subscribers(self, draft_id: str) -> bool:
+        return bool(self._subscribers.get(draft_id))
+
+    def publish(self, draft_id: str, version: int, build_message: Callable[[Optional[str]], str]) -> int:
+        """Send `build_message(side)` to the subscribers of each side; returns the number of deliveries.
+
+        Updates may be published from several worker threads; a version older
+        than one already published for the draft is dropped.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(draft_id, ()))
+            if not subscribers or version <= self._published_versions.get(draft_id, 0):
+                return 0
+        by_side: Dict[Optional[str], List[DraftSubscriber]] = {}
+        for subscriber in subscribers:
+            by_side.setdefault(subscriber.side, []).append(subscriber)
+        messages = {side: build_message(side) for side in by_side}
+
+        with self._lock:
+            if version <= self._published_versions.get(draft_id, 0):
+                return 0
+            if draft_id in self._subscribers:
+                self._published_versions[draft_id] = version
+            for side, side_subscribers in by_side.items():
+                for subscriber in side_subscribers:
+                    subscriber._send((version, messages[side]))
+        return len(subscribers)
+
+
+_hub: Optional[DraftHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_draft_hub() -> DraftHub:
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = DraftHub(max_queue=settings.live_queue_size)
+    return _hub
@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional
+
+from app.models.schemas.recommendation_schemas import (
+    ChampionRef,
+    DraftRecommendationRequest,
+    DraftState,
+    SideState,
+    TargetSlot,
+)
+from app.services.draft_engine.format_engine import TEAM_SIZE, FormatEngine
+from app.services.storage.champion_index import ChampionIndex
+from app.services.draft_engine.validators import DraftValidationError, ensure_not_picked_or_banned
+
+
+def new_draft_state(draft_id: str, mode: str) -> Dict[str, Any]:
+    return {
+        "draftId": draft_id,
+        "mode": mode,
+        "status": "building",
+        "blue": {"picks": [], "bans": []},
+        "red": {"picks": [], "bans": []},
+        "actionsDone": 0,
+    }
+
+
+def apply_draft_action(
+    state: Dict[str, Any],
+    action_type: str,
+    side: str,
+    champion_id: int,
+    fmt: FormatEngine,
+) -> Dict[str, Any]:
+    """Validate one pick/ban against the format turn and apply it to `state` in place."""
+    turn = fmt.get_turn(state["mode"], state["actionsDone"])
+    if side != turn.side_to_act or action_type != turn.action_type:
+        raise DraftValidationError("Not your turn / invalid action for this phase")
+
+    ensure_not_picked_or_banned(champion_id, state["blue"], state["red"])
+
+    bucket = state[side]
+    key = "picks" if action_type == "pick" else "bans"
+    bucket[key].append(champion_id)
+    state["actionsDone"] += 1
+
+    if state["actionsDone"] >= fmt.total_actions(state["mode"]):
+        state["status"] = "full"
+    return state
+
+
+def recommendation_request(
+    state: Dict[str, Any],
+    our_side: str,
+    champion_index: ChampionIndex,
+    fmt: FormatEngine,
+) -> DraftRecommendationRequest:
+    """Build the `/draft/recommendations` payload for one side of a stored draft."""
+    turn = fmt.get_turn(state["mode"], state["actionsDone"])
+    key = "picks" if turn.action_type == "pick" else "bans"
+    return DraftRecommendationRequest(
+        format=state["mode"],
+        ourSide=our_side,
+        draftState=DraftState(
+            picks=SideState(
+                blue=_slots(state["blue"]["picks"], champion_index, TEAM_SIZE),
+                red=_slots(state["red"]["picks"], champion_index, TEAM_SIZE),
+            ),
+            bans=SideState(
+                blue=_slots(state["blue"]["bans"], champion_index),
+                red=_slots(state["red"]["bans"], champion_index),
+            ),
+        ),
+        target=TargetSlot(
+            type=turn.action_type,
+            side=turn.side_to_act,
+            idx=len(state[turn.side_to_act][key]),
+        ),
+    )
+
+
+def _slots(champion_ids: List[int], champion_index: ChampionIndex, size: int = 0) -> List[Optional[ChampionRef]]:
+    slots: List[Optional[ChampionRef]] = []
+    for champion_id in champion_ids:
+        champion = champion_index.get(champion_id) or {}
+        slots.append(ChampionRef(
+            id=champion_id,
+            name=champion.get("name", ""),
+            slug=champion.get("slug", ""),
+            img=champion.get("img", ""),
+        ))
+    slots.extend([None] * (size - len(slots)))
+    return slots
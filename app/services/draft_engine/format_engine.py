@@ -1,5 +1,9 @@
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
+
+DRAFT_FORMATS_FILE = "configs/draft_formats.json"
+TEAM_SIZE = 5
 
 @dataclass(frozen=True)
 class TurnInfo:
@@ -8,33 +12,115 @@ class TurnInfo:
     action_type: str   # "pick" | "ban"
     remaining_in_phase: int
 
+class FormatConfigError(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class CompiledFormat:
+    """One draft format flattened to a turn per action index."""
+    name: str
+    phases: Tuple[Dict[str, Any], ...]
+    turns: Tuple[TurnInfo, ...]
+    # Returned once every action is done: the last phase with nothing remaining.
+    final_turn: TurnInfo
+
+    @property
+    def total_actions(self) -> int:
+        return len(self.turns)
+
+def compile_format(name: str, config: Any) -> CompiledFormat:
+    """Validate one format definition and expand its phases into a flat turn table."""
+    if not isinstance(config, dict) or not isinstance(config.get("phases"), list) or not config["phases"]:
+        raise FormatConfigError(f"Format {name!r} must define a non-empty 'phases' list")
+
+    turns: List[TurnInfo] = []
+    picks = {"blue": 0, "red": 0}
+    for i, ph in enumerate(config["phases"]):
+        if not isinstance(ph, dict):
+            raise FormatConfigError(f"Format {name!r} phase {i} must be an object")
+        action_type, side, count = ph.get("type"), ph.get("side"), ph.get("count")
+        if action_type not in ("pick", "ban"):
+            raise FormatConfigError(f"Format {name!r} phase {i}: type must be 'pick' or 'ban', got {action_type!r}")
+        if side not in ("blue", "red"):
+            raise FormatConfigError(f"Format {name!r} phase {i}: side must be 'blue' or 'red', got {side!r}")
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+            raise FormatConfigError(f"Format {name!r} phase {i}: count must be a positive integer, got {count!r}")
+        if action_type == "pick":
+            picks[side] += count
+            if picks[side] > TEAM_SIZE:
+                raise FormatConfigError(f"Format {name!r} gives {side} more than {TEAM_SIZE} picks")
+        for done in range(count):
+            turns.append(TurnInfo(
+                phase_index=i,
+                side_to_act=side,
+                action_type=action_type,
+                remaining_in_phase=count - done,
+            ))
+
+    phases = tuple(dict(ph) for ph in config["phases"])
+    last = phases[-1]
+    return CompiledFormat(
+        name=name,
+        phases=phases,
+        turns=tuple(turns),
+        final_turn=TurnInfo(
+            phase_index=len(phases) - 1,
+            side_to_act=last["side"],
+            action_type=last["type"],
+            remaining_in_phase=0,
+        ),
+    )
+
+_REGISTERED_FORMATS: Dict[str, CompiledFormat] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+def register_format(name: str, config: Dict[str, Any]) -> CompiledFormat:
+    """Make a custom format available to every FormatEngine in this process.
+
+    Formats from draft_formats.json take precedence over registered ones with the same name.
+    """
+    compiled = compile_format(name, config)
+    with _REGISTRY_LOCK:
+        _REGISTERED_FORMATS[name] = compiled
+    return compiled
+
+def unregister_format(name: str) -> None:
+    with _REGISTRY_LOCK:
+        _REGISTERED_FORMATS.pop(name, None)
+
 class FormatEngine:
     def __init__(self, format_config: Dict[str, Any]):
+        if not isinstance(format_config, dict):
+            raise FormatConfigError("Draft formats config must be an object keyed by format name")
         self.format_config = format_config
+        self._compiled = {name: compile_format(name, config) for name, config in format_config.items()}
+
+    def compiled(self, mode: str) -> CompiledFormat:
+        compiled = self._compiled.get(mode)
+        if compiled is None:
+            compiled = _REGISTERED_FORMATS.get(mode)
+            if compiled is None:
+                raise KeyError(mode)
+        return compiled
+
+    def has_format(self, mode: str) -> bool:
+        return mode in self._compiled or mode in _REGISTERED_FORMATS
 
     def phases(self, mode: str):
-        return self.format_config[mode]["phases"]
+        return list(self.compiled(mode).phases)
+
+    def turns(self, mode: str) -> Tuple[TurnInfo, ...]:
+        return self.compiled(mode).turns
 
     def total_actions(self, mode: str) -> int:
-        return sum(p["count"] for p in self.phases(mode))
+        return len(self.compiled(mode).turns)
 
     def get_turn(self, mode: str, actions_done: int) -> TurnInfo:
-        phases = self.phases(mode)
-        remaining = actions_done
-        for i, ph in enumerate(phases):
-            if remaining < ph["count"]:
-                return TurnInfo(
-                    phase_index=i,
-                    side_to_act=ph["side"],
-                    action_type=ph["type"],
-                    remaining_in_phase=ph["count"] - remaining,
-                )
-            remaining -= ph["count"]
-
-        last = phases[-1]
-        return TurnInfo(
-            phase_index=len(phases) - 1,
-            side_to_act=last["side"],
-            action_type=last["type"],
-            remaining_in_phase=0,
-        )
+        compiled = self.compiled(mode)
+        if 0 <= actions_done < len(compiled.turns):
+            return compiled.turns[actions_done]
+        return compiled.final_turn
+
+def get_format_engine(loader) -> FormatEngine:
+    """The engine for the loader's current draft_formats.json, compiled once per file generation."""
+    return loader.snapshot.derive("format_engine", [DRAFT_FORMATS_FILE], FormatEngine)
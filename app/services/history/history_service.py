@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import copy
+import json
+import math
+import os
+import struct
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.draft_engine.draft_state import apply_draft_action, new_draft_state
+from app.services.draft_engine.format_engine import FormatEngine
+
+# Index record: draft uuid, event sequence number, record kind, byte offset and length in the segment.
+INDEX_RECORD = struct.Struct("<16sHBQI")
+
+KIND_CREATED = 0
+KIND_ACTION = 1
+KIND_SNAPSHOT = 2
+
+
+class DraftHistoryError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class _Location:
+    segment: str
+    offset: int
+    length: int
+
+
+@dataclass
+class _DraftIndex:
+    created: Optional[_Location] = None
+    # `ts` of the created record; drafts whose creation is not indexed yet sort last.
+    created_at: float = math.inf
+    # Sequence number n is the n-th action (1-based); snapshot n is the state after n actions.
+    actions: Dict[int, _Location] = field(default_factory=dict)
+    snapshots: Dict[int, _Location] = field(default_factory=dict)
+
+    @property
+    def action_count(self) -> int:
+        return max(self.actions, default=0)
+
+
+class DraftHistory:
+    """Append-only event log of draft actions with periodic state snapshots.
+
+    Records are compact JSON lines in segment files (`<writer>-<n>.log`); each
+    segment has a fixed-width binary `.idx` file mapping (draft, sequence) to a
+    byte range. Every process writes its own segments, and the in-memory index
+    tails every `.idx` file, so several workers can share one history directory.
+    Replaying a draft starts from the nearest snapshot at or before the target
+    action, so it costs O(actions since last snapshot).
+    """
+
+    def __init__(self, base_dir: str, snapshot_interval: int = 5, segment_max_bytes: int = 8 * 1024 * 1024):
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.segment_max_bytes = segment_max_bytes
+        self._writer_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._segment_number = 0
+        self._lock = threading.Lock()
+        self._index: Dict[str, _DraftIndex] = {}
+        # Draft ids in first-seen order, re-sorted by creation time when `_order_sorted` is False.
+        self._order: List[str] = []
+        self._order_sorted = True
+        self._index_offsets: Dict[str, int] = {}
+        self._index_sizes: Dict[str, int] = {}
+
+    # Writing
+
+    def record_created(self, state: Dict[str, Any]) -> None:
+        draft_id = state["draftId"]
+        created_at = time.time()
+        self._append(
+            draft_id,
+            0,
+            KIND_CREATED,
+            {"d": draft_id, "k": "created", "mode": state["mode"], "ts": created_at},
+            created_at=created_at,
+        )
+
+    def record_action(self, state: Dict[str, Any], action_type: str, side: str, champion_id: int) -> None:
+        """Record the action that produced `state` (the state *after* applying it)."""
+        draft_id = state["draftId"]
+        seq = state["actionsDone"]
+        self._append(
+            draft_id,
+            seq,
+            KIND_ACTION,
+            {"d": draft_id, "k": "action", "n": seq, "t": action_type, "s": side, "c": champion_id, "ts": time.time()},
+        )
+        if seq % self.snapshot_interval == 0 or state["status"] == "full":
+            self._append(draft_id, seq, KIND_SNAPSHOT, {"d": draft_id, "k": "snapshot", "n": seq, "state": state})
+
+    # Reading
+
+    def list_drafts(self, offset: int = 0, limit: int = 50) -> List[Tuple[str, int]]:
+        """(draftId, action count) pairs in creation order (timestamp of the created record)."""
+        self._refresh_index()
+        with self._lock:
+            if not self._order_sorted:
+                # Stable: drafts created in the same instant keep their first-seen order.
+                self._order.sort(key=lambda draft_id: self._index[draft_id].created_at)
+                self._order_sorted = True
+            draft_ids = self._order[offset:offset + limit]
+            return [(draft_id, self._index[draft_id].action_count) for draft_id in draft_ids]
+
+    def draft_mode(self, draft_id: str) -> str:
+        entry = self._draft(draft_id)
+        if entry.created is None:
+            raise DraftHistoryError(f"Draft {draft_id} has no creation record")
+        return self._read(entry.created)["mode"]
+
+    def events(self, draft_id: str) -> List[Dict[str, Any]]:
+        entry = self._draft(draft_id)
+        return [self._read(entry.actions[seq]) for seq in sorted(entry.actions)]
+
+    def replay(self, draft_id: str, fmt: FormatEngine, action_index: Optional[int] = None) -> Dict[str, Any]:
+        """State of `draft_id` after `action_index` actions (all recorded actions by default)."""
+        entry = self._draft(draft_id)
+        target = entry.action_count if action_index is None else action_index
+        if target < 0 or target > entry.action_count:
+            raise DraftHistoryError(f"Draft {draft_id} has {entry.action_count} recorded actions")
+
+        base_seq = max((seq for seq in entry.snapshots if seq <= target), default=0)
+        if base_seq:
+            state = copy.deepcopy(self._read(entry.snapshots[base_seq])["state"])
+        else:
+            state = new_draft_state(draft_id, self.draft_mode(draft_id))
+        for seq in range(base_seq + 1, target + 1):
+            location = entry.actions.get(seq)
+            if location is None:
+                raise DraftHistoryError(f"Draft {draft_id} is missing action {seq}")
+            event = self._read(location)
+            apply_draft_action(state, event["t"], event["s"], event["c"], fmt)
+        return state
+
+    # Storage
+
+    def _append(
+        self,
+        draft_id: str,
+        seq: int,
+        kind: int,
+        record: Dict[str, Any],
+        created_at: Optional[float] = None,
+    ) -> None:
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            segment = self._current_segment(len(line))
+            log_path = self.base_dir / f"{segment}.log"
+            with log_path.open("ab") as log_file:
+                offset = log_file.tell()
+                log_file.write(line)
+            index_record = INDEX_RECORD.pack(uuid.UUID(draft_id).bytes, seq, kind, offset, len(line))
+            with (self.base_dir / f"{segment}.idx").open("ab") as index_file:
+                index_file.write(index_record)
+            self._index_record(draft_id, seq, kind, _Location(segment, offset, len(line)), created_at)
+            index_name = f"{segment}.idx"
+            self._index_offsets[index_name] = self._index_offsets.get(index_name, 0) + INDEX_RECORD.size
+            self._index_sizes[index_name] = self._index_offsets[index_name]
+
+    def _current_segment(self, incoming: int) -> str:
+        segment = f"{self._writer_id}-{self._segment_number:06d}"
+        log_path = self.base_dir / f"{segment}.log"
+        size = log_path.stat().st_size if log_path.exists() else 0
+        if size and size + incoming > self.segment_max_bytes:
+            self._segment_number += 1
+            segment = f"{self._writer_id}-{self._segment_number:06d}"
+        return segment
+
+    def _read(self, location: _Location) -> Dict[str, Any]:
+        with (self.base_dir / f"{location.segment}.log").open("rb") as log_file:
+            log_file.seek(location.offset)
+            return json.loads(log_file.read(location.length))
+
+    def _draft(self, draft_id: str) -> _DraftIndex:
+        self._refresh_index()
+        entry = self._index.get(draft_id)
+        if entry is None:
+            raise KeyError(draft_id)
+        return entry
+
+    def _refresh_index(self) -> None:
+        """Tail every segment index, picking up records written by other processes."""
+        with self._lock:
+            with os.scandir(self.base_dir) as entries:
+                for dir_entry in entries:
+                    if not dir_entry.name.endswith(".idx"):
+                        continue
+                    size = dir_entry.stat().st_size
+                    if size == self._index_sizes.get(dir_entry.name):
+                        continue
+                    self._index_sizes[dir_entry.name] = size
+                    self._tail_index(Path(dir_entry.path), size)
+
+    def _tail_index(self, index_path: Path, size: int) -> None:
+        read_bytes = self._index_offsets.get(index_path.name, 0)
+        complete = size - (size - read_bytes) % INDEX_RECORD.size
+        if complete <= read_bytes:
+            return
+        with index_path.open("rb") as index_file:
+            index_file.seek(read_bytes)
+            data = index_file.read(complete - read_bytes)
+        segment = index_path.stem
+        with (self.base_dir / f"{segment}.log").open("rb") as log_file:
+            for draft_bytes, seq, kind, offset, length in INDEX_RECORD.iter_unpack(data):
+                created_at = None
+                if kind == KIND_CREATED:
+                    log_file.seek(offset)
+                    created_at = json.loads(log_file.read(length)).get("ts", math.inf)
+                location = _Location(segment, offset, length)
+                self._index_record(str(uuid.UUID(bytes=draft_bytes)), seq, kind, location, created_at)
+        self._index_offsets[index_path.name] = complete
+
+    def _index_record(
+        self,
+        draft_id: str,
+        seq: int,
+        kind: int,
+        location: _Location,
+        created_at: Optional[float] = None,
+    ) -> None:
+        entry = self._index.get(draft_id)
+        if entry is None:
+            entry = _DraftIndex()
+            self._index[draft_id] = entry
+            self._order.append(draft_id)
+        if kind == KIND_CREATED:
+            entry.created = location
+            if created_at is not None:
+                entry.created_at = created_at
+            self._order_sorted = False
+        elif kind == KIND_ACTION:
+            entry.actions[seq] = location
+        else:
+            entry.snapshots[seq] = location
+
+
+_history: Optional[DraftHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_draft_history() -> Optional[DraftHistory]:
+    global _history
+    if not settings.history_enabled:
+        return None
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                _history = DraftHistory(
+                    settings.history_dir,
+                    snapshot_interval=settings.history_snapshot_interval,
+                    segment_max_bytes=settings.history_segment_bytes,
+                )
+    return _history
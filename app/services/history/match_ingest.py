@@ -0,0 +1,413 @@
+"""Streaming ingestion of match exports into champion and pair statistics.
+
+    python -m app.services.history.match_ingest exports/*.jsonl.gz --stats match_stats.npz
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.history.pair_stats import DEFAULT_PRIOR_GAMES, build_pair_store
+from app.services.history.scoring_systems import BLUE, PICKS_PER_SIDE, RED, MatchBatch, MatchStats
+from app.services.storage.data_loader import ROLE_ORDER
+
+try:
+    import fcntl
+except ImportError:  # Windows: no guard against concurrent ingestions.
+    fcntl = None
+
+logger = get_logger(__name__)
+
+FORMATS = ("jsonl", "csv")
+DEFAULT_CHUNK_SIZE = 50_000
+# Counts and checkpoint are saved at least this often, so an interrupted run loses little work.
+CHECKPOINT_RECORDS = 1_000_000
+# Leading bytes hashed to recognise a source that was replaced rather than appended to.
+FINGERPRINT_BYTES = 64 * 1024
+READ_BUFFER_BYTES = 1024 * 1024
+
+_WINNERS = {"blue": BLUE, "red": RED}
+_ROLE_CODES = {role: idx for idx, role in enumerate(ROLE_ORDER)}
+# Row of a parsed match: blue picks, red picks, blue bans, red bans, winner, blue roles, red roles.
+_Row = Tuple[List[int], List[int], List[int], List[int], int, List[str], List[str]]
+
+
+class MatchIngestError(Exception):
+    pass
+
+
+@dataclass
+class SourceCheckpoint:
+    """How far a source file was ingested: `offset` is in its decompressed bytes."""
+
+    offset: int
+    records: int
+    skipped: int
+    fingerprint: str
+    fingerprint_bytes: int
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SourceCheckpoint":
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "offset": self.offset,
+            "records": self.records,
+            "skipped": self.skipped,
+            "fingerprint": self.fingerprint,
+            "fingerprint_bytes": self.fingerprint_bytes,
+        }
+
+
+@dataclass(frozen=True)
+class IngestResult:
+    files: int
+    records: int
+    skipped: int
+    matches: int
+    elapsed_seconds: float
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+def ingest_matches(
+    paths: Sequence[Path],
+    stats_path: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fmt: Optional[str] = None,
+    pair_store_path: Optional[Path] = None,
+    prior_games: float = DEFAULT_PRIOR_GAMES,
+) -> IngestResult:
+    """Fold the records of `paths` not ingested yet into the statistics at `stats_path`.
+
+    Sources are read sequentially, `chunk_size` records at a time, so memory
+    does not grow with the file size. Each source resumes from its checkpoint
+    offset; a source whose leading bytes changed was replaced, not appended
+    to, and is refused because re-reading it would count its matches twice.
+    A trailing line without a newline is left for the next run.
+    With `pair_store_path`, the memory-mapped pair store is rebuilt from the
+    updated counts at the end.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    started = time.perf_counter()
+    stats_path = Path(stats_path)
+    records = skipped = 0
+    with _ingest_lock(stats_path):
+        stats, checkpoint = MatchStats.load(stats_path)
+        sources = {key: SourceCheckpoint.from_dict(value) for key, value in checkpoint.get("sources", {}).items()}
+
+        def save() -> None:
+            stats.save(stats_path, {"sources": {key: source.to_dict() for key, source in sources.items()}})
+
+        for path in paths:
+            path = Path(path)
+            source_fmt = fmt or _detect_format(path)
+            if source_fmt not in FORMATS:
+                raise MatchIngestError(f"Unknown match export format: {source_fmt}")
+            key = str(path.resolve())
+            source = _resume(path, sources.get(key))
+            sources[key] = source
+            unsaved = 0
+            with _open(path) as stream:
+                for batch, bad, offset in _batches(stream, source_fmt, source.offset, chunk_size):
+                    stats.add(batch)
+                    source.offset = offset
+                    source.records += len(batch) + bad
+                    source.skipped += bad
+                    records += len(batch) + bad
+                    skipped += bad
+                    unsaved += len(batch) + bad
+                    if unsaved >= CHECKPOINT_RECORDS:
+                        save()
+                        unsaved = 0
+            save()
+            logger.info(
+                "match export ingested",
+                extra={"path": str(path), "records": source.records, "skipped": source.skipped},
+            )
+        if pair_store_path is not None:
+            build_pair_store(stats, Path(pair_store_path), prior_games=prior_games)
+    return IngestResult(
+        files=len(paths),
+        records=records,
+        skipped=skipped,
+        matches=stats.matches,
+        elapsed_seconds=time.perf_counter() - started,
+    )
+
+
+def _detect_format(path: Path) -> str:
+    suffixes = [suffix.lower() for suffix in path.suffixes if suffix.lower() != ".gz"]
+    last = suffixes[-1] if suffixes else ""
+    if last in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if last == ".csv":
+        return "csv"
+    raise MatchIngestError(f"Cannot tell the format of {path}; pass it explicitly")
+
+
+def _resume(path: Path, source: Optional[SourceCheckpoint]) -> SourceCheckpoint:
+    if source is None:
+        fingerprint_bytes = min(path.stat().st_size, FINGERPRINT_BYTES)
+        return SourceCheckpoint(0, 0, 0, _fingerprint(path, fingerprint_bytes), fingerprint_bytes)
+    replaced = (
+        path.stat().st_size < source.fingerprint_bytes
+        or _fingerprint(path, source.fingerprint_bytes) != source.fingerprint
+    )
+    if replaced:
+        raise MatchIngestError(f"{path} changed since it was last ingested; rebuild the statistics from scratch")
+    return source
+
+
+def _fingerprint(path: Path, length: int) -> str:
+    with path.open("rb") as handle:
+        return hashlib.blake2b(handle.read(length), digest_size=16).hexdigest()
+
+
+@contextmanager
+def _open(path: Path) -> Iterator[BinaryIO]:
+    """Decompressed byte stream of `path`, gzip being recognised by its magic bytes."""
+    with path.open("rb", buffering=READ_BUFFER_BYTES) as raw:
+        if raw.peek(2)[:2] != b"\x1f\x8b":
+            yield raw
+            return
+        with gzip.GzipFile(fileobj=raw, mode="rb") as stream:
+            yield stream
+
+
+@contextmanager
+def _ingest_lock(stats_path: Path) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    lock_path = stats_path.with_name(f".{stats_path.name}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open("a") as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise MatchIngestError(f"Another ingestion is updating {stats_path}") from None
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _batches(
+    stream: BinaryIO,
+    fmt: str,
+    offset: int,
+    chunk_size: int,
+) -> Iterator[Tuple[MatchBatch, int, int]]:
+    """(batch, malformed records, offset after it) per chunk of complete lines after `offset`."""
+    header: Optional[List[str]] = None
+    if fmt == "csv":
+        first = stream.readline()
+        if not first.endswith(b"\n"):
+            return
+        header = next(csv.reader([first.decode("utf-8-sig")]))
+        offset = max(offset, len(first))
+    stream.seek(offset)
+    lines: List[bytes] = []
+    for line in stream:
+        if not line.endswith(b"\n"):
+            break
+        lines.append(line)
+        offset += len(line)
+        if len(lines) == chunk_size:
+            yield (*_parse_chunk(lines, fmt, header), offset)
+            lines = []
+    if lines:
+        yield (*_parse_chunk(lines, fmt, header), offset)
+
+
+def _parse_chunk(lines: List[bytes], fmt: str, header: Optional[List[str]]) -> Tuple[MatchBatch, int]:
+    rows: List[_Row] = []
+    bad = 0
+    if fmt == "jsonl":
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                rows.append(_json_row(json.loads(line)))
+            except (ValueError, TypeError, KeyError, AttributeError):
+                bad += 1
+    else:
+        for record in csv.DictReader((line.decode("utf-8") for line in lines), fieldnames=header):
+            try:
+                rows.append(_csv_row(record))
+            except (ValueError, TypeError, KeyError, AttributeError):
+                bad += 1
+    try:
+        return _to_batch(rows), bad
+    except (ValueError, TypeError):
+        pass
+    # Some row holds a null slot, a non-integer or a negative id: clean rows one by one.
+    clean: List[_Row] = []
+    for blue, red, blue_bans, red_bans, winner, blue_roles, red_roles in rows:
+        try:
+            blue, blue_roles = _picks(blue, blue_roles)
+            red, red_roles = _picks(red, red_roles)
+            clean.append((blue, red, _ids(blue_bans), _ids(red_bans), winner, blue_roles, red_roles))
+        except (ValueError, TypeError):
+            bad += 1
+    return _to_batch(clean), bad
+
+
+def _json_row(record: Dict[str, Any]) -> _Row:
+    """`{"picks": {"blue": [...], "red": [...]}, "bans": {...}, "roles": {...}, "winner": "blue" | "red"}`.
+
+    Null pick slots are ignored; `roles`, optional, lists the role of each pick slot.
+    """
+    picks, bans, roles = record["picks"], record.get("bans") or {}, record.get("roles") or {}
+    return (
+        _list(picks.get("blue")),
+        _list(picks.get("red")),
+        _list(bans.get("blue")),
+        _list(bans.get("red")),
+        _WINNERS[record["winner"]],
+        _list(roles.get("blue")),
+        _list(roles.get("red")),
+    )
+
+
+def _csv_row(record: Dict[str, Optional[str]]) -> _Row:
+    """`winner,blue_picks,red_picks[,blue_bans,red_bans,blue_roles,red_roles]`, lists `;`-separated.
+
+    Other columns are ignored.
+    """
+    return (
+        _ids(_split(record["blue_picks"])),
+        _ids(_split(record["red_picks"])),
+        _ids(_split(record.get("blue_bans"))),
+        _ids(_split(record.get("red_bans"))),
+        _WINNERS[record["winner"].strip()],
+        _split(record.get("blue_roles")),
+        _split(record.get("red_roles")),
+    )
+
+
+def _list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    if type(value) is not list:
+        raise TypeError("expected a list of champion ids")
+    return value
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part for part in (value or "").replace(" ", "").split(";") if part]
+
+
+def _picks(values: Sequence[Any], roles: Sequence[Any]) -> Tuple[List[int], List[Any]]:
+    """Ids of the filled pick slots with the role of the same slot."""
+    filled = [idx for idx, value in enumerate(values) if value is not None]
+    return _ids([values[idx] for idx in filled]), [roles[idx] if idx < len(roles) else None for idx in filled]
+
+
+def _ids(values: Sequence[Any]) -> List[int]:
+    ids = [int(value) for value in values if value is not None]
+    if any(champ_id < 0 for champ_id in ids):
+        raise ValueError("negative champion id")
+    return ids
+
+
+def _to_batch(rows: List[_Row]) -> MatchBatch:
+    """Pad the rows into fixed-width arrays; a side with more than `PICKS_PER_SIDE` picks is truncated.
+
+    Ids are converted by numpy for the whole chunk; a `ValueError`/`TypeError`
+    means some row needs cleaning first.
+    """
+    ban_width = max((max(len(row[2]), len(row[3])) for row in rows), default=0)
+    pick_pad = [-1] * PICKS_PER_SIDE
+    ban_pad = [-1] * ban_width
+    picks: List[List[int]] = []
+    roles: List[List[int]] = []
+    bans: List[List[int]] = []
+    ids = 0
+    for blue, red, blue_bans, red_bans, _winner, blue_roles, red_roles in rows:
+        blue, red = blue[:PICKS_PER_SIDE], red[:PICKS_PER_SIDE]
+        picks.append(blue + pick_pad[len(blue):])
+        picks.append(red + pick_pad[len(red):])
+        roles.append(_role_codes(blue_roles, len(blue)))
+        roles.append(_role_codes(red_roles, len(red)))
+        bans.append(blue_bans + ban_pad[len(blue_bans):])
+        bans.append(red_bans + ban_pad[len(red_bans):])
+        ids += len(blue) + len(red) + len(blue_bans) + len(red_bans)
+    pick_array = np.array(picks, dtype=np.int64).reshape(len(rows), 2, PICKS_PER_SIDE)
+    ban_array = np.array(bans, dtype=np.int64).reshape(len(rows), 2, ban_width)
+    # Padding is the only `-1`; fewer non-negative values than ids means a negative id.
+    if np.count_nonzero(pick_array >= 0) + np.count_nonzero(ban_array >= 0) != ids:
+        raise ValueError("negative champion id")
+    winners = np.fromiter((row[4] for row in rows), dtype=np.int64, count=len(rows))
+    role_array = np.array(roles, dtype=np.int64).reshape(pick_array.shape)
+    return MatchBatch(picks=pick_array, roles=role_array, bans=ban_array, winners=winners)
+
+
+def _role_codes(roles: Sequence[Any], picks: int) -> List[int]:
+    """ROLE_ORDER index of the role of each of the `picks` filled slots, padded to `PICKS_PER_SIDE`; `-1` if unknown."""
+    codes = [_ROLE_CODES.get(role, -1) if isinstance(role, str) else -1 for role in roles[:picks]]
+    return codes + [-1] * (PICKS_PER_SIDE - len(codes))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.services.history.match_ingest",
+        description=__doc__.splitlines()[0],
+    )
+    parser.add_argument("paths", nargs="+", type=Path, help="JSONL or CSV match exports, optionally gzip-compressed")
+    parser.add_argument("--stats", type=Path, default=Path(settings.match_stats_path), help="statistics file to update")
+    parser.add_argument("--format", choices=FORMATS, help="format of every source (default: from the file suffix)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="records aggregated per batch")
+    parser.add_argument(
+        "--pair-store",
+        default=settings.pair_stats_path,
+        help="pair statistics file read by the scoring engine ('' to skip)",
+    )
+    parser.add_argument(
+        "--prior-games",
+        type=float,
+        default=DEFAULT_PRIOR_GAMES,
+        help="pseudo-games shrinking pair deltas of rarely seen pairs",
+    )
+    args = parser.parse_args(argv)
+    try:
+        result = ingest_matches(
+            args.paths,
+            args.stats,
+            chunk_size=args.chunk_size,
+            fmt=args.format,
+            pair_store_path=Path(args.pair_store) if args.pair_store else None,
+            prior_games=args.prior_games,
+        )
+    except (MatchIngestError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(
+        f"{result.records} new records ({result.skipped} skipped) from {result.files} file(s)"
+        f" in {result.elapsed_seconds:.1f}s ({result.records_per_second:,.0f}/s);"
+        f" {result.matches} matches in {args.stats}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
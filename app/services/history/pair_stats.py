@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.storage.atomic_file import aligned, atomic_write
+from app.services.storage.data_loader import ROLE_ORDER
+
+if TYPE_CHECKING:
+    from app.services.history.scoring_systems import MatchStats
+
+logger = get_logger(__name__)
+
+# Magic, format version, champion count, role count, matches, prior games.
+HEADER = struct.Struct("<8sIIIQd")
+MAGIC = b"DRPAIRS1"
+VERSION = 1
+DEFAULT_PRIOR_GAMES = 50.0
+
+
+class PairStatsError(Exception):
+    pass
+
+
+class PairStatsStore:
+    """Read-only view of a pair-statistics file through one shared `mmap`.
+
+    Opening reads the fixed header and builds typed `memoryview`s over the
+    mapping; values are read straight from the page cache, so every worker
+    process mapping the same file shares one copy. Values are win-rate
+    deltas: `ally[a, b]` is how much more `a` wins with `b` on its team than
+    their own win rates predict, `opponent[a, b]` how much more `a` wins
+    against `b`. `role_ally[r, a, b]` / `role_opponent[r, a, b]` are the same
+    with `a` playing role `r` (ROLE_ORDER), shrunk towards the overall value.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            stat = os.fstat(handle.fileno())
+            self.file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if stat.st_size < HEADER.size:
+                raise PairStatsError(f"{self.path} is not a pair statistics file")
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, role_count, self.matches, self.prior_games = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise PairStatsError(f"{self.path} is not a version {VERSION} pair statistics file")
+        if role_count != len(ROLE_ORDER):
+            raise PairStatsError(f"{self.path} has {role_count} roles, expected {len(ROLE_ORDER)}")
+        if stat.st_size != _offsets(size, role_count)["end"]:
+            raise PairStatsError(f"{self.path} is truncated")
+        self.size = size
+        self._role_planes = {role: idx for idx, role in enumerate(ROLE_ORDER)}
+        view = memoryview(self._map)
+        offsets = _offsets(size, role_count)
+        self.champion_ids = view[offsets["champion_ids"]:offsets["ally"]].cast("q")
+        self.columns: Dict[int, int] = {champ_id: column for column, champ_id in enumerate(self.champion_ids)}
+        if size:
+            self.ally = _matrix(view, offsets["ally"], (size, size))
+            self.opponent = _matrix(view, offsets["opponent"], (size, size))
+            self.role_ally = _matrix(view, offsets["role_ally"], (role_count, size, size))
+            self.role_opponent = _matrix(view, offsets["role_opponent"], (role_count, size, size))
+
+    def deltas(
+        self,
+        champion_id: int,
+        role: str,
+        our_picks: Iterable[int],
+        enemy_picks: Iterable[int],
+    ) -> Tuple[float, float]:
+        """(synergy with `our_picks`, matchup against `enemy_picks`) of `champion_id` playing `role`.
+
+        Sums run over the picks in ascending id order, so every engine adds the
+        same floats in the same order. Champions missing from the file add nothing.
+        """
+        column = self.columns.get(champion_id)
+        if column is None:
+            return 0.0, 0.0
+        columns = self.columns
+        plane = self._role_planes.get(role)
+        synergy = 0.0
+        for champ_id in sorted(our_picks):
+            other = columns.get(champ_id)
+            if other is None:
+                continue
+            synergy += self.ally[column, other] if plane is None else self.role_ally[plane, column, other]
+        matchup = 0.0
+        for champ_id in sorted(enemy_picks):
+            other = columns.get(champ_id)
+            if other is None:
+                continue
+            matchup += self.opponent[column, other] if plane is None else self.role_opponent[plane, column, other]
+        return synergy, matchup
+
+    def buffer(self) -> memoryview:
+        return memoryview(self._map)
+
+    def offsets(self) -> Dict[str, int]:
+        return _offsets(self.size, len(ROLE_ORDER))
+
+
+def build_pair_store(stats: "MatchStats", path: Path, prior_games: float = DEFAULT_PRIOR_GAMES) -> None:
+    """Write the pair deltas of `stats` to `path`, replacing any previous file atomically.
+
+    A pair's delta is its win rate minus the rate its champions' own win rates
+    predict, shrunk towards zero by `prior_games` pseudo-games; role deltas
+    are shrunk towards the pair's overall delta instead.
+    """
+    # numpy is only needed to build the file, not to read it.
+    import numpy as np
+
+    picks = stats.picks.astype(np.float64)
+    win_rate = (stats.wins + 0.5 * prior_games) / (picks + prior_games)
+    ally_expected = (win_rate[:, None] + win_rate[None, :]) / 2
+    opponent_expected = 0.5 + (win_rate[:, None] - win_rate[None, :]) / 2
+
+    def delta(wins, games, expected, prior_delta=0.0):
+        return (wins - games * expected + prior_games * prior_delta) / (games + prior_games)
+
+    ally = delta(stats.ally_wins, stats.ally_games, ally_expected)
+    opponent = delta(stats.opponent_wins, stats.opponent_games, opponent_expected)
+    role_ally = delta(stats.role_ally_wins, stats.role_ally_games, ally_expected, ally)
+    role_opponent = delta(stats.role_opponent_wins, stats.role_opponent_games, opponent_expected, opponent)
+
+    size = len(stats.champion_ids)
+    offsets = _offsets(size, len(ROLE_ORDER))
+    with atomic_write(Path(path)) as handle:
+        handle.write(HEADER.pack(MAGIC, VERSION, size, len(ROLE_ORDER), stats.matches, float(prior_games)))
+        for name, values, dtype in (
+            ("champion_ids", stats.champion_ids, np.int64),
+            ("ally", ally, np.float32),
+            ("opponent", opponent, np.float32),
+            ("role_ally", role_ally, np.float32),
+            ("role_opponent", role_opponent, np.float32),
+        ):
+            handle.write(b"\0" * (offsets[name] - handle.tell()))
+            handle.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+
+def _offsets(size: int, role_count: int) -> Dict[str, int]:
+    offsets: Dict[str, int] = {}
+    position = HEADER.size
+    for name, length in (
+        ("champion_ids", 8 * size),
+        ("ally", 4 * size * size),
+        ("opponent", 4 * size * size),
+        ("role_ally", 4 * role_count * size * size),
+        ("role_opponent", 4 * role_count * size * size),
+    ):
+        position = aligned(position)
+        offsets[name] = position
+        position += length
+    offsets["end"] = position
+    return offsets
+
+
+def _matrix(view: memoryview, offset: int, shape: Tuple[int, ...]) -> memoryview:
+    length = 4
+    for dim in shape:
+        length *= dim
+    return view[offset:offset + length].cast("f", shape)
+
+
+_store: Optional[PairStatsStore] = None
+_store_lock = threading.Lock()
+# File key of the last file that failed to open, so a bad file is reported once, not on every request.
+_failed_key: Optional[Tuple] = None
+
+
+def get_pair_stats() -> Optional[PairStatsStore]:
+    """The store at PAIR_STATS_PATH when PAIR_STATS_SCORING is on, reopened when the file is replaced.
+
+    Returns None when scoring with pair statistics is off or the file is missing
+    or unreadable, so recommendations fall back to the profile lists alone.
+    """
+    global _store, _failed_key
+    if not settings.pair_stats_scoring:
+        return None
+    path = Path(settings.pair_stats_path)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    store = _store
+    if store is not None and store.path == path and store.file_key == file_key:
+        return store
+    with _store_lock:
+        store = _store
+        if store is None or store.path != path or store.file_key != file_key:
+            if _failed_key == (path, file_key):
+                return None
+            try:
+                store = PairStatsStore(path)
+            except (OSError, PairStatsError) as exc:
+                _failed_key = (path, file_key)
+                logger.warning("pair statistics unavailable", extra={"path": str(path), "error": str(exc)})
+                return None
+            # The previous mapping stays valid for contexts still holding it and is unmapped once unreferenced.
+            _store = store
+    return store
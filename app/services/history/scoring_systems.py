@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.services.storage.atomic_file import atomic_write
+from app.services.storage.data_loader import ROLE_ORDER
+
+PICKS_PER_SIDE = 5
+
+BLUE = 0
+RED = 1
+
+_COUNT_DTYPE = np.int64
+ROLE_COUNTS = ("role_ally_games", "role_ally_wins", "role_opponent_games", "role_opponent_wins")
+
+
+@dataclass(frozen=True)
+class MatchBatch:
+    """A chunk of finished matches as padded id arrays; missing picks and bans are `-1`."""
+
+    picks: np.ndarray  # (matches, 2, PICKS_PER_SIDE), side BLUE then RED
+    roles: np.ndarray  # same shape as `picks`: index in ROLE_ORDER of each pick's role, `-1` if unknown
+    bans: np.ndarray  # (matches, 2, bans per side)
+    winners: np.ndarray  # (matches,), BLUE or RED
+
+    def __len__(self) -> int:
+        return len(self.winners)
+
+
+@dataclass(frozen=True)
+class ChampionRecord:
+    champion_id: int
+    matches: int
+    picks: int
+    bans: int
+    wins: int
+
+    @property
+    def win_rate(self) -> Optional[float]:
+        return self.wins / self.picks if self.picks else None
+
+    @property
+    def pick_rate(self) -> Optional[float]:
+        return self.picks / self.matches if self.matches else None
+
+    @property
+    def ban_rate(self) -> Optional[float]:
+        return self.bans / self.matches if self.matches else None
+
+
+@dataclass(frozen=True)
+class PairRecord:
+    """Games two champions played together (ally) or against each other (opponent), and wins of the first."""
+
+    champion_id: int
+    other_id: int
+    games: int
+    wins: int
+
+    @property
+    def win_rate(self) -> Optional[float]:
+        return self.wins / self.games if self.games else None
+
+
+class MatchStats:
+    """Champion and pair counts over ingested matches, as dense arrays indexed by champion column.
+
+    Columns follow `champion_ids`, kept sorted; ids never seen before grow the
+    arrays. Ally matrices are symmetric; `opponent_wins[a, b]` counts the wins
+    of `a` against `b`. The `role_*` arrays hold the same counts split by the
+    role `a` played (first axis in ROLE_ORDER), for matches that report roles.
+    A batch is folded in with a handful of `bincount` calls over flattened
+    (role, column, column) indices instead of per-match updates.
+    """
+
+    def __init__(self):
+        self.champion_ids = np.zeros(0, dtype=np.int64)
+        self.matches = 0
+        self.picks = np.zeros(0, dtype=_COUNT_DTYPE)
+        self.bans = np.zeros(0, dtype=_COUNT_DTYPE)
+        self.wins = np.zeros(0, dtype=_COUNT_DTYPE)
+        self.ally_games = np.zeros((0, 0), dtype=_COUNT_DTYPE)
+        self.ally_wins = np.zeros((0, 0), dtype=_COUNT_DTYPE)
+        self.opponent_games = np.zeros((0, 0), dtype=_COUNT_DTYPE)
+        self.opponent_wins = np.zeros((0, 0), dtype=_COUNT_DTYPE)
+        self.role_ally_games = np.zeros((len(ROLE_ORDER), 0, 0), dtype=_COUNT_DTYPE)
+        self.role_ally_wins = np.zeros((len(ROLE_ORDER), 0, 0), dtype=_COUNT_DTYPE)
+        self.role_opponent_games = np.zeros((len(ROLE_ORDER), 0, 0), dtype=_COUNT_DTYPE)
+        self.role_opponent_wins = np.zeros((len(ROLE_ORDER), 0, 0), dtype=_COUNT_DTYPE)
+
+    # Updating
+
+    def add(self, batch: MatchBatch) -> None:
+        if not len(batch):
+            return
+        picks = self._columns(batch.picks)
+        bans = self._columns(batch.bans)
+        size = len(self.champion_ids)
+        won = batch.winners[:, None] == np.array([BLUE, RED])  # (matches, 2)
+
+        self.matches += len(batch)
+        valid_picks = picks >= 0
+        self.picks += np.bincount(picks[valid_picks], minlength=size)
+        winning = picks[np.arange(len(batch)), batch.winners]
+        self.wins += np.bincount(winning[winning >= 0], minlength=size)
+        self.bans += np.bincount(bans[bans >= 0], minlength=size)
+
+        # Ally pairs: every two picks of a side, counted in both directions.
+        first, second = np.triu_indices(picks.shape[2], k=1)
+        a, b = picks[:, :, first], picks[:, :, second]  # (matches, 2, pairs)
+        role_a, role_b = batch.roles[:, :, first], batch.roles[:, :, second]
+        pair_won = np.broadcast_to(won[:, :, None], a.shape)
+        keep = (a >= 0) & (b >= 0)
+        self._count_pairs(
+            self.ally_games, self.ally_wins, self.role_ally_games, self.role_ally_wins,
+            np.concatenate((a[keep], b[keep])),
+            np.concatenate((b[keep], a[keep])),
+            np.concatenate((role_a[keep], role_b[keep])),
+            np.concatenate((pair_won[keep], pair_won[keep])),
+        )
+
+        # Opponent pairs: every blue pick against every red pick, counted from both sides.
+        shape = (len(batch), picks.shape[2], picks.shape[2])
+        blue = np.broadcast_to(picks[:, BLUE, :, None], shape)
+        red = np.broadcast_to(picks[:, RED, None, :], shape)
+        blue_role = np.broadcast_to(batch.roles[:, BLUE, :, None], shape)
+        red_role = np.broadcast_to(batch.roles[:, RED, None, :], shape)
+        blue_won = np.broadcast_to(won[:, BLUE, None, None], shape)
+        keep = (blue >= 0) & (red >= 0)
+        self._count_pairs(
+            self.opponent_games, self.opponent_wins, self.role_opponent_games, self.role_opponent_wins,
+            np.concatenate((blue[keep], red[keep])),
+            np.concatenate((red[keep], blue[keep])),
+            np.concatenate((blue_role[keep], red_role[keep])),
+            np.concatenate((blue_won[keep], ~blue_won[keep])),
+        )
+
+    @staticmethod
+    def _count_pairs(
+        games: np.ndarray,
+        wins: np.ndarray,
+        role_games: np.ndarray,
+        role_wins: np.ndarray,
+        columns: np.ndarray,
+        others: np.ndarray,
+        roles: np.ndarray,
+        won: np.ndarray,
+    ) -> None:
+        """Add one game (and a win where `won`) to cell (columns[i], others[i]) and to its role plane."""
+        flat = columns * games.shape[1] + others
+        games += np.bincount(flat, minlength=games.size).reshape(games.shape)
+        wins += np.bincount(flat[won], minlength=games.size).reshape(games.shape)
+        known = roles >= 0
+        flat = roles[known] * games.size + flat[known]
+        role_games += np.bincount(flat, minlength=role_games.size).reshape(role_games.shape)
+        role_wins += np.bincount(flat[won[known]], minlength=role_games.size).reshape(role_games.shape)
+
+    def _columns(self, ids: np.ndarray) -> np.ndarray:
+        """Column of every id (`-1` stays `-1`), adding unseen ids first."""
+        seen = np.unique(ids[ids >= 0])
+        unknown = np.setdiff1d(seen, self.champion_ids, assume_unique=True)
+        if len(unknown):
+            self._grow(unknown)
+        columns = np.searchsorted(self.champion_ids, ids)
+        return np.where(ids >= 0, columns, -1)
+
+    def _grow(self, new_ids: np.ndarray) -> None:
+        champion_ids = np.union1d(self.champion_ids, new_ids)
+        old = np.searchsorted(champion_ids, self.champion_ids)
+        size = len(champion_ids)
+        for name in ("picks", "bans", "wins"):
+            grown = np.zeros(size, dtype=_COUNT_DTYPE)
+            grown[old] = getattr(self, name)
+            setattr(self, name, grown)
+        for name in ("ally_games", "ally_wins", "opponent_games", "opponent_wins"):
+            grown = np.zeros((size, size), dtype=_COUNT_DTYPE)
+            grown[np.ix_(old, old)] = getattr(self, name)
+            setattr(self, name, grown)
+        for name in ROLE_COUNTS:
+            grown = np.zeros((len(ROLE_ORDER), size, size), dtype=_COUNT_DTYPE)
+            grown[np.ix_(np.arange(len(ROLE_ORDER)), old, old)] = getattr(self, name)
+            setattr(self, name, grown)
+        self.champion_ids = champion_ids
+
+    # Reading
+
+    def column(self, champion_id: int) -> Optional[int]:
+        idx = int(np.searchsorted(self.champion_ids, champion_id))
+        if idx < len(self.champion_ids) and self.champion_ids[idx] == champion_id:
+            return idx
+        return None
+
+    def champion(self, champion_id: int) -> ChampionRecord:
+        col = self.column(champion_id)
+        if col is None:
+            return ChampionRecord(champion_id, self.matches, 0, 0, 0)
+        return ChampionRecord(
+            champion_id, self.matches, int(self.picks[col]), int(self.bans[col]), int(self.wins[col])
+        )
+
+    def ally(self, champion_id: int, ally_id: int) -> PairRecord:
+        return self._pair(champion_id, ally_id, self.ally_games, self.ally_wins)
+
+    def opponent(self, champion_id: int, opponent_id: int) -> PairRecord:
+        return self._pair(champion_id, opponent_id, self.opponent_games, self.opponent_wins)
+
+    def _pair(self, champion_id: int, other_id: int, games: np.ndarray, wins: np.ndarray) -> PairRecord:
+        col, other = self.column(champion_id), self.column(other_id)
+        if col is None or other is None:
+            return PairRecord(champion_id, other_id, 0, 0)
+        return PairRecord(champion_id, other_id, int(games[col, other]), int(wins[col, other]))
+
+    # Persistence
+
+    def save(self, path: Path, checkpoint: Dict[str, Any]) -> None:
+        """Write the counts and `checkpoint` into one `.npz` file, replaced atomically."""
+        with atomic_write(path) as handle:
+            np.savez(
+                handle,
+                champion_ids=self.champion_ids,
+                matches=np.array(self.matches, dtype=np.int64),
+                picks=self.picks,
+                bans=self.bans,
+                wins=self.wins,
+                ally_games=self.ally_games,
+                ally_wins=self.ally_wins,
+                opponent_games=self.opponent_games,
+                opponent_wins=self.opponent_wins,
+                **{name: getattr(self, name) for name in ROLE_COUNTS},
+                checkpoint=np.array(json.dumps(checkpoint)),
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["MatchStats", Dict[str, Any]]:
+        """Counts and checkpoint saved by `save`; empty ones when `path` does not exist."""
+        stats = cls()
+        if not path.exists():
+            return stats, {}
+        with np.load(path, allow_pickle=False) as data:
+            stats.champion_ids = data["champion_ids"]
+            stats.matches = int(data["matches"])
+            for name in ("picks", "bans", "wins", "ally_games", "ally_wins", "opponent_games", "opponent_wins"):
+                setattr(stats, name, data[name].astype(_COUNT_DTYPE, copy=False))
+            size = len(stats.champion_ids)
+            for name in ROLE_COUNTS:
+                # Files written before role counts existed start with empty role planes.
+                counts = data[name] if name in data.files else np.zeros((len(ROLE_ORDER), size, size))
+                setattr(stats, name, counts.astype(_COUNT_DTYPE, copy=False))
+            checkpoint = json.loads(str(data["checkpoint"]))
+        return stats, checkpoint
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from app.models.domain.recommendation import Recommendation
+from app.models.schemas.recommendation_schemas import DraftRecommendationRequest
+from app.services.draft_engine.format_engine import TurnInfo, get_format_engine
+from app.services.scoring.scoring_engine import (
+    _champion_ids,
+    _ensure_role_profiles,
+    _merge_roles,
+    _root_action_index,
+    _validate_pick_slots,
+    score_candidates,
+    side_context,
+)
+from app.services.storage.data_loader import DataLoader
+
+# Transposition table entry bounds.
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+MAX_TABLE_SIZE = 200_000
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class SearchState:
+    """Canonical draft position: unordered pick/ban sets plus the number of actions done."""
+
+    our_picks: FrozenSet[int]
+    enemy_picks: FrozenSet[int]
+    bans: FrozenSet[int]
+    # Ban turns of the root draft that were passed (an empty slot before a filled one).
+    passed_bans: int = 0
+
+    @property
+    def actions_done(self) -> int:
+        return len(self.our_picks) + len(self.enemy_picks) + len(self.bans) + self.passed_bans
+
+    @property
+    def blocked(self) -> FrozenSet[int]:
+        return self.our_picks | self.enemy_picks | self.bans
+
+    def apply(self, ours: bool, action_type: str, champ_id: int) -> "SearchState":
+        if action_type == "ban":
+            return SearchState(self.our_picks, self.enemy_picks, self.bans | {champ_id}, self.passed_bans)
+        if ours:
+            return SearchState(self.our_picks | {champ_id}, self.enemy_picks, self.bans, self.passed_bans)
+        return SearchState(self.our_picks, self.enemy_picks | {champ_id}, self.bans, self.passed_bans)
+
+
+@dataclass(frozen=True)
+class Candidate:
+    champion_id: int
+    score: float
+    roles: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class _TableEntry:
+    depth: int
+    value: float
+    bound: int
+    best_move: Optional[int]
+
+
+@dataclass
+class SearchStats:
+    budget_ms: int
+    depth_reached: int = 0
+    nodes: int = 0
+    table_hits: int = 0
+    elapsed_ms: float = 0.0
+    timed_out: bool = False
+
+    @property
+    def nodes_per_second(self) -> float:
+        if self.elapsed_ms <= 0:
+            return 0.0
+        return self.nodes / (self.elapsed_ms / 1000.0)
+
+
+@dataclass
+class SearchResult:
+    recommendations: List[Recommendation]
+    stats: SearchStats
+    side_to_act: str = ""
+    action_type: str = ""
+    root_values: Dict[int, float] = field(default_factory=dict)
+
+
+class DraftSearch:
+    """Iterative-deepening alpha-beta minimax over the remaining format turns.
+
+    Values are from our side's point of view: our picks add their score, enemy
+    picks subtract the score the enemy gets from the same scoring function with
+    sides swapped, bans are worth nothing on their own. Leaves are evaluated as
+    our best available pick minus the enemy's best available pick, which is what
+    gives bans their value inside the horizon.
+    """
+
+    def __init__(
+        self,
+        loader: DataLoader,
+        turns: Sequence[TurnInfo],
+        our_side: str,
+        branching: int,
+        budget_ms: int,
+    ):
+        self.loader = loader
+        self.turns = turns
+        self.our_side = our_side
+        self.branching = max(1, branching)
+        self.stats = SearchStats(budget_ms=budget_ms)
+        self._deadline = 0.0
+        self._table: Dict[SearchState, _TableEntry] = {}
+        self._candidates: Dict[Tuple[bool, SearchState], List[Candidate]] = {}
+
+    def run(self, root: SearchState, max_depth: int) -> SearchResult:
+        started = time.perf_counter()
+        self._deadline = started + self.stats.budget_ms / 1000.0
+        remaining = len(self.turns) - root.actions_done
+        if remaining <= 0:
+            return SearchResult(recommendations=[], stats=self.stats)
+
+        turn = self.turns[root.actions_done]
+        ours = turn.side_to_act == self.our_side
+        moves = self._moves(root, turn)
+        # Depth 0 fallback: the greedy immediate value of each move.
+        root_values = {candidate.champion_id: self._reward(ours, turn, candidate) for candidate in moves}
+
+        try:
+            for depth in range(1, min(max_depth, remaining) + 1):
+                values = self._search_root(root, turn, moves, depth)
+                root_values = values
+                self.stats.depth_reached = depth
+                moves.sort(key=lambda candidate: -values[candidate.champion_id] if ours else values[candidate.champion_id])
+        except SearchTimeout:
+            self.stats.timed_out = True
+
+        self.stats.elapsed_ms = (time.perf_counter() - started) * 1000.0
+        return SearchResult(
+            recommendations=self._root_items(moves, root_values, ours),
+            stats=self.stats,
+            side_to_act=turn.side_to_act,
+            action_type=turn.action_type,
+            root_values=root_values,
+        )
+
+    def _search_root(self, root: SearchState, turn: TurnInfo, moves: List[Candidate], depth: int) -> Dict[int, float]:
+        ours = turn.side_to_act == self.our_side
+        values: Dict[int, float] = {}
+        for candidate in moves:
+            reward = self._reward(ours, turn, candidate)
+            child = root.apply(ours, turn.action_type, candidate.champion_id)
+            values[candidate.champion_id] = reward + self._search(child, depth - 1, -math.inf, math.inf)
+        return values
+
+    def _search(self, state: SearchState, depth: int, alpha: float, beta: float) -> float:
+        self.stats.nodes += 1
+        if time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+
+        if depth == 0 or state.actions_done >= len(self.turns):
+            return self._evaluate(state)
+
+        original_alpha, original_beta = alpha, beta
+        entry = self._table.get(state)
+        if entry is not None and entry.depth >= depth:
+            self.stats.table_hits += 1
+            if entry.bound == EXACT:
+                return entry.value
+            if entry.bound == LOWER:
+                alpha = max(alpha, entry.value)
+            else:
+                beta = min(beta, entry.value)
+            if alpha >= beta:
+                return entry.value
+
+        turn = self.turns[state.actions_done]
+        ours = turn.side_to_act == self.our_side
+        moves = self._moves(state, turn)
+        if not moves:
+            return self._evaluate(state)
+        if entry is not None and entry.best_move is not None:
+            moves = sorted(moves, key=lambda candidate: candidate.champion_id != entry.best_move)
+
+        best_value = -math.inf if ours else math.inf
+        best_move: Optional[int] = None
+        for candidate in moves:
+            reward = self._reward(ours, turn, candidate)
+            child = state.apply(ours, turn.action_type, candidate.champion_id)
+            value = reward + self._search(child, depth - 1, alpha - reward, beta - reward)
+            if ours:
+                if value > best_value:
+                    best_value, best_move = value, candidate.champion_id
+                alpha = max(alpha, best_value)
+            else:
+                if value < best_value:
+                    best_value, best_move = value, candidate.champion_id
+                beta = min(beta, best_value)
+            if alpha >= beta:
+                break
+
+        if best_value <= original_alpha:
+            bound = UPPER
+        elif best_value >= original_beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        if len(self._table) >= MAX_TABLE_SIZE:
+            self._table.clear()
+        self._table[state] = _TableEntry(depth=depth, value=best_value, bound=bound, best_move=best_move)
+        return best_value
+
+    def _evaluate(self, state: SearchState) -> float:
+        if state.actions_done >= len(self.turns):
+            return 0.0
+        ours = self._candidates_for(True, state)
+        theirs = self._candidates_for(False, state)
+        return (ours[0].score if ours else 0.0) - (theirs[0].score if theirs else 0.0)
+
+    def _moves(self, state: SearchState, turn: TurnInfo) -> List[Candidate]:
+        ours = turn.side_to_act == self.our_side
+        if turn.action_type == "ban":
+            # A side bans what its opponent would pick.
+            return list(self._candidates_for(not ours, state))
+        return list(self._candidates_for(ours, state))
+
+    def _reward(self, ours: bool, turn: TurnInfo, candidate: Candidate) -> float:
+        if turn.action_type == "ban":
+            return 0.0
+        return candidate.score if ours else -candidate.score
+
+    def _candidates_for(self, ours: bool, state: SearchState) -> List[Candidate]:
+        key = (ours, state)
+        cached = self._candidates.get(key)
+        if cached is not None:
+            return cached
+
+        own, other = (state.our_picks, state.enemy_picks) if ours else (state.enemy_picks, state.our_picks)
+        context = side_context(
+            self.loader,
+            [{"id": champ_id} for champ_id in own],
+            [{"id": champ_id} for champ_id in other],
+            set(state.blocked),
+        )
+        best: Dict[int, Candidate] = {}
+        for champ_id, role, score, _reasons in score_candidates(context):
+            existing = best.get(champ_id)
+            if existing is None:
+                best[champ_id] = Candidate(champ_id, score, (role,))
+            else:
+                best[champ_id] = Candidate(
+                    champ_id,
+                    max(existing.score, score),
+                    tuple(_merge_roles(list(existing.roles), [role])),
+                )
+        candidates = heapq.nlargest(self.branching, best.values(), key=lambda candidate: candidate.score)
+        if len(self._candidates) >= MAX_TABLE_SIZE:
+            self._candidates.clear()
+        self._candidates[key] = candidates
+        return candidates
+
+    def _root_items(self, moves: List[Candidate], values: Dict[int, float], ours: bool) -> List[Recommendation]:
+        depth = self.stats.depth_reached
+        items = [
+            Recommendation(
+                champion_id=candidate.champion_id,
+                score=values[candidate.champion_id],
+                roles=candidate.roles,
+                reasons=(f"greedy score {candidate.score:.2f}", f"lookahead value at depth {depth}"),
+            )
+            for candidate in moves
+        ]
+        items.sort(key=lambda item: item.score, reverse=ours)
+        return items
+
+
+def search_recommendations(
+    payload: DraftRecommendationRequest,
+    loader: DataLoader,
+    budget_ms: int,
+    max_depth: int,
+    branching: int,
+) -> SearchResult:
+    _ensure_role_profiles(loader)
+    picks = payload.draftState.picks
+    enemy_side = "red" if payload.ourSide == "blue" else "blue"
+    _validate_pick_slots(getattr(picks, payload.ourSide), payload.ourSide)
+    _validate_pick_slots(getattr(picks, enemy_side), enemy_side)
+
+    engine = get_format_engine(loader)
+    if not engine.has_format(payload.format):
+        raise ValueError(f"Unknown format: {payload.format}")
+    turns = engine.turns(payload.format)
+
+    actions_done = _root_action_index(payload, turns)
+
+    bans = payload.draftState.bans
+    our_picks = frozenset(_champion_ids(getattr(picks, payload.ourSide)))
+    enemy_picks = frozenset(_champion_ids(getattr(picks, enemy_side)))
+    ban_ids = frozenset(_champion_ids(bans.blue) | _champion_ids(bans.red))
+    root = SearchState(
+        our_picks=our_picks,
+        enemy_picks=enemy_picks,
+        bans=ban_ids,
+        passed_bans=actions_done - len(our_picks) - len(enemy_picks) - len(ban_ids),
+    )
+    # Every node reads the same data; pin it so nodes skip file revalidation.
+    pinned_loader = DataLoader(loader.repo, loader.snapshot.pin())
+    search = DraftSearch(pinned_loader, turns, payload.ourSide, branching, budget_ms)
+    return search.run(root, max_depth)
@@ -0,0 +1,546 @@
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import accumulate
+from multiprocessing import get_context
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from app.core.config import settings
+from app.models.schemas.recommendation_schemas import DraftRecommendationRequest
+from app.services.draft_engine.format_engine import TurnInfo, get_format_engine
+from app.services.draft_engine.validators import ensure_not_picked_or_banned
+from app.services.history.pair_stats import PairStatsStore, get_pair_stats
+from app.services.scoring.color_rules import team_color_bonus
+from app.services.scoring.incremental_engine import SCORING_INPUT_FILES, compile_rows
+from app.services.scoring.scoring_engine import (
+    _enemy_role_weights,
+    _ensure_role_profiles,
+    _group_candidates,
+    _load_color_index,
+    _load_color_rules,
+    _load_role_solver,
+    _load_scoring_weights,
+    _matching_count,
+    _pick_id_sequence,
+    _role_multiplier,
+    _root_action_index,
+    _soft_enemy_role_weights,
+    _target_team_colors,
+    _team_color_counts,
+    _validate_pick_slots,
+    score_candidates,
+    side_context,
+)
+from app.services.storage.data_loader import DataLoader, ROLE_ORDER
+from app.services.storage.json_repository import JsonRepository
+
+POLICIES = ("random", "weighted")
+
+ALL_ROLES = frozenset(ROLE_ORDER)
+
+# Rollouts per task. Fixed, with one seed per (candidate, chunk), so results do not depend on the worker count.
+ROLLOUT_CHUNK = 500
+
+# Draws from the open-role pools before falling back to filtering out blocked champions.
+MAX_SAMPLE_ATTEMPTS = 16
+
+# "weighted" draws pool entries in proportion to their draft-independent score, floored here.
+MIN_POLICY_WEIGHT = 0.1
+
+
+@dataclass(frozen=True)
+class RolloutState:
+    """Draft position right after a root candidate, with the turns left to play."""
+
+    our_picks: Tuple[int, ...]
+    enemy_picks: Tuple[int, ...]
+    blocked: FrozenSet[int]
+    our_open_roles: FrozenSet[str]
+    enemy_open_roles: FrozenSet[str]
+    # (our side acts, action type) of every remaining turn.
+    turns: Tuple[Tuple[bool, str], ...]
+
+
+@dataclass(frozen=True)
+class RolloutTask:
+    data_dir: str
+    policy: str
+    seed: int
+    champion_id: int
+    chunk: int
+    rollouts: int
+    state: RolloutState
+
+
+@dataclass
+class RolloutStats:
+    """Running count, mean and sum of squared deviations (Welford), mergeable across chunks."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other: "RolloutStats") -> None:
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+@dataclass
+class SimulatedCandidate:
+    champion_id: int
+    greedy_score: Optional[float]
+    stats: RolloutStats
+
+
+@dataclass
+class SimulationResult:
+    side_to_act: str
+    action_type: str
+    policy: str
+    workers: int
+    candidates: List[SimulatedCandidate] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+
+class _PoolSampler:
+    """(champion, role) entries of a set of role pools with cumulative policy weights, for O(log n) draws."""
+
+    __slots__ = ("champion_ids", "roles", "weights", "cum_weights", "total")
+
+    def __init__(self, entries: Sequence[Tuple[int, str, float]]):
+        self.champion_ids = tuple(champ_id for champ_id, _role, _weight in entries)
+        self.roles = tuple(role for _champ_id, role, _weight in entries)
+        self.weights = tuple(weight for _champ_id, _role, weight in entries)
+        self.cum_weights = list(accumulate(self.weights))
+        self.total = self.cum_weights[-1]
+
+    def draw(self, rng: random.Random) -> int:
+        idx = bisect.bisect_right(self.cum_weights, rng.random() * self.total)
+        return min(idx, len(self.champion_ids) - 1)
+
+
+class RolloutEvaluator:
+    """Plays random draft completions and scores the final compositions.
+
+    Both sides draw picks from the open roles of the role pools (a side bans
+    what its opponent would pick) and a pick closes the role it was drawn for.
+    A team is worth the sum over its picks of their best pool row scored against
+    the final draft, with the operations of `_score_champion`; a composition
+    score is our team's value minus the enemy's, the enemy being scored with the
+    same pools as in the lookahead search. Role pressure comes from the roles
+    the rollout closed rather than from the role solver, which would run its DP
+    on nearly every distinct final pick set.
+    """
+
+    def __init__(self, loader: DataLoader):
+        compiled = compile_rows(loader)
+        self.rows = compiled.rows
+        self.color_fit = compiled.color_fit
+        self.pair_synergy = compiled.pair_synergy
+        self.pair_matchup = compiled.pair_matchup
+        self.role_solver = _load_role_solver(loader)
+        self.scoring_weights = _load_scoring_weights(loader)
+        self.color_rules = _load_color_rules(loader)
+        self.color_index = _load_color_index(loader)
+        self.champion_ids = tuple(sorted(loader.champion_index().by_id))
+
+        rows_by_champion: Dict[int, List[int]] = {}
+        for row_index, row in enumerate(self.rows):
+            if row.champion_id is not None:
+                rows_by_champion.setdefault(row.champion_id, []).append(row_index)
+        self.rows_by_champion = {champ_id: tuple(rows) for champ_id, rows in rows_by_champion.items()}
+
+        # policy -> role -> (champion, role, weight) of every pool entry.
+        self._pool_entries: Dict[str, Dict[str, List[Tuple[int, str, float]]]] = {policy: {} for policy in POLICIES}
+        for role, row_indices in compiled.rows_by_role.items():
+            for row_index in row_indices:
+                row = self.rows[row_index]
+                if row.champion_id is None:
+                    continue
+                self._pool_entries["random"].setdefault(role, []).append((row.champion_id, role, 1.0))
+                self._pool_entries["weighted"].setdefault(role, []).append(
+                    (row.champion_id, role, max(row.base, MIN_POLICY_WEIGHT))
+                )
+        # (policy, open roles) -> sampler over those pools; at most 32 role sets per policy.
+        self._samplers: Dict[Tuple[str, FrozenSet[str]], Optional[_PoolSampler]] = {}
+
+    def open_roles(self, pick_ids: Tuple[int, ...]) -> FrozenSet[str]:
+        locked = self.role_solver.locked_roles(pick_ids)
+        return frozenset(role for role in ROLE_ORDER if role not in locked)
+
+    def pick_role(self, champion_id: int, open_roles: FrozenSet[str]) -> Optional[str]:
+        """First open role, in lane order, whose pool lists the champion."""
+        roles = {self.rows[row_index].role for row_index in self.rows_by_champion.get(champion_id, ())}
+        return next((role for role in ROLE_ORDER if role in open_roles and role in roles), None)
+
+    def rollout(
+        self,
+        rng: random.Random,
+        policy: str,
+        state: RolloutState,
+        pair_stats: Optional[PairStatsStore] = None,
+    ) -> float:
+        picks = {True: list(state.our_picks), False: list(state.enemy_picks)}
+        open_roles = {True: state.our_open_roles, False: state.enemy_open_roles}
+        blocked = set(state.blocked)
+        for ours, action_type in state.turns:
+            if action_type == "ban":
+                drawn = self.sample(rng, policy, open_roles[not ours], blocked)
+                if drawn is not None:
+                    blocked.add(drawn[0])
+                continue
+            drawn = self.sample(rng, policy, open_roles[ours], blocked)
+            if drawn is None:
+                continue
+            champ_id, role = drawn
+            blocked.add(champ_id)
+            picks[ours].append(champ_id)
+            if role is not None:
+                open_roles[ours] = open_roles[ours] - {role}
+        return self.composition_score(
+            tuple(picks[True]),
+            tuple(picks[False]),
+            ALL_ROLES - open_roles[True],
+            ALL_ROLES - open_roles[False],
+            pair_stats,
+        )
+
+    def sample(
+        self,
+        rng: random.Random,
+        policy: str,
+        open_roles: FrozenSet[str],
+        blocked: Set[int],
+    ) -> Optional[Tuple[int, Optional[str]]]:
+        sampler = self._sampler(policy, open_roles)
+        if sampler is not None:
+            for _attempt in range(MAX_SAMPLE_ATTEMPTS):
+                idx = sampler.draw(rng)
+                if sampler.champion_ids[idx] not in blocked:
+                    return sampler.champion_ids[idx], sampler.roles[idx]
+            # Most of the open pools are taken: draw among what is left.
+            eligible = [idx for idx, champ_id in enumerate(sampler.champion_ids) if champ_id not in blocked]
+            if eligible:
+                idx = rng.choices(eligible, weights=[sampler.weights[idx] for idx in eligible])[0]
+                return sampler.champion_ids[idx], sampler.roles[idx]
+        free = [champ_id for champ_id in self.champion_ids if champ_id not in blocked]
+        if not free:
+            return None
+        return rng.choice(free), None
+
+    def _sampler(self, policy: str, open_roles: FrozenSet[str]) -> Optional[_PoolSampler]:
+        key = (policy, open_roles)
+        if key not in self._samplers:
+            pools = self._pool_entries[policy]
+            entries = [entry for role in ROLE_ORDER if role in open_roles for entry in pools.get(role, ())]
+            self._samplers[key] = _PoolSampler(entries) if entries else None
+        return self._samplers[key]
+
+    def composition_score(
+        self,
+        our_picks: Tuple[int, ...],
+        enemy_picks: Tuple[int, ...],
+        our_roles: FrozenSet[str],
+        enemy_roles: FrozenSet[str],
+        pair_stats: Optional[PairStatsStore] = None,
+    ) -> float:
+        return (
+            self.team_value(our_picks, enemy_picks, our_roles, enemy_roles, pair_stats)
+            - self.team_value(enemy_picks, our_picks, enemy_roles, our_roles, pair_stats)
+        )
+
+    def team_value(
+        self,
+        own: Tuple[int, ...],
+        other: Tuple[int, ...],
+        own_roles: FrozenSet[str],
+        other_roles: FrozenSet[str],
+        pair_stats: Optional[PairStatsStore] = None,
+    ) -> float:
+        """Value of the `own` team; `*_roles` are the roles each side has filled."""
+        if settings.role_pressure == "soft":
+            enemy_role_weights = _soft_enemy_role_weights(
+                self.role_solver.distribution(frozenset(other)),
+                self.role_solver.distribution(frozenset(own)),
+                self.scoring_weights,
+            )
+        else:
+            enemy_role_weights = _enemy_role_weights(other_roles, own_roles, self.scoring_weights)
+        own_set, other_set = set(own), set(other)
+        team_color_counts = _team_color_counts(own_set, self.color_index)
+        target_colors = _target_team_colors(team_color_counts)
+        role_multipliers: Dict[str, float] = {}
+        color_bonuses: Dict[Tuple[str, ...], float] = {}
+
+        total = 0.0
+        for champ_id in own:
+            best: Optional[float] = None
+            for row_index in self.rows_by_champion.get(champ_id, ()):
+                # Same operations, in the same order, as `_score_champion`.
+                row = self.rows[row_index]
+                entry = row.entry
+                score = row.base
+                if target_colors:
+                    matched = sum(1 for color in entry.colors if color in target_colors)
+                    if matched:
+                        score += self.color_fit * matched
+                role_multiplier = role_multipliers.get(row.role)
+                if role_multiplier is None:
+                    role_multiplier = role_multipliers[row.role] = _role_multiplier(
+                        row.role, enemy_role_weights, self.scoring_weights
+                    )
+                if role_multiplier != 1.0:
+                    score *= role_multiplier
+                synergy = _matching_count(entry.synergy, own_set)
+                if synergy:
+                    score += row.synergy_factor * synergy
+                counters = _matching_count(entry.counters, other_set)
+                if counters:
+                    score -= row.counter_factor * counters
+                strong_into = _matching_count(entry.strong_into, other_set)
+                if strong_into:
+                    score += row.strong_factor * strong_into
+                color_bonus = color_bonuses.get(entry.colors)
+                if color_bonus is None:
+                    color_bonus = color_bonuses[entry.colors] = team_color_bonus(
+                        entry.colors, team_color_counts, self.color_rules
+                    )[0]
+                if color_bonus:
+                    score += color_bonus
+                if pair_stats is not None:
+                    pair_synergy, pair_matchup = pair_stats.deltas(champ_id, row.role, own_set, other_set)
+                    if pair_synergy:
+                        score += self.pair_synergy * pair_synergy
+                    if pair_matchup:
+                        score += self.pair_matchup * pair_matchup
+                if best is None or score > best:
+                    best = score
+            if best is not None:
+                total += best
+        return total
+
+
+def simulate_draft(
+    payload: DraftRecommendationRequest,
+    loader: DataLoader,
+    rollouts: int,
+    candidate_ids: Optional[Sequence[int]] = None,
+    candidate_count: int = 5,
+    policy: str = "weighted",
+    seed: int = 0,
+) -> SimulationResult:
+    """Mean and variance of the final composition score over `rollouts` completions per root candidate.
+
+    Candidates are the moves of the side to act: `candidate_ids`, or its
+    `candidate_count` best greedy moves. Scores are from our side's point of view.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy: {policy}")
+    started = time.perf_counter()
+    _ensure_role_profiles(loader)
+    picks = payload.draftState.picks
+    bans = payload.draftState.bans
+    enemy_side = "red" if payload.ourSide == "blue" else "blue"
+    _validate_pick_slots(getattr(picks, payload.ourSide), payload.ourSide)
+    _validate_pick_slots(getattr(picks, enemy_side), enemy_side)
+
+    engine = get_format_engine(loader)
+    if not engine.has_format(payload.format):
+        raise ValueError(f"Unknown format: {payload.format}")
+    turns = engine.turns(payload.format)
+
+    our_picks = _pick_id_sequence(getattr(picks, payload.ourSide))
+    enemy_picks = _pick_id_sequence(getattr(picks, enemy_side))
+    ban_ids = (*_pick_id_sequence(bans.blue), *_pick_id_sequence(bans.red))
+    actions_done = _root_action_index(payload, turns)
+    if actions_done >= len(turns):
+        raise ValueError("Draft is already complete")
+    turn = turns[actions_done]
+    ours = turn.side_to_act == payload.ourSide
+    # Every task reads the same data; pin it so the root work skips file revalidation.
+    loader = DataLoader(loader.repo, loader.snapshot.pin())
+    evaluator = _load_evaluator(loader)
+
+    greedy = _greedy_scores(loader, our_picks, enemy_picks, {*our_picks, *enemy_picks, *ban_ids}, turn, ours)
+    if candidate_ids:
+        sides = {
+            side: {
+                "picks": list(_pick_id_sequence(getattr(picks, side))),
+                "bans": list(_pick_id_sequence(getattr(bans, side))),
+            }
+            for side in ("blue", "red")
+        }
+        for champ_id in candidate_ids:
+            if champ_id not in evaluator.champion_ids:
+                raise ValueError(f"Unknown champion id: {champ_id}")
+            ensure_not_picked_or_banned(champ_id, sides["blue"], sides["red"])
+        candidates = list(dict.fromkeys(candidate_ids))
+    else:
+        candidates = sorted(greedy, key=greedy.get, reverse=True)[:candidate_count]
+
+    remaining = tuple((future.side_to_act == payload.ourSide, future.action_type) for future in turns[actions_done + 1:])
+    our_open = evaluator.open_roles(our_picks)
+    enemy_open = evaluator.open_roles(enemy_picks)
+    blocked = frozenset((*our_picks, *enemy_picks, *ban_ids))
+    data_dir = str(loader.repo.base_dir)
+    tasks: List[RolloutTask] = []
+    for champ_id in candidates:
+        state = _after_move(
+            evaluator,
+            RolloutState(our_picks, enemy_picks, blocked, our_open, enemy_open, remaining),
+            ours,
+            turn.action_type,
+            champ_id,
+        )
+        for chunk, start in enumerate(range(0, rollouts, ROLLOUT_CHUNK)):
+            tasks.append(RolloutTask(
+                data_dir=data_dir,
+                policy=policy,
+                seed=seed,
+                champion_id=champ_id,
+                chunk=chunk,
+                rollouts=min(ROLLOUT_CHUNK, rollouts - start),
+                state=state,
+            ))
+
+    workers = min(_max_workers(), len(tasks))
+    if workers > 1:
+        chunk_stats = list(_get_pool().map(_run_task, tasks))
+    else:
+        chunk_stats = [_run_rollouts(evaluator, task) for task in tasks]
+
+    stats: Dict[int, RolloutStats] = {champ_id: RolloutStats() for champ_id in candidates}
+    for task, task_stats in zip(tasks, chunk_stats):
+        stats[task.champion_id].merge(task_stats)
+    results = [SimulatedCandidate(champ_id, greedy.get(champ_id), stats[champ_id]) for champ_id in candidates]
+    results.sort(key=lambda candidate: candidate.stats.mean, reverse=True)
+    return SimulationResult(
+        side_to_act=turn.side_to_act,
+        action_type=turn.action_type,
+        policy=policy,
+        workers=workers,
+        candidates=results,
+        elapsed_ms=(time.perf_counter() - started) * 1000.0,
+    )
+
+
+def _greedy_scores(
+    loader: DataLoader,
+    our_picks: Tuple[int, ...],
+    enemy_picks: Tuple[int, ...],
+    blocked: Set[int],
+    turn: TurnInfo,
+    ours: bool,
+) -> Dict[int, float]:
+    # A side picks its own best champion and bans the opponent's.
+    scores_for_us = ours if turn.action_type == "pick" else not ours
+    own, other = (our_picks, enemy_picks) if scores_for_us else (enemy_picks, our_picks)
+    context = side_context(
+        loader,
+        [{"id": champ_id} for champ_id in own],
+        [{"id": champ_id} for champ_id in other],
+        blocked,
+    )
+    return {group.champion_id: group.score for group in _group_candidates(score_candidates(context))}
+
+
+def _after_move(
+    evaluator: RolloutEvaluator,
+    root: RolloutState,
+    ours: bool,
+    action_type: str,
+    champ_id: int,
+) -> RolloutState:
+    our_picks, enemy_picks = root.our_picks, root.enemy_picks
+    our_open, enemy_open = root.our_open_roles, root.enemy_open_roles
+    if action_type == "pick":
+        if ours:
+            our_picks = (*our_picks, champ_id)
+            our_open = our_open - {evaluator.pick_role(champ_id, our_open)}
+        else:
+            enemy_picks = (*enemy_picks, champ_id)
+            enemy_open = enemy_open - {evaluator.pick_role(champ_id, enemy_open)}
+    return RolloutState(
+        our_picks=our_picks,
+        enemy_picks=enemy_picks,
+        blocked=root.blocked | {champ_id},
+        our_open_roles=our_open,
+        enemy_open_roles=enemy_open,
+        turns=root.turns,
+    )
+
+
+def _run_rollouts(evaluator: RolloutEvaluator, task: RolloutTask) -> RolloutStats:
+    # String seeds hash with SHA-512, so every process draws the same sequence.
+    rng = random.Random(f"{task.seed}:{task.champion_id}:{task.chunk}")
+    stats = RolloutStats()
+    pair_stats = get_pair_stats()
+    for _rollout in range(task.rollouts):
+        stats.add(evaluator.rollout(rng, task.policy, task.state, pair_stats))
+    return stats
+
+
+def _load_evaluator(loader: DataLoader) -> RolloutEvaluator:
+    try:
+        return loader.snapshot.derive("rollout_evaluator", SCORING_INPUT_FILES, lambda *_raw: RolloutEvaluator(loader))
+    except FileNotFoundError:
+        # Optional config files are missing; build without caching.
+        return RolloutEvaluator(loader)
+
+
+# Worker process side: one loader per data directory, kept for the life of the process.
+_worker_loaders: Dict[str, DataLoader] = {}
+
+
+def _run_task(task: RolloutTask) -> RolloutStats:
+    loader = _worker_loaders.get(task.data_dir)
+    if loader is None:
+        loader = _worker_loaders[task.data_dir] = DataLoader(JsonRepository(task.data_dir))
+    return _run_rollouts(_load_evaluator(loader), task)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _max_workers() -> int:
+    return max(1, settings.simulation_workers or os.cpu_count() or 1)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by every simulation, started on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Spawned, not forked: a fork would copy the server threads (logging, threadpool) mid-state.
+                _pool = ProcessPoolExecutor(max_workers=_max_workers(), mp_context=get_context("spawn"))
+    return _pool
@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from app.core.metrics import RECOMMENDATION_ROWS_SCORED, RECOMMENDATION_STAGE_SECONDS
+from app.core.tracing import span
+from app.models.domain.draft import Draft
+from app.models.domain.profile import ProfileEntry
+from app.services.history.pair_stats import get_pair_stats
+from app.services.scoring.color_rules import color_multipliers, team_color_bonus
+from app.services.scoring.scoring_engine import (
+    CandidateGroup,
+    DraftContext,
+    RankedRecommendations,
+    _load_color_rules,
+    _load_profiles_by_role,
+    _load_scoring_weights,
+    _pick_roles,
+    _role_multiplier,
+    _score_champion,
+    _weight,
+    side_context,
+)
+from app.services.storage.data_loader import DataLoader, ROLE_FILES, ROLE_ORDER
+
+ROW_INPUT_FILES = [*ROLE_FILES, "configs/scoring_weights.json", "configs/color_rules.json"]
+# A scorer built on an older generation of any of these is rebuilt rather than updated.
+SCORING_INPUT_FILES = [*ROW_INPUT_FILES, "champions.json"]
+
+
+@dataclass(frozen=True, slots=True)
+class _Row:
+    """One (champion, role) pool entry with every term that does not depend on the draft."""
+
+    champion_id: int
+    role: str
+    entry: ProfileEntry
+    base: float
+    synergy_factor: float
+    counter_factor: float
+    strong_factor: float
+
+
+@dataclass(frozen=True)
+class CompiledRows:
+    rows: Tuple[_Row, ...]
+    rows_by_role: Dict[str, Tuple[int, ...]]
+    rows_by_colors: Dict[Tuple[str, ...], Tuple[int, ...]]
+    # Champion id -> rows listing it (once per occurrence) in synergy / counters / strongInto.
+    synergy_refs: Dict[int, Tuple[int, ...]]
+    counter_refs: Dict[int, Tuple[int, ...]]
+    strong_refs: Dict[int, Tuple[int, ...]]
+    color_fit: float
+    pair_synergy: float
+    pair_matchup: float
+
+
+class IncrementalScorer:
+    """Recommendation state of one side of one draft, updated action by action.
+
+    Draft-independent terms are compiled once per data generation; the scorer
+    keeps per-row synergy/counter/strongInto counts and scores, and after each
+    action only rescores rows whose inputs changed: rows referencing the new
+    pick, rows of roles whose multiplier moved, rows whose color fit or team
+    color bonus moved. With match-history pair statistics on, every pick moves
+    the pair deltas of every row, so picks rescore the whole pool. Scores follow
+    the exact float operation order of `_score_champion`, so rankings are
+    identical to `rank_recommendations`. Only scoring is incremental: the
+    first `ranked()` after a change still groups the open pools and sorts them.
+    """
+
+    def __init__(self, loader: DataLoader, our_side: str):
+        self.loader = loader
+        self.our_side = our_side
+        self.enemy_side = "red" if our_side == "blue" else "blue"
+        self.data_key = _data_key(loader)
+        self.compiled = compile_rows(loader)
+        self.our_picks: Tuple[int, ...] = ()
+        self.enemy_picks: Tuple[int, ...] = ()
+        self.bans: FrozenSet[int] = frozenset()
+        size = len(self.compiled.rows)
+        self._synergy = [0] * size
+        self._counters = [0] * size
+        self._strong = [0] * size
+        self._scores: List[Optional[float]] = [None] * size
+        self._context: Optional[DraftContext] = None
+        self._role_multipliers: Dict[str, float] = {}
+        self._color_bonus: Dict[Tuple[str, ...], float] = {}
+        self._ranked: Optional[RankedRecommendations] = None
+        self._initial = True
+
+    def sync(self, draft: Draft) -> None:
+        """Bring the scorer up to `draft`, applying only the picks and bans it has not seen yet."""
+        our = draft.side(self.our_side).picks
+        enemy = draft.side(self.enemy_side).picks
+        bans = draft.banned()
+        if (
+            our[:len(self.our_picks)] != self.our_picks
+            or enemy[:len(self.enemy_picks)] != self.enemy_picks
+            or not self.bans <= bans
+        ):
+            raise ValueError("Draft state does not extend the scorer state")
+
+        new_our = our[len(self.our_picks):]
+        new_enemy = enemy[len(self.enemy_picks):]
+        if (
+            self._context is not None
+            and not (new_our or new_enemy or bans - self.bans)
+            and self._context.pair_stats is get_pair_stats()
+        ):
+            return
+
+        refs = self.compiled
+        for champ_id in new_our:
+            for row in refs.synergy_refs.get(champ_id, ()):
+                self._synergy[row] += 1
+                self._scores[row] = None
+        for champ_id in new_enemy:
+            for row in refs.counter_refs.get(champ_id, ()):
+                self._counters[row] += 1
+                self._scores[row] = None
+            for row in refs.strong_refs.get(champ_id, ()):
+                self._strong[row] += 1
+                self._scores[row] = None
+        self.our_picks = our
+        self.enemy_picks = enemy
+        self.bans = bans
+        self._refresh_context()
+        self._ranked = None
+
+    def ranked(self) -> RankedRecommendations:
+        if self._ranked is None:
+            self._ranked = self._rank()
+        return self._ranked
+
+    def _refresh_context(self) -> None:
+        previous = self._context
+        context = side_context(
+            self.loader,
+            [{"id": champ_id} for champ_id in self.our_picks],
+            [{"id": champ_id} for champ_id in self.enemy_picks],
+            {*self.our_picks, *self.enemy_picks, *self.bans},
+        )
+        self._context = context
+
+        multipliers = {
+            role: _role_multiplier(role, context.enemy_role_weights, context.scoring_weights)
+            for role in ROLE_ORDER
+        }
+        if previous is not None and (
+            previous.pair_stats is not context.pair_stats
+            or context.pair_stats is not None
+            and (previous.our_picks != context.our_picks or previous.enemy_picks != context.enemy_picks)
+        ):
+            # Pair deltas sum over every pick, so a new pick (or a new store) moves every row.
+            self._invalidate(range(len(self.compiled.rows)))
+        for role, multiplier in multipliers.items():
+            if previous is None or self._role_multipliers.get(role) != multiplier:
+                self._invalidate(self.compiled.rows_by_role.get(role, ()))
+        self._role_multipliers = multipliers
+
+        if previous is None or previous.team_color_counts != context.team_color_counts:
+            bonuses = {
+                colors: team_color_bonus(colors, context.team_color_counts, context.color_rules)[0]
+                for colors in self.compiled.rows_by_colors
+            }
+            for colors, bonus in bonuses.items():
+                if self._color_bonus.get(colors) != bonus:
+                    self._invalidate(self.compiled.rows_by_colors[colors])
+            self._color_bonus = bonuses
+        if previous is not None and previous.target_colors != context.target_colors:
+            for colors, rows in self.compiled.rows_by_colors.items():
+                if colors:
+                    self._invalidate(rows)
+
+    def _invalidate(self, rows: Sequence[int]) -> None:
+        for row in rows:
+            self._scores[row] = None
+
+    def _rank(self) -> RankedRecommendations:
+        context = self._context
+        roles = _pick_roles(context.profiles_by_role, context.role_order)
+        if not roles:
+            return RankedRecommendations(context, [], log=False)
+
+        rescored = 0
+        with RECOMMENDATION_STAGE_SECONDS.time(stage="scoring"), span("scoring"):
+            groups: Dict[int, CandidateGroup] = {}
+            for role, _profile in roles:
+                for row_index in self.compiled.rows_by_role.get(role, ()):
+                    row = self.compiled.rows[row_index]
+                    if row.champion_id in context.blocked_ids:
+                        continue
+                    score = self._scores[row_index]
+                    if score is None:
+                        score = self._score(row_index, context)
+                        self._scores[row_index] = score
+                        rescored += 1
+                    reasons = partial(_row_reasons, context, row)
+                    group = groups.get(row.champion_id)
+                    if group is None:
+                        groups[row.champion_id] = CandidateGroup(row.champion_id, score, [(role, reasons)])
+                        continue
+                    group.score = max(group.score, score)
+                    group.rows.append((role, reasons))
+        RECOMMENDATION_ROWS_SCORED.inc(rescored, update="initial" if self._initial else "incremental")
+        self._initial = False
+        return RankedRecommendations(context, list(groups.values()))
+
+    def _score(self, row_index: int, context: DraftContext) -> float:
+        # Same operations, in the same order, as `_score_champion`.
+        row = self.compiled.rows[row_index]
+        score = row.base
+        if context.target_colors:
+            matched = sum(1 for color in row.entry.colors if color in context.target_colors)
+            if matched:
+                score += self.compiled.color_fit * matched
+        role_multiplier = self._role_multipliers[row.role]
+        if role_multiplier != 1.0:
+            score *= role_multiplier
+        synergy = self._synergy[row_index]
+        if synergy:
+            score += row.synergy_factor * synergy
+        counters = self._counters[row_index]
+        if counters:
+            score -= row.counter_factor * counters
+        strong_into = self._strong[row_index]
+        if strong_into:
+            score += row.strong_factor * strong_into
+        color_bonus = self._color_bonus[row.entry.colors]
+        if color_bonus:
+            score += color_bonus
+        if context.pair_stats is not None:
+            pair_synergy, pair_matchup = context.pair_stats.deltas(
+                row.champion_id, row.role, context.our_picks, context.enemy_picks
+            )
+            if pair_synergy:
+                score += self.compiled.pair_synergy * pair_synergy
+            if pair_matchup:
+                score += self.compiled.pair_matchup * pair_matchup
+        return score
+
+
+def compile_rows(loader: DataLoader) -> CompiledRows:
+    try:
+        return loader.snapshot.derive(
+            "incremental_rows",
+            ROW_INPUT_FILES,
+            lambda *_raw: _compile_rows(loader),
+        )
+    except FileNotFoundError:
+        # Optional config files are missing; build without caching.
+        return _compile_rows(loader)
+
+
+def _compile_rows(loader: DataLoader) -> CompiledRows:
+    profiles_by_role = _load_profiles_by_role(loader)
+    scoring_weights = _load_scoring_weights(loader)
+    color_rules = _load_color_rules(loader)
+    how_good_weight = _weight(scoring_weights, "howGoodIAm", 0.0)
+    meta_weight = _weight(scoring_weights, "meta", 0.0)
+
+    rows: List[_Row] = []
+    rows_by_role: Dict[str, List[int]] = {}
+    rows_by_colors: Dict[Tuple[str, ...], List[int]] = {}
+    synergy_refs: Dict[int, List[int]] = {}
+    counter_refs: Dict[int, List[int]] = {}
+    strong_refs: Dict[int, List[int]] = {}
+    for role in ROLE_ORDER:
+        profile = profiles_by_role.get(role)
+        if profile is None:
+            continue
+        for entry in profile.entries:
+            multipliers = color_multipliers(entry.colors, color_rules)
+            row_index = len(rows)
+            rows.append(_Row(
+                champion_id=entry.id,
+                role=role,
+                entry=entry,
+                base=(entry.how_good * how_good_weight + entry.meta * meta_weight) * multipliers["base"],
+                synergy_factor=_weight(scoring_weights, "synergy", 0.0) * multipliers["synergyMultiplier"],
+                counter_factor=(
+                    _weight(scoring_weights, "counters", 0.0)
+                    * multipliers["counterMultiplier"]
+                    * _weight(scoring_weights, "counterPenaltyMultiplier", 0.7)
+                ),
+                strong_factor=_weight(scoring_weights, "strongInto", 0.0) * multipliers["strongIntoMultiplier"],
+            ))
+            rows_by_role.setdefault(role, []).append(row_index)
+            rows_by_colors.setdefault(entry.colors, []).append(row_index)
+            for refs, ids in ((synergy_refs, entry.synergy), (counter_refs, entry.counters), (strong_refs, entry.strong_into)):
+                for champ_id in ids:
+                    refs.setdefault(champ_id, []).append(row_index)
+
+    return CompiledRows(
+        rows=tuple(rows),
+        rows_by_role={role: tuple(indices) for role, indices in rows_by_role.items()},
+        rows_by_colors={colors: tuple(indices) for colors, indices in rows_by_colors.items()},
+        synergy_refs={champ_id: tuple(indices) for champ_id, indices in synergy_refs.items()},
+        counter_refs={champ_id: tuple(indices) for champ_id, indices in counter_refs.items()},
+        strong_refs={champ_id: tuple(indices) for champ_id, indices in strong_refs.items()},
+        color_fit=_weight(scoring_weights, "colorFit", 0.0),
+        pair_synergy=_weight(scoring_weights, "pairSynergy", 0.0),
+        pair_matchup=_weight(scoring_weights, "pairMatchup", 0.0),
+    )
+
+
+def _row_reasons(context: DraftContext, row: _Row) -> List[str]:
+    _score, reasons = _score_champion(
+        row.entry,
+        context.scoring_weights,
+        context.color_rules,
+        context.team_color_counts,
+        context.target_colors,
+        row.role,
+        context.enemy_role_weights,
+        context.our_picks,
+        context.enemy_picks,
+        context.pair_stats,
+    )
+    reasons.append(f"role focus: {row.role}")
+    return reasons
+
+
+def _data_key(loader: DataLoader) -> Tuple[int, ...]:
+    generations = []
+    for path in SCORING_INPUT_FILES:
+        try:
+            generations.append(loader.snapshot.generation(path))
+        except FileNotFoundError:
+            generations.append(-1)
+    return tuple(generations)
+
+
+class DraftScorerCache:
+    """Bounded LRU of `IncrementalScorer`s keyed by (draft id, side).
+
+    A cached scorer is brought forward with `sync`; it is rebuilt when the
+    scoring data changed or the draft state does not extend what it has seen.
+    The draft routes `discard` a draft's scorers once it is full or gone.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+
+    def ranked(self, draft: Draft, our_side: str, loader: DataLoader) -> RankedRecommendations:
+        key = (draft.draft_id, our_side)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _CacheEntry()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        with entry.lock:
+            scorer = entry.scorer
+            if scorer is not None and scorer.data_key == _data_key(loader):
+                try:
+                    scorer.sync(draft)
+                    return scorer.ranked()
+                except ValueError:
+                    pass
+            scorer = entry.scorer = IncrementalScorer(loader, our_side)
+            scorer.sync(draft)
+            return scorer.ranked()
+
+    def discard(self, draft_id: str) -> None:
+        with self._lock:
+            for side in ("blue", "red"):
+                self._entries.pop((draft_id, side), None)
+
+
+class _CacheEntry:
+    __slots__ = ("lock", "scorer")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.scorer: Optional[IncrementalScorer] = None
+
+
+_scorers: Optional[DraftScorerCache] = None
+_scorers_lock = threading.Lock()
+
+
+def get_draft_scorers() -> DraftScorerCache:
+    global _scorers
+    if _scorers is None:
+        with _scorers_lock:
+            if _scorers is None:
+                _scorers = DraftScorerCache()
+    return _scorers
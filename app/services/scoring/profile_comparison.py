@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from app.core.metrics import RECOMMENDATION_STAGE_SECONDS
+from app.core.tracing import span
+from app.models.domain.profile import ProfileEntry, RoleCatalog, RoleProfile
+from app.models.domain.recommendation import Recommendation
+from app.models.schemas.recommendation_schemas import DraftRecommendationRequest
+from app.services.scoring.scoring_engine import DraftContext, _score_champion, build_draft_context
+from app.services.storage.data_loader import DataLoader, ROLE_FILES, ROLE_ORDER
+
+
+@dataclass(frozen=True)
+class ProfileRanking:
+    role: str
+    profile: str
+    active: bool
+    recommendations: List[Recommendation]
+
+    @property
+    def best_score(self) -> Optional[float]:
+        return self.recommendations[0].score if self.recommendations else None
+
+
+@dataclass(frozen=True)
+class LineupSlot:
+    role: str
+    profile: str
+    champion_id: int
+    score: float
+
+
+@dataclass
+class ProfileComparison:
+    rankings: List[ProfileRanking]
+    lineup: List[LineupSlot]
+
+    @property
+    def lineup_score(self) -> float:
+        return sum(slot.score for slot in self.lineup)
+
+
+def compare_profiles(
+    payload: DraftRecommendationRequest,
+    loader: DataLoader,
+    selection: Optional[Mapping[str, Sequence[str]]] = None,
+    limit: int = 10,
+) -> ProfileComparison:
+    """Score the open roles of one draft state against every selected profile of each role.
+
+    The draft context is built once and an entry shared by several profiles of
+    a role (same champion, same values) is scored once. `selection` maps roles
+    to profile names; roles it leaves out compare all their profiles.
+    """
+    catalogs = _load_profile_catalog(loader)
+    profiles_by_role = _select_profiles(catalogs, selection or {})
+    context = build_draft_context(payload, loader)
+
+    rankings: List[ProfileRanking] = []
+    # role -> champion id -> (score, profile) of its best profile.
+    best: Dict[str, Dict[int, Tuple[float, str]]] = {}
+    with RECOMMENDATION_STAGE_SECONDS.time(stage="scoring"), span("scoring"):
+        for role in context.role_order:
+            scored: Dict[ProfileEntry, Tuple[float, List[str]]] = {}
+            role_best = best[role] = {}
+            for profile in profiles_by_role.get(role, ()):
+                rows = []
+                for entry in profile.entries:
+                    if entry.id in context.blocked_ids:
+                        continue
+                    result = scored.get(entry)
+                    if result is None:
+                        result = scored[entry] = _score_entry(entry, role, context)
+                    rows.append((result[0], entry.id, result[1]))
+                    current = role_best.get(entry.id)
+                    if current is None or result[0] > current[0]:
+                        role_best[entry.id] = (result[0], profile.name)
+                # nlargest keeps the order of a stable descending sort, ties included.
+                top = heapq.nlargest(limit, rows, key=lambda row: row[0])
+                rankings.append(ProfileRanking(
+                    role=role,
+                    profile=profile.name,
+                    active=profile.name == catalogs[role].active,
+                    recommendations=[
+                        Recommendation(champ_id, score, (role,), (*reasons, f"role focus: {role}"))
+                        for score, champ_id, reasons in top
+                    ],
+                ))
+    with RECOMMENDATION_STAGE_SECONDS.time(stage="lineup"), span("lineup"):
+        lineup = best_lineup(context.role_order, best)
+    return ProfileComparison(rankings=rankings, lineup=lineup)
+
+
+def best_lineup(roles: Sequence[str], best: Mapping[str, Mapping[int, Tuple[float, str]]]) -> List[LineupSlot]:
+    """Highest-total assignment of distinct champions to `roles`, each with its best profile.
+
+    A role can only lose its top champions to the other roles, so its
+    `len(roles)` best champions are enough candidates for an exact search.
+    Ties keep the earlier role order and higher-ranked candidates.
+    """
+    candidates: List[Tuple[str, List[Tuple[float, int, str]]]] = []
+    for role in roles:
+        options = heapq.nlargest(
+            len(roles),
+            ((score, champ_id, profile) for champ_id, (score, profile) in best.get(role, {}).items()),
+            key=lambda option: option[0],
+        )
+        if options:
+            candidates.append((role, options))
+
+    best_total: Optional[float] = None
+    best_picks: List[Optional[Tuple[float, int, str]]] = []
+    picks: List[Optional[Tuple[float, int, str]]] = []
+    taken: Set[int] = set()
+
+    def search(idx: int, total: float) -> None:
+        nonlocal best_total, best_picks
+        if idx == len(candidates):
+            if best_total is None or total > best_total:
+                best_total, best_picks = total, list(picks)
+            return
+        placed = False
+        for option in candidates[idx][1]:
+            if option[1] in taken:
+                continue
+            placed = True
+            taken.add(option[1])
+            picks.append(option)
+            search(idx + 1, total + option[0])
+            picks.pop()
+            taken.discard(option[1])
+        if not placed:
+            # Every candidate went to other roles; leave this one empty.
+            picks.append(None)
+            search(idx + 1, total)
+            picks.pop()
+
+    search(0, 0.0)
+    return [
+        LineupSlot(role=role, profile=pick[2], champion_id=pick[1], score=pick[0])
+        for (role, _options), pick in zip(candidates, best_picks)
+        if pick is not None
+    ]
+
+
+def _score_entry(entry: ProfileEntry, role: str, context: DraftContext) -> Tuple[float, List[str]]:
+    return _score_champion(
+        entry,
+        context.scoring_weights,
+        context.color_rules,
+        context.team_color_counts,
+        context.target_colors,
+        role,
+        context.enemy_role_weights,
+        context.our_picks,
+        context.enemy_picks,
+        context.pair_stats,
+    )
+
+
+def _select_profiles(
+    catalogs: Dict[str, RoleCatalog],
+    selection: Mapping[str, Sequence[str]],
+) -> Dict[str, Tuple[RoleProfile, ...]]:
+    unknown_roles = sorted(set(selection) - set(ROLE_ORDER))
+    if unknown_roles:
+        raise ValueError(f"Unknown role(s): {', '.join(unknown_roles)}")
+    selected: Dict[str, Tuple[RoleProfile, ...]] = {}
+    for role, catalog in catalogs.items():
+        if role not in selection:
+            selected[role] = catalog.profiles
+            continue
+        by_name = {profile.name: profile for profile in catalog.profiles}
+        missing = [name for name in selection[role] if name not in by_name]
+        if missing:
+            raise ValueError(f"Unknown profile(s) for role {role}: {', '.join(missing)}")
+        selected[role] = tuple(by_name[name] for name in dict.fromkeys(selection[role]))
+    return selected
+
+
+def _load_profile_catalog(loader: DataLoader) -> Dict[str, RoleCatalog]:
+    return loader.snapshot.derive(
+        "profile_catalog",
+        ROLE_FILES,
+        lambda *_raw: {role: RoleCatalog.from_store(loader.role_store(role)) for role in ROLE_ORDER},
+    )
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from app.services.storage.data_loader import ROLE_ORDER
+
+ROLE_BITS = {role: 1 << idx for idx, role in enumerate(ROLE_ORDER)}
+ROLE_MASKS = 1 << len(ROLE_ORDER)
+
+
+@dataclass(frozen=True)
+class RoleDistribution:
+    """Role occupancy of one side over every maximum role assignment of its picks, each equally likely."""
+
+    placed: int       # picks placed in a maximum assignment
+    assignments: int  # number of distinct maximum assignments
+    role_probabilities: Dict[str, float]
+
+
+class RoleSolver:
+    """Assigns picks to the five lanes with a bitmask DP over the used-role set.
+
+    Cost is O(picks * 2^5 * roles) whatever the number of listed roles per
+    champion. Results are memoized per pick set: the locked roles on the pick
+    sequence (ties between maximum assignments follow pick order, as the
+    previous backtracking search did) and the distribution on the frozenset of
+    champion ids.
+    """
+
+    def __init__(self, role_index: Dict[int, Set[str]], cache_size: int = 4096):
+        self.role_index = role_index
+        self._role_bits: Dict[int, Tuple[int, ...]] = {
+            champ_id: tuple(ROLE_BITS[role] for role in sorted(roles, key=ROLE_ORDER.index))
+            for champ_id, roles in role_index.items()
+        }
+        self.locked_roles = lru_cache(maxsize=cache_size)(self._locked_roles)
+        self.distribution = lru_cache(maxsize=cache_size)(self._distribution)
+
+    def _candidates(self, champion_ids: Iterable[int]) -> List[Tuple[int, ...]]:
+        return [bits for bits in (self._role_bits.get(champ_id, ()) for champ_id in champion_ids) if bits]
+
+    def _locked_roles(self, champion_ids: Tuple[int, ...]) -> FrozenSet[str]:
+        """Roles of the first maximum assignment, trying each pick's roles in lane order before leaving it unplaced."""
+        candidates = sorted(self._candidates(champion_ids), key=len)
+        # best[(i, mask)]: most picks from candidates[i:] that can still be placed with `mask` taken.
+        best: Dict[Tuple[int, int], int] = {}
+
+        def placeable(idx: int, mask: int) -> int:
+            if idx == len(candidates):
+                return 0
+            key = (idx, mask)
+            placed = best.get(key)
+            if placed is None:
+                bound = min(len(candidates) - idx, len(ROLE_ORDER) - bin(mask).count("1"))
+                placed = 0
+                for bit in candidates[idx]:
+                    if not mask & bit:
+                        placed = max(placed, placeable(idx + 1, mask | bit) + 1)
+                        if placed == bound:
+                            break
+                if placed < bound:
+                    placed = max(placed, placeable(idx + 1, mask))
+                best[key] = placed
+            return placed
+
+        mask = 0
+        for idx, bits in enumerate(candidates):
+            target = placeable(idx, mask)
+            for bit in bits:
+                if not mask & bit and placeable(idx + 1, mask | bit) + 1 == target:
+                    mask |= bit
+                    break
+        return frozenset(role for role, bit in ROLE_BITS.items() if mask & bit)
+
+    def _distribution(self, champion_ids: FrozenSet[int]) -> RoleDistribution:
+        # ways[mask]: partial assignments of the picks seen so far that use exactly `mask`.
+        ways = {0: 1}
+        for bits in self._candidates(sorted(champion_ids)):
+            following = dict(ways)
+            for mask, count in ways.items():
+                for bit in bits:
+                    if not mask & bit:
+                        following[mask | bit] = following.get(mask | bit, 0) + count
+            ways = following
+
+        placed = max(bin(mask).count("1") for mask in ways)
+        maximum = {mask: count for mask, count in ways.items() if bin(mask).count("1") == placed}
+        assignments = sum(maximum.values())
+        probabilities: Dict[str, float] = {}
+        if placed:
+            for role, bit in ROLE_BITS.items():
+                share = sum(count for mask, count in maximum.items() if mask & bit)
+                if share:
+                    probabilities[role] = share / assignments
+        return RoleDistribution(placed=placed, assignments=assignments, role_probabilities=probabilities)
@@ -1,90 +1,267 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Set, Tuple
-
-from app.models.schemas.recommendation_schemas import DraftRecommendationRequest, RecommendationItem
+import heapq
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import RECOMMENDATION_STAGE_SECONDS
+from app.core.tracing import span
+from app.models.domain.champion import Champion, champions_by_id
+from app.models.domain.profile import ProfileEntry, RoleProfile
+from app.models.domain.recommendation import Recommendation
+from app.models.schemas.recommendation_schemas import DraftRecommendationRequest
+from app.services.draft_engine.format_engine import TurnInfo
+from app.services.history.pair_stats import PairStatsStore, get_pair_stats
 from app.services.scoring.color_rules import color_multipliers, team_color_bonus
-from app.services.storage.data_loader import DataLoader, ROLE_ORDER
+from app.services.scoring.role_assignment import RoleDistribution, RoleSolver
+from app.services.storage.data_loader import DataLoader, ROLE_FILES, ROLE_ORDER
+
+
+@dataclass(frozen=True)
+class DraftContext:
+    profiles_by_role: Dict[str, RoleProfile]
+    our_picks: Set[int]
+    enemy_picks: Set[int]
+    locked_our_roles: Set[str]
+    locked_enemy_roles: Set[str]
+    scoring_weights: Dict[str, float]
+    enemy_role_weights: Dict[str, float]
+    remaining_roles: List[str]
+    role_order: List[str]
+    color_rules: Dict
+    team_color_counts: Dict[str, int]
+    target_colors: List[str]
+    blocked_ids: Set[int]
+    # Match-history pair deltas, only when PAIR_STATS_SCORING is on and the store is readable.
+    pair_stats: Optional[PairStatsStore] = None
+
+
+@dataclass(frozen=True)
+class ScoringInputs:
+    """The per-data-version inputs of a draft context, loaded together."""
+
+    profiles_by_role: Dict[str, RoleProfile]
+    role_solver: RoleSolver
+    scoring_weights: Dict[str, float]
+    color_rules: Dict
+    color_index: Dict[int, Set[str]]
+
+
+def load_scoring_inputs(loader: DataLoader) -> ScoringInputs:
+    return ScoringInputs(
+        profiles_by_role=_load_profiles_by_role(loader),
+        role_solver=_load_role_solver(loader),
+        scoring_weights=_load_scoring_weights(loader),
+        color_rules=_load_color_rules(loader),
+        color_index=_load_color_index(loader),
+    )
 
 
-def build_recommendations(payload: DraftRecommendationRequest, loader: DataLoader) -> List[RecommendationItem]:
-    profiles_by_role = _load_profiles_by_role(loader)
+def build_draft_context(
+    payload: DraftRecommendationRequest,
+    loader: DataLoader,
+    inputs: Optional[ScoringInputs] = None,
+) -> DraftContext:
+    if inputs is None:
+        _ensure_role_profiles(loader)
     our_pick_slots = getattr(payload.draftState.picks, payload.ourSide)
     _validate_pick_slots(our_pick_slots, payload.ourSide)
-    our_picks = _champion_ids(our_pick_slots)
     enemy_side = "red" if payload.ourSide == "blue" else "blue"
     enemy_pick_slots = getattr(payload.draftState.picks, enemy_side)
     _validate_pick_slots(enemy_pick_slots, enemy_side)
+    return side_context(loader, our_pick_slots, enemy_pick_slots, _blocked_champions(payload), inputs)
+
+
+def side_context(
+    loader: DataLoader,
+    our_pick_slots: Iterable,
+    enemy_pick_slots: Iterable,
+    blocked_ids: Set[int],
+    inputs: Optional[ScoringInputs] = None,
+) -> DraftContext:
+    """Scoring context for one side; pick slots are champion refs, `{"id": ...}` dicts or None.
+
+    `inputs` are loaded from `loader` unless given (e.g. by the shared compiled snapshot).
+    """
+    with RECOMMENDATION_STAGE_SECONDS.time(stage="data_load"), span("data_load"):
+        if inputs is None:
+            inputs = load_scoring_inputs(loader)
+        scoring_weights = inputs.scoring_weights
+        pair_stats = get_pair_stats()
+
+    with RECOMMENDATION_STAGE_SECONDS.time(stage="role_inference"), span("role_inference"):
+        locked_our_roles, locked_enemy_roles, enemy_role_weights = _role_pressure(
+            inputs.role_solver,
+            _pick_id_sequence(our_pick_slots),
+            _pick_id_sequence(enemy_pick_slots),
+            scoring_weights,
+        )
+        remaining_roles = _remaining_roles(locked_our_roles)
+        role_order = _prioritized_roles(remaining_roles, enemy_role_weights)
+
+    our_picks = _champion_ids(our_pick_slots)
     enemy_picks = _champion_ids(enemy_pick_slots)
-    champion_role_index = _load_champion_role_index(loader)
-
-    locked_our_roles = _infer_locked_roles(our_pick_slots, champion_role_index)
-    locked_enemy_roles = _infer_locked_roles(enemy_pick_slots, champion_role_index)
-    scoring_weights = _load_scoring_weights(loader)
-    enemy_role_weights = _enemy_role_weights(
-        locked_enemy_roles,
-        locked_our_roles,
-        scoring_weights,
+    team_color_counts = _team_color_counts(our_picks, inputs.color_index)
+    target_colors = _target_team_colors(team_color_counts)
+
+    return DraftContext(
+        profiles_by_role=inputs.profiles_by_role,
+        our_picks=our_picks,
+        enemy_picks=enemy_picks,
+        locked_our_roles=locked_our_roles,
+        locked_enemy_roles=locked_enemy_roles,
+        scoring_weights=scoring_weights,
+        enemy_role_weights=enemy_role_weights,
+        remaining_roles=remaining_roles,
+        role_order=role_order,
+        color_rules=inputs.color_rules,
+        team_color_counts=team_color_counts,
+        target_colors=target_colors,
+        blocked_ids=blocked_ids,
+        pair_stats=pair_stats,
     )
-    remaining_roles = _remaining_roles(locked_our_roles)
-    role_order = _prioritized_roles(remaining_roles, enemy_role_weights)
 
-    roles_profiles = _pick_roles(profiles_by_role, role_order)
-    color_rules = _load_color_rules(loader)
-    color_index = _build_color_index(profiles_by_role)
-    team_color_counts = _team_color_counts(our_picks, color_index)
-    target_colors = _target_team_colors(team_color_counts)
 
+# Reasons are either built eagerly or on demand, so only selected candidates pay for them.
+ReasonSource = Union[List[str], Callable[[], List[str]]]
 
-    if not roles_profiles:
-        return []
+LOGGED_RECOMMENDATIONS = 5
 
-    blocked_ids = _blocked_champions(payload)
+logger = get_logger(__name__)
 
-    recommendations_by_id: Dict[int, RecommendationItem] = {}
-    for role, profile in roles_profiles:
-        for champ in profile.get("champions", []):
-            champ_id = champ.get("id")
-            if champ_id in blocked_ids:
+
+@dataclass(slots=True)
+class CandidateGroup:
+    """Every scored row of one champion, merged into a single recommendation on demand."""
+
+    champion_id: int
+    score: float
+    rows: List[Tuple[str, ReasonSource]]
+
+    def to_recommendation(self) -> Recommendation:
+        roles: List[str] = []
+        reasons: List[str] = []
+        for idx, (role, source) in enumerate(self.rows):
+            row_roles = [role] if role else []
+            row_reasons = source() if callable(source) else source
+            if idx == 0:
+                roles, reasons = row_roles, row_reasons
+                continue
+            roles = _merge_roles(roles, row_roles)
+            reasons = _merge_reasons(reasons, row_reasons)
+        return Recommendation(self.champion_id, self.score, tuple(roles), tuple(reasons))
+
+
+class RankedRecommendations:
+    """Scored candidates of one draft state, ranked by score without building every item."""
+
+    def __init__(self, context: DraftContext, groups: List[CandidateGroup], log: bool = True):
+        self.context = context
+        self.groups = groups
+        self.log = log
+
+    def select(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        min_score: Optional[float] = None,
+    ) -> List[Recommendation]:
+        groups = self._eligible(min_score)
+        with RECOMMENDATION_STAGE_SECONDS.time(stage="sort"), span("sort"):
+            if limit is None:
+                ranked = sorted(groups, key=_group_score, reverse=True)
+            else:
+                # nlargest keeps the order of a stable descending sort, ties included.
+                ranked = heapq.nlargest(max(offset + limit, LOGGED_RECOMMENDATIONS), groups, key=_group_score)
+        with RECOMMENDATION_STAGE_SECONDS.time(stage="merge"), span("merge"):
+            items = [group.to_recommendation() for group in ranked]
+        self._log(items)
+        end = None if limit is None else offset + limit
+        return items[offset:end]
+
+    def stream(self, min_score: Optional[float] = None) -> Iterator[Recommendation]:
+        with RECOMMENDATION_STAGE_SECONDS.time(stage="sort"), span("sort"):
+            ranked = sorted(self._eligible(min_score), key=_group_score, reverse=True)
+        head = [group.to_recommendation() for group in ranked[:LOGGED_RECOMMENDATIONS]]
+        self._log(head)
+        yield from head
+        for group in ranked[LOGGED_RECOMMENDATIONS:]:
+            yield group.to_recommendation()
+
+    def _eligible(self, min_score: Optional[float]) -> List[CandidateGroup]:
+        if min_score is None:
+            return self.groups
+        return [group for group in self.groups if group.score >= min_score]
+
+    def _log(self, items: List[Recommendation]) -> None:
+        if not self.log:
+            return
+        _log_recommendations(
+            items,
+            self.context.enemy_role_weights,
+            self.context.locked_our_roles,
+            self.context.locked_enemy_roles,
+            self.context.remaining_roles,
+            self.context.role_order,
+        )
+
+
+def _group_score(group: CandidateGroup) -> float:
+    return group.score
+
+
+def build_recommendations(
+    payload: DraftRecommendationRequest,
+    loader: DataLoader,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    min_score: Optional[float] = None,
+) -> List[Recommendation]:
+    return rank_recommendations(payload, loader).select(limit, offset, min_score)
+
+def rank_recommendations(payload: DraftRecommendationRequest, loader: DataLoader) -> RankedRecommendations:
+    context = build_draft_context(payload, loader)
+    if not _pick_roles(context.profiles_by_role, context.role_order):
+        return RankedRecommendations(context, [], log=False)
+    with RECOMMENDATION_STAGE_SECONDS.time(stage="scoring"), span("scoring"):
+        groups = _group_candidates(score_candidates(context))
+    return RankedRecommendations(context, groups)
+
+def score_candidates(context: DraftContext) -> Iterator[Tuple[int, str, float, List[str]]]:
+    """Yield (championId, role, score, reasons) for every unblocked entry of the open role pools."""
+    for role, profile in _pick_roles(context.profiles_by_role, context.role_order):
+        for entry in profile.entries:
+            if entry.id in context.blocked_ids:
                 continue
             score, reasons = _score_champion(
-                champ,
-                scoring_weights,
-                color_rules,
-                team_color_counts,
-                target_colors,
+                entry,
+                context.scoring_weights,
+                context.color_rules,
+                context.team_color_counts,
+                context.target_colors,
                 role,
-                enemy_role_weights,
-                our_picks,
-                enemy_picks,
+                context.enemy_role_weights,
+                context.our_picks,
+                context.enemy_picks,
+                context.pair_stats,
             )
             if role:
                 reasons.append(f"role focus: {role}")
-            item = RecommendationItem(
-                championId=champ_id,
-                score=score,
-                roles=[role] if role else [],
-                reasons=reasons,
-            )
-            existing = recommendations_by_id.get(champ_id)
-            if existing is None:
-                recommendations_by_id[champ_id] = item
-                continue
-            existing.score = max(existing.score, item.score)
-            existing.roles = _merge_roles(existing.roles, item.roles)
-            existing.reasons = _merge_reasons(existing.reasons, item.reasons)
-
-    recommendations = list(recommendations_by_id.values())
-    recommendations.sort(key=lambda item: item.score, reverse=True)
-    _log_recommendations(
-        recommendations,
-        enemy_role_weights,
-        locked_our_roles,
-        locked_enemy_roles,
-        remaining_roles,
-        role_order,
-    )
-    return recommendations
+            yield entry.id, role, score, reasons
+
+def _group_candidates(rows: Iterable[Tuple[int, str, float, ReasonSource]]) -> List[CandidateGroup]:
+    groups: Dict[int, CandidateGroup] = {}
+    for champ_id, role, score, reasons in rows:
+        group = groups.get(champ_id)
+        if group is None:
+            groups[champ_id] = CandidateGroup(champ_id, score, [(role, reasons)])
+            continue
+        group.score = max(group.score, score)
+        group.rows.append((role, reasons))
+    return list(groups.values())
 
 def _remaining_roles(locked_roles: Set[str]) -> List[str]:
     if not locked_roles:
@@ -99,24 +276,98 @@ def _validate_pick_slots(champions: List, side: str) -> None:
             f"{', '.join(ROLE_ORDER)}"
         )
 
-def _load_profiles_by_role(loader: DataLoader) -> Dict[str, dict]:
-    return {profile["role"]: profile for profile in loader.role_profiles()}
+def _root_action_index(payload: DraftRecommendationRequest, turns: Sequence[TurnInfo]) -> int:
+    """Index in `turns` of the action `payload.target` asks about.
+
+    Picks count by filled slot (they are role-ordered); bans count by position.
+    The draft is past the latest turn the state shows done, so every empty ban
+    slot before it, including the rest of a completed ban phase, is a ban that
+    was passed. Raises ValueError when the picks do not fit the format or the
+    target is not the action the format expects next.
+    """
+    picks = payload.draftState.picks
+    bans = payload.draftState.bans
+    done = {
+        ("pick", side): len(_pick_id_sequence(getattr(picks, side))) for side in ("blue", "red")
+    }
+    done.update({("ban", side): _filled_length(getattr(bans, side)) for side in ("blue", "red")})
+
+    # Turn indices of each (action type, side), in format order.
+    slots: Dict[Tuple[str, str], List[int]] = {key: [] for key in done}
+    for index, turn in enumerate(turns):
+        slots[(turn.action_type, turn.side_to_act)].append(index)
+    actions_done = 0
+    for (action_type, side), count in done.items():
+        if count > len(slots[(action_type, side)]):
+            raise ValueError(f"{side} has {count} {action_type}s, the format allows {len(slots[(action_type, side)])}")
+        if count:
+            actions_done = max(actions_done, slots[(action_type, side)][count - 1] + 1)
+    for side in ("blue", "red"):
+        expected = sum(1 for index in slots[("pick", side)] if index < actions_done)
+        if done[("pick", side)] != expected:
+            raise ValueError(f"{side} has {done[('pick', side)]} picks, the format expects {expected} at this point")
+    if actions_done >= len(turns):
+        return actions_done
+
+    target = payload.target
+    turn = turns[actions_done]
+    if (target.type, target.side) != (turn.action_type, turn.side_to_act):
+        raise ValueError(
+            f"Target {target.side} {target.type} is not the next action: "
+            f"the format expects {turn.side_to_act} {turn.action_type}"
+        )
+    if target.type == "ban":
+        next_slot = sum(1 for index in slots[("ban", target.side)] if index < actions_done)
+        if target.idx != next_slot:
+            raise ValueError(f"Target {target.side} ban slot {target.idx} is not the next ban slot ({next_slot})")
+    else:
+        side_slots = getattr(picks, target.side)
+        if target.idx >= len(side_slots) or side_slots[target.idx] is not None:
+            raise ValueError(f"Target {target.side} pick slot {target.idx} is not an empty slot")
+    return actions_done
+
+def _filled_length(slots: Sequence) -> int:
+    # Position after the last filled slot.
+    for position in range(len(slots), 0, -1):
+        if slots[position - 1] is not None:
+            return position
+    return 0
+
+def _load_profiles_by_role(loader: DataLoader) -> Dict[str, RoleProfile]:
+    return loader.snapshot.derive(
+        "profiles_by_role",
+        ROLE_FILES,
+        lambda *_raw: {profile["role"]: RoleProfile.from_dict(profile) for profile in loader.role_profiles()},
+    )
+
+def _ensure_role_profiles(loader: DataLoader) -> None:
+    # Loads (and caches) the active profiles only for their errors: a missing one
+    # raises FileNotFoundError (404) before any validation of the request.
+    _load_profiles_by_role(loader)
 
 def _load_champion_role_index(loader: DataLoader) -> Dict[int, Set[str]]:
+    # Shared per data version; callers must not mutate the returned sets.
     try:
-        champions = loader.champions()
+        return loader.snapshot.derive(
+            "champion_role_index",
+            ["champions.json"],
+            lambda raw: _build_champion_role_index(champions_by_id(raw).values()),
+        )
     except FileNotFoundError:
         return {}
-    role_index: Dict[int, Set[str]] = {}
-    for champion in champions:
-        champ_id = champion.get("id")
-        if champ_id is None:
-            continue
-        roles = champion.get("roles", [])
-        if not roles:
-            continue
-        role_index[champ_id] = set(roles)
-    return role_index
+
+def _load_role_solver(loader: DataLoader) -> RoleSolver:
+    try:
+        return loader.snapshot.derive(
+            "role_solver",
+            ["champions.json"],
+            lambda _raw: RoleSolver(_load_champion_role_index(loader)),
+        )
+    except FileNotFoundError:
+        return RoleSolver({})
+
+def _build_champion_role_index(champions: Iterable[Champion]) -> Dict[int, Set[str]]:
+    return {champion.id: set(champion.roles) for champion in champions if champion.roles}
 
 def _prioritized_roles(remaining_roles: List[str], enemy_role_weights: Dict[str, float]) -> List[str]:
     if not remaining_roles:
@@ -126,13 +377,13 @@ def _prioritized_roles(remaining_roles: List[str], enemy_role_weights: Dict[str,
         key=lambda role: (-enemy_role_weights.get(role, 1.0), ROLE_ORDER.index(role)),
     )
 
-def _pick_roles(profiles_by_role: Dict[str, dict], role_order: List[str]) -> List[Tuple[str, dict]]:
-    roles_profiles: List[Tuple[str, dict]] = []
+def _pick_roles(profiles_by_role: Dict[str, RoleProfile], role_order: List[str]) -> List[Tuple[str, RoleProfile]]:
+    roles_profiles: List[Tuple[str, RoleProfile]] = []
     for role in role_order:
         profile = profiles_by_role.get(role)
         if profile is None:
             continue
-        if profile.get("champions"):
+        if profile.entries:
             roles_profiles.append((role, profile))
     return roles_profiles
 
@@ -159,7 +410,7 @@ def _champion_ids(champions: Iterable) -> Set[int]:
     return ids
 
 def _score_champion(
-    profile_champ: dict,
+    entry: ProfileEntry,
     scoring_weights: Dict[str, float],
     color_rules: Dict,
     team_color_counts: Dict[str, int],
@@ -168,14 +419,15 @@ def _score_champion(
     enemy_role_weights: Dict[str, float],
     our_picks: Set[int],
     enemy_picks: Set[int],
+    pair_stats: Optional[PairStatsStore] = None,
 ) -> Tuple[float, List[str]]:
     reasons: List[str] = []
-    colors = profile_champ.get("colors", [])
+    colors = entry.colors
     multipliers = color_multipliers(colors, color_rules)
 
     # Step 1: Base comfort + meta contribution.
-    how_good = profile_champ.get("howGoodIAm", 0)
-    meta = profile_champ.get("meta", 0)
+    how_good = entry.how_good
+    meta = entry.meta
     score = (
         how_good * _weight(scoring_weights, "howGoodIAm", 0.0)
         + meta * _weight(scoring_weights, "meta", 0.0)
@@ -206,20 +458,20 @@ def _score_champion(
         score *= role_multiplier
 
     # Step 4: Synergy with our picks (color multipliers can boost this).
-    synergy = _matching_count(profile_champ.get("synergy", []), our_picks)
+    synergy = _matching_count(entry.synergy, our_picks)
     if synergy:
         score += _weight(scoring_weights, "synergy", 0.0) * multipliers["synergyMultiplier"] * synergy
         reasons.append(f"synergy with {synergy} pick(s)")
 
     # Step 5: Counter + strong-into vs enemy picks (green/red multipliers matter here).
-    counters = _matching_count(profile_champ.get("counters", []), enemy_picks)
+    counters = _matching_count(entry.counters, enemy_picks)
     if counters:
         counter_multiplier = multipliers["counterMultiplier"]
         penalty_multiplier = _weight(scoring_weights, "counterPenaltyMultiplier", 0.7)
         score -= _weight(scoring_weights, "counters", 0.0) * counter_multiplier * penalty_multiplier * counters
         reasons.append(f"countered by {counters} enemy pick(s)")
 
-    strong_into = _matching_count(profile_champ.get("strongInto", []), enemy_picks)
+    strong_into = _matching_count(entry.strong_into, enemy_picks)
     if strong_into:
         score += _weight(scoring_weights, "strongInto", 0.0) * multipliers["strongIntoMultiplier"] * strong_into
         reasons.append(f"strong into {strong_into} enemy pick(s)")
@@ -230,6 +482,16 @@ def _score_champion(
         score += color_bonus
         reasons.extend(color_reasons)
 
+    # Step 7: Match-history win-rate deltas with our picks and against enemy picks (opt-in).
+    if pair_stats is not None:
+        pair_synergy, pair_matchup = pair_stats.deltas(entry.id, role, our_picks, enemy_picks)
+        if pair_synergy:
+            score += _weight(scoring_weights, "pairSynergy", 0.0) * pair_synergy
+            reasons.append(f"history synergy {pair_synergy:+.1%}")
+        if pair_matchup:
+            score += _weight(scoring_weights, "pairMatchup", 0.0) * pair_matchup
+            reasons.append(f"history matchup {pair_matchup:+.1%}")
+
     return score, reasons
 
 def _matching_count(reference_ids: Iterable[int], target_ids: Set[int]) -> int:
@@ -259,50 +521,17 @@ def _merge_roles(left: List[str], right: List[str]) -> List[str]:
         merged.append(role)
     return sorted(merged, key=ROLE_ORDER.index)
 
-def _infer_locked_roles(champions: Iterable, role_index: Dict[int, Set[str]]) -> Set[str]:
-    candidate_roles: List[List[str]] = []
+def _pick_id_sequence(champions: Iterable) -> Tuple[int, ...]:
+    ids: List[int] = []
     for champ in champions:
         if champ is None:
             continue
         champ_id = getattr(champ, "id", None)
         if champ_id is None and isinstance(champ, dict):
             champ_id = champ.get("id")
-        if champ_id is None:
-            continue
-        roles = sorted(role_index.get(champ_id, []), key=ROLE_ORDER.index)
-        if roles:
-            candidate_roles.append(roles)
-    return _best_role_assignment(candidate_roles)
-
-def _best_role_assignment(candidate_roles: List[List[str]]) -> Set[str]:
-    if not candidate_roles:
-        return set()
-
-    ordered_candidates = sorted(candidate_roles, key=len)
-    best_assignment: Set[str] = set()
-
-    def backtrack(idx: int, used_roles: Set[str]) -> None:
-        nonlocal best_assignment
-        if len(used_roles) > len(best_assignment):
-            best_assignment = set(used_roles)
-        if idx >= len(ordered_candidates):
-            return
-        remaining = len(ordered_candidates) - idx
-        if len(used_roles) + remaining <= len(best_assignment):
-            return
-
-        roles = ordered_candidates[idx]
-        for role in roles:
-            if role in used_roles:
-                continue
-            used_roles.add(role)
-            backtrack(idx + 1, used_roles)
-            used_roles.remove(role)
-
-        backtrack(idx + 1, used_roles)
-
-    backtrack(0, set())
-    return best_assignment
+        if champ_id is not None:
+            ids.append(champ_id)
+    return tuple(ids)
 
 def _load_scoring_weights(loader: DataLoader) -> Dict[str, float]:
     try:
@@ -323,19 +552,25 @@ def _load_color_rules(loader: DataLoader) -> Dict:
     except FileNotFoundError:
         return {}
 
-def _build_color_index(profiles_by_role: Dict[str, dict]) -> Dict[int, Set[str]]:
+def _load_color_index(loader: DataLoader) -> Dict[int, Set[str]]:
+    return loader.snapshot.derive(
+        "color_index",
+        ROLE_FILES,
+        lambda *_raw: _build_color_index(_load_profiles_by_role(loader)),
+    )
+
+def _build_color_index(profiles_by_role: Dict[str, RoleProfile]) -> Dict[int, Set[str]]:
     index: Dict[int, Set[str]] = {}
     for role in ROLE_ORDER:
         profile = profiles_by_role.get(role)
         if profile is None:
             continue
-        for champ in profile.get("champions", []):
-            champ_id = champ.get("id")
-            if champ_id is None:
+        for entry in profile.entries:
+            if entry.id is None:
                 continue
-            if champ_id not in index:
-                index[champ_id] = set()
-            index[champ_id].update(champ.get("colors", []))
+            if entry.id not in index:
+                index[entry.id] = set()
+            index[entry.id].update(entry.colors)
     return index
 
 def _enemy_role_weights(
@@ -350,6 +585,52 @@ def _enemy_role_weights(
         weights[role] = max(weights.get(role, 1.0), _weight(scoring_weights, "roleCounterMultiplier", 1.0))
     return weights
 
+def _role_pressure(
+    role_solver: RoleSolver,
+    our_pick_ids: Tuple[int, ...],
+    enemy_pick_ids: Tuple[int, ...],
+    scoring_weights: Dict[str, float],
+) -> Tuple[Set[str], Set[str], Dict[str, float]]:
+    """Locked roles of both sides and the enemy role weights, per the `role_pressure` setting."""
+    locked_our_roles = set(role_solver.locked_roles(our_pick_ids))
+    locked_enemy_roles = set(role_solver.locked_roles(enemy_pick_ids))
+    if settings.role_pressure == "soft":
+        enemy_role_weights = _soft_enemy_role_weights(
+            role_solver.distribution(frozenset(enemy_pick_ids)),
+            role_solver.distribution(frozenset(our_pick_ids)),
+            scoring_weights,
+        )
+    else:
+        enemy_role_weights = _enemy_role_weights(
+            locked_enemy_roles,
+            locked_our_roles,
+            scoring_weights,
+        )
+    return locked_our_roles, locked_enemy_roles, enemy_role_weights
+
+def _role_multiplier(role: str, enemy_role_weights: Dict[str, float], scoring_weights: Dict[str, float]) -> float:
+    """The step 3 multiplier of `_score_champion`."""
+    multiplier = enemy_role_weights.get(role, 1.0)
+    if multiplier > 1.0:
+        return multiplier
+    if role == "adc":
+        return _weight(scoring_weights, "adcFlexMultiplier", 1.0)
+    return multiplier
+
+def _soft_enemy_role_weights(
+    enemy_roles: RoleDistribution,
+    our_roles: RoleDistribution,
+    scoring_weights: Dict[str, float],
+) -> Dict[str, float]:
+    # Pressure on a lane: chance the enemy holds it times the chance we have not filled it yet.
+    multiplier = _weight(scoring_weights, "roleCounterMultiplier", 1.0)
+    weights: Dict[str, float] = {}
+    for role in ROLE_ORDER:
+        pressure = enemy_roles.role_probabilities.get(role, 0.0) * (1.0 - our_roles.role_probabilities.get(role, 0.0))
+        if pressure > 0.0:
+            weights[role] = max(1.0, 1.0 + (multiplier - 1.0) * pressure)
+    return weights
+
 def _team_color_counts(our_picks: Set[int], color_index: Dict[int, Set[str]]) -> Dict[str, int]:
     counts: Dict[str, int] = {}
     for champ_id in our_picks:
@@ -364,27 +645,27 @@ def _target_team_colors(team_color_counts: Dict[str, int]) -> List[str]:
     return [color for color, _count in ordered[:2]]
 
 def _log_recommendations(
-    recommendations: List[RecommendationItem],
+    recommendations: List[Recommendation],
     enemy_role_weights: Dict[str, float],
     locked_our_roles: Set[str],
     locked_enemy_roles: Set[str],
     remaining_roles: List[str],
     prioritized_roles: List[str],
 ) -> None:
-    top = recommendations[:5]
-    print("=== Draft Advisor: Top 5 Recommendations ===")
-    if enemy_role_weights:
-        ordered_roles = sorted(enemy_role_weights.items(), key=lambda item: (-item[1], item[0]))
-        role_text = ", ".join(f"{role} x{weight:.2f}" for role, weight in ordered_roles)
-    else:
-        role_text = "none"
-    print(f"Enemy role priority: {role_text}")
-    print(f"Our locked roles: {', '.join(sorted(locked_our_roles)) or 'none'}")
-    print(f"Enemy locked roles: {', '.join(sorted(locked_enemy_roles)) or 'none'}")
-    print(f"Remaining roles: {', '.join(remaining_roles)}")
-    print(f"Prioritized roles: {', '.join(prioritized_roles)}")
-    if not top:
-        print("No recommendations available.")
+    if not logger.isEnabledFor(logging.INFO):
         return
-    for idx, item in enumerate(top, start=1):
-        print(f"{idx}. champId={item.championId} score={item.score:.2f} reasons={'; '.join(item.reasons)}")
+    ordered_roles = sorted(enemy_role_weights.items(), key=lambda item: (-item[1], item[0]))
+    logger.info(
+        "draft recommendations",
+        extra={
+            "enemyRolePriority": {role: weight for role, weight in ordered_roles},
+            "ourLockedRoles": sorted(locked_our_roles),
+            "enemyLockedRoles": sorted(locked_enemy_roles),
+            "remainingRoles": list(remaining_roles),
+            "prioritizedRoles": list(prioritized_roles),
+            "top": [
+                {"championId": item.champion_id, "score": round(item.score, 2), "reasons": list(item.reasons)}
+                for item in recommendations[:LOGGED_RECOMMENDATIONS]
+            ],
+        },
+    )
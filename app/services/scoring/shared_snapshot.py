@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.scoring.role_assignment import RoleSolver
+from app.services.scoring.scoring_engine import (
+    ScoringInputs,
+    _load_champion_role_index,
+    _load_color_rules,
+    _load_scoring_weights,
+)
+from app.services.scoring.vectorized_engine import (
+    COLOR_RULES_PATH,
+    CompiledColorRules,
+    CompiledPools,
+    compile_color_rules,
+    compile_pools,
+)
+from app.services.storage.atomic_file import aligned, atomic_write, file_lock
+from app.services.storage.data_loader import DataLoader, ROLE_FILES
+
+logger = get_logger(__name__)
+
+# Magic, format version, generation, digest of the source files, metadata length.
+HEADER = struct.Struct("<8sIQ32sQ")
+MAGIC = b"DRSNAP01"
+VERSION = 1
+
+# Every file the compiled tables depend on; a change to any of them starts a new generation.
+SOURCE_FILES = ("champions.json", *ROLE_FILES, "configs/scoring_weights.json", COLOR_RULES_PATH)
+
+
+class SharedSnapshotError(Exception):
+    pass
+
+
+class SharedSnapshot:
+    """One generation of the numpy engine's compiled tables, mapped read-only from a file.
+
+    The file holds a fixed header, a JSON metadata block (row labels, raw
+    values used in reasons, weights, color rules, champion roles) and
+    64-byte aligned array sections. Arrays are `np.frombuffer` views over the
+    mapping, so every worker mapping the same file shares one page-cached
+    copy of the pools instead of compiling its own, and the views are
+    read-only. `inputs.profiles_by_role` is empty: the numpy engine scores
+    from `pools`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < HEADER.size:
+                raise SharedSnapshotError(f"{self.path} is not a compiled snapshot")
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.generation, self.source_digest, meta_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise SharedSnapshotError(f"{self.path} is not a version {VERSION} compiled snapshot")
+        if HEADER.size + meta_length > size:
+            raise SharedSnapshotError(f"{self.path} is truncated")
+        meta = json.loads(self._map[HEADER.size:HEADER.size + meta_length])
+        data_start = aligned(HEADER.size + meta_length)
+        arrays = {
+            name: self._array(size, data_start + offset, dtype, shape)
+            for name, (offset, dtype, shape) in meta["arrays"].items()
+        }
+
+        referenced_ids = meta["referenced_ids"]
+        self.pools = CompiledPools(
+            roles=tuple(meta["roles"]),
+            role_codes=arrays["role_codes"],
+            champion_ids=tuple(meta["champion_ids"]),
+            how_good=arrays["how_good"],
+            meta=arrays["meta"],
+            how_good_raw=tuple(meta["how_good_raw"]),
+            meta_raw=tuple(meta["meta_raw"]),
+            colors=tuple(tuple(colors) for colors in meta["colors"]),
+            color_names=tuple(meta["color_names"]),
+            color_counts=arrays["color_counts"],
+            color_groups=arrays["color_groups"],
+            group_colors=tuple(tuple(colors) for colors in meta["group_colors"]),
+            id_columns={champ_id: column for column, champ_id in enumerate(referenced_ids)},
+            synergy=arrays["synergy"],
+            counters=arrays["counters"],
+            strong_into=arrays["strong_into"],
+        )
+        self.color_table = CompiledColorRules(
+            colors=tuple(meta["color_rule_colors"]),
+            defaults=arrays["color_defaults"],
+            modifiers=arrays["color_modifiers"],
+        )
+        champion_roles = {champ_id: set(roles) for champ_id, roles in meta["champion_roles"]}
+        self.inputs = ScoringInputs(
+            profiles_by_role={},
+            role_solver=RoleSolver(champion_roles),
+            scoring_weights=meta["scoring_weights"],
+            color_rules=meta["color_rules"],
+            color_index=_color_index(self.pools),
+        )
+
+    def _array(self, file_size: int, offset: int, dtype: str, shape: Tuple[int, ...]) -> np.ndarray:
+        count = int(np.prod(shape, dtype=np.int64))
+        if offset + count * np.dtype(dtype).itemsize > file_size:
+            raise SharedSnapshotError(f"{self.path} is truncated")
+        return np.frombuffer(self._map, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+
+def write_shared_snapshot(loader: DataLoader, path: Path, source_digest: bytes, generation: int) -> None:
+    """Compile the tables of `loader`'s data and write them to `path`, replacing any previous file atomically."""
+    pools = compile_pools(loader)
+    color_table = compile_color_rules(loader)
+    arrays = {
+        "role_codes": pools.role_codes,
+        "how_good": pools.how_good,
+        "meta": pools.meta,
+        "color_counts": pools.color_counts,
+        "color_groups": pools.color_groups,
+        "synergy": pools.synergy,
+        "counters": pools.counters,
+        "strong_into": pools.strong_into,
+        "color_defaults": color_table.defaults,
+        "color_modifiers": color_table.modifiers,
+    }
+    champion_roles = _load_champion_role_index(loader)
+    meta = {
+        "roles": pools.roles,
+        "champion_ids": pools.champion_ids,
+        "how_good_raw": pools.how_good_raw,
+        "meta_raw": pools.meta_raw,
+        "colors": pools.colors,
+        "color_names": pools.color_names,
+        "group_colors": pools.group_colors,
+        "referenced_ids": sorted(pools.id_columns, key=pools.id_columns.__getitem__),
+        "color_rule_colors": color_table.colors,
+        "scoring_weights": _load_scoring_weights(loader),
+        "color_rules": _load_color_rules(loader),
+        "champion_roles": [[champ_id, sorted(champion_roles[champ_id])] for champ_id in sorted(champion_roles)],
+        "arrays": {},
+    }
+    # Array offsets are relative to the first aligned position after the metadata.
+    position = 0
+    for name, values in arrays.items():
+        position = aligned(position)
+        meta["arrays"][name] = [position, values.dtype.str, list(values.shape)]
+        position += values.nbytes
+    encoded = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    data_start = aligned(HEADER.size + len(encoded))
+
+    with atomic_write(path) as handle:
+        handle.write(HEADER.pack(MAGIC, VERSION, generation, source_digest, len(encoded)))
+        handle.write(encoded)
+        for name, values in arrays.items():
+            handle.write(b"\0" * (data_start + meta["arrays"][name][0] - handle.tell()))
+            handle.write(np.ascontiguousarray(values).tobytes())
+
+
+def source_digest(loader: DataLoader) -> bytes:
+    """Digest of the data directory and the (mtime, size) of every source file, as every worker sees them on disk."""
+    base_dir = _resolved_dirs.get(loader.repo.base_dir)
+    if base_dir is None:
+        base_dir = _resolved_dirs.setdefault(loader.repo.base_dir, str(loader.repo.base_dir.resolve()))
+    digest = hashlib.blake2b(base_dir.encode("utf-8"), digest_size=32)
+    for relative_path in SOURCE_FILES:
+        try:
+            stat = os.stat(os.path.join(base_dir, relative_path))
+            signature = f"{relative_path}:{stat.st_mtime_ns}:{stat.st_size};"
+        except FileNotFoundError:
+            signature = f"{relative_path}:missing;"
+        digest.update(signature.encode("utf-8"))
+    return digest.digest()
+
+
+# Data directory -> its resolved path, so every worker digests the same string whatever its cwd.
+_resolved_dirs: Dict[Path, str] = {}
+_attached: Optional[SharedSnapshot] = None
+_attach_lock = threading.Lock()
+
+
+def get_shared_snapshot(loader: DataLoader) -> Optional[SharedSnapshot]:
+    """The compiled snapshot of `loader`'s current data when SHARED_SNAPSHOT is on.
+
+    Every call compares the source files' signatures with the attached
+    generation. On a change, the worker maps the file another worker already
+    published for the new data or, holding the publish lock, compiles and
+    publishes it itself, so each generation is compiled once. A request keeps
+    the snapshot it started with; the previous mapping is released once
+    nothing references it. Returns None when the mode is off or a source file
+    has a buffered write this process has not flushed yet, as other workers
+    could not see it.
+    """
+    global _attached
+    if not settings.shared_snapshot:
+        return None
+    if any(loader.repo.has_pending_write(relative_path) for relative_path in SOURCE_FILES):
+        return None
+    path = Path(settings.shared_snapshot_path)
+    digest = source_digest(loader)
+    snapshot = _attached
+    if snapshot is not None and snapshot.path == path and snapshot.source_digest == digest:
+        return snapshot
+    with _attach_lock:
+        snapshot = _attached
+        if snapshot is None or snapshot.path != path or snapshot.source_digest != digest:
+            snapshot = _open_published(path, digest)
+            if snapshot is None:
+                with file_lock(path):
+                    snapshot = _open_published(path, digest)
+                    if snapshot is None:
+                        generation = _published_generation(path) + 1
+                        write_shared_snapshot(loader, path, digest, generation)
+                        snapshot = SharedSnapshot(path)
+                        logger.info(
+                            "compiled snapshot published",
+                            extra={"path": str(path), "generation": generation},
+                        )
+            _attached = snapshot
+    return snapshot
+
+
+def _open_published(path: Path, digest: bytes) -> Optional[SharedSnapshot]:
+    """The snapshot at `path` if it was compiled from the data `digest` describes."""
+    header = _read_header(path)
+    if header is None or header[3] != digest:
+        return None
+    try:
+        snapshot = SharedSnapshot(path)
+    except (OSError, ValueError, SharedSnapshotError):
+        # Unreadable or from another format version: compiled again by the caller.
+        return None
+    # The file may have been replaced between the header read and the mapping.
+    return snapshot if snapshot.source_digest == digest else None
+
+
+def _published_generation(path: Path) -> int:
+    header = _read_header(path)
+    if header is None or header[0] != MAGIC:
+        return 0
+    return header[2]
+
+
+def _read_header(path: Path) -> Optional[Tuple[bytes, int, int, bytes, int]]:
+    try:
+        with path.open("rb") as handle:
+            header = handle.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    return HEADER.unpack(header)
+
+
+def _color_index(pools: CompiledPools) -> Dict[int, Set[str]]:
+    # Same content as `_build_color_index`: the colors of every pool row of a champion.
+    index: Dict[int, Set[str]] = {}
+    for champ_id, colors in zip(pools.champion_ids, pools.colors):
+        if champ_id is None:
+            continue
+        index.setdefault(champ_id, set()).update(colors)
+    return index
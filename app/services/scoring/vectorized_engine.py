@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.metrics import RECOMMENDATION_STAGE_SECONDS
+from app.core.tracing import span
+from app.models.domain.profile import RoleProfile
+from app.models.domain.recommendation import Recommendation
+from app.models.schemas.recommendation_schemas import DraftRecommendationRequest
+from app.services.history.pair_stats import PairStatsStore
+from app.services.scoring.color_rules import MULTIPLIER_KEYS, _default_multipliers, team_color_bonus
+from app.services.scoring.scoring_engine import (
+    DraftContext,
+    RankedRecommendations,
+    ReasonSource,
+    _group_candidates,
+    _load_profiles_by_role,
+    _weight,
+    build_draft_context,
+)
+from app.services.storage.data_loader import DataLoader, ROLE_FILES, ROLE_ORDER
+
+COLOR_RULES_PATH = "configs/color_rules.json"
+
+
+@dataclass(frozen=True)
+class CompiledPools:
+    """Active role pools flattened into one row per (role, profile entry)."""
+
+    roles: Tuple[str, ...]
+    role_codes: np.ndarray
+    champion_ids: Tuple[int, ...]
+    how_good: np.ndarray
+    meta: np.ndarray
+    how_good_raw: Tuple
+    meta_raw: Tuple
+    colors: Tuple[Tuple[str, ...], ...]
+    color_names: Tuple[str, ...]
+    color_counts: np.ndarray
+    color_groups: np.ndarray
+    group_colors: Tuple[Tuple[str, ...], ...]
+    id_columns: Dict[int, int]
+    synergy: np.ndarray
+    counters: np.ndarray
+    strong_into: np.ndarray
+
+    def rows_for_role(self, role: str) -> np.ndarray:
+        return np.flatnonzero(self.role_codes == ROLE_ORDER.index(role))
+
+    def id_mask(self, champion_ids: Set[int]) -> np.ndarray:
+        mask = np.zeros(len(self.id_columns), dtype=np.int64)
+        for champ_id in champion_ids:
+            column = self.id_columns.get(champ_id)
+            if column is not None:
+                mask[column] = 1
+        return mask
+
+
+@dataclass(frozen=True)
+class CompiledColorRules:
+    colors: Tuple[str, ...]
+    defaults: np.ndarray
+    modifiers: np.ndarray
+
+
+@dataclass(frozen=True)
+class ScoreComponents:
+    scores: np.ndarray
+    multipliers: np.ndarray
+    matched_colors: np.ndarray
+    role_multipliers: np.ndarray
+    synergy: np.ndarray
+    counters: np.ndarray
+    strong_into: np.ndarray
+    color_bonus: np.ndarray
+    color_reasons: Tuple[List[str], ...]
+    pair_synergy: np.ndarray
+    pair_matchup: np.ndarray
+
+
+def build_recommendations_vectorized(
+    payload: DraftRecommendationRequest,
+    loader: DataLoader,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    min_score: Optional[float] = None,
+) -> List[Recommendation]:
+    """Array-based equivalent of `build_recommendations`, with identical output."""
+    return rank_recommendations_vectorized(payload, loader).select(limit, offset, min_score)
+
+
+def rank_recommendations_vectorized(payload: DraftRecommendationRequest, loader: DataLoader) -> RankedRecommendations:
+    # Imported here: the shared snapshot is built from this module's compiled tables.
+    from app.services.scoring.shared_snapshot import get_shared_snapshot
+
+    shared = get_shared_snapshot(loader)
+    if shared is None:
+        context = build_draft_context(payload, loader)
+        pools, color_table = compile_pools(loader), compile_color_rules(loader)
+    else:
+        context = build_draft_context(payload, loader, shared.inputs)
+        pools, color_table = shared.pools, shared.color_table
+    role_rows = [pools.rows_for_role(role) for role in context.role_order]
+    role_rows = [indices for indices in role_rows if indices.size]
+    if not role_rows:
+        return RankedRecommendations(context, [], log=False)
+
+    def rows(components: ScoreComponents) -> Iterator[Tuple[int, str, float, ReasonSource]]:
+        scores = components.scores.tolist()
+        for role_row_indices in role_rows:
+            for row in role_row_indices.tolist():
+                champ_id = pools.champion_ids[row]
+                if champ_id in context.blocked_ids:
+                    continue
+                yield champ_id, pools.roles[row], scores[row], partial(_row_reasons, pools, components, context, row)
+
+    with RECOMMENDATION_STAGE_SECONDS.time(stage="scoring"), span("scoring"):
+        components = score_pools(pools, color_table, context)
+        groups = _group_candidates(rows(components))
+    return RankedRecommendations(context, groups)
+
+
+def compile_pools(loader: DataLoader) -> CompiledPools:
+    return loader.snapshot.derive(
+        "compiled_pools",
+        ROLE_FILES,
+        lambda *_raw: _compile_pools(_load_profiles_by_role(loader).values()),
+    )
+
+
+def compile_color_rules(loader: DataLoader) -> CompiledColorRules:
+    try:
+        return loader.snapshot.derive("compiled_color_rules", [COLOR_RULES_PATH], _compile_color_rules)
+    except FileNotFoundError:
+        return _compile_color_rules({})
+
+
+def score_pools(pools: CompiledPools, color_rules: CompiledColorRules, context: DraftContext) -> ScoreComponents:
+    weights = context.scoring_weights
+    multipliers = _row_multipliers(pools, color_rules)
+    base, synergy_multiplier, counter_multiplier, strong_into_multiplier = (
+        multipliers[:, MULTIPLIER_KEYS.index(key)]
+        for key in ("base", "synergyMultiplier", "counterMultiplier", "strongIntoMultiplier")
+    )
+
+    # Same operation order as `_score_champion`, so every float matches bit for bit.
+    scores = (
+        pools.how_good * _weight(weights, "howGoodIAm", 0.0)
+        + pools.meta * _weight(weights, "meta", 0.0)
+    ) * base
+
+    matched_colors = np.zeros(len(pools.roles), dtype=np.int64)
+    if context.target_colors:
+        target_columns = [
+            pools.color_names.index(color)
+            for color in context.target_colors
+            if color in pools.color_names
+        ]
+        matched_colors = pools.color_counts[:, target_columns].sum(axis=1)
+        scores = np.where(
+            matched_colors > 0,
+            scores + _weight(weights, "colorFit", 0.0) * matched_colors,
+            scores,
+        )
+
+    role_multipliers = _role_multipliers(pools, context)
+    scores = np.where(role_multipliers != 1.0, scores * role_multipliers, scores)
+
+    synergy = pools.synergy @ pools.id_mask(context.our_picks)
+    scores = np.where(
+        synergy > 0,
+        scores + _weight(weights, "synergy", 0.0) * synergy_multiplier * synergy,
+        scores,
+    )
+
+    enemy_mask = pools.id_mask(context.enemy_picks)
+    counters = pools.counters @ enemy_mask
+    penalty_multiplier = _weight(weights, "counterPenaltyMultiplier", 0.7)
+    scores = np.where(
+        counters > 0,
+        scores - _weight(weights, "counters", 0.0) * counter_multiplier * penalty_multiplier * counters,
+        scores,
+    )
+
+    strong_into = pools.strong_into @ enemy_mask
+    scores = np.where(
+        strong_into > 0,
+        scores + _weight(weights, "strongInto", 0.0) * strong_into_multiplier * strong_into,
+        scores,
+    )
+
+    group_bonuses = [
+        team_color_bonus(colors, context.team_color_counts, context.color_rules)
+        for colors in pools.group_colors
+    ]
+    color_bonus = np.array([bonus for bonus, _reasons in group_bonuses], dtype=np.float64)[pools.color_groups]
+    scores = np.where(color_bonus != 0.0, scores + color_bonus, scores)
+
+    pair_synergy = pair_matchup = np.zeros(len(pools.roles), dtype=np.float64)
+    if context.pair_stats is not None and context.pair_stats.columns:
+        pair_synergy, pair_matchup = _pair_deltas(pools, context.pair_stats, context.our_picks, context.enemy_picks)
+        scores = np.where(
+            pair_synergy != 0.0,
+            scores + _weight(weights, "pairSynergy", 0.0) * pair_synergy,
+            scores,
+        )
+        scores = np.where(
+            pair_matchup != 0.0,
+            scores + _weight(weights, "pairMatchup", 0.0) * pair_matchup,
+            scores,
+        )
+
+    return ScoreComponents(
+        scores=scores,
+        multipliers=multipliers,
+        matched_colors=matched_colors,
+        role_multipliers=role_multipliers,
+        synergy=synergy,
+        counters=counters,
+        strong_into=strong_into,
+        color_bonus=color_bonus,
+        color_reasons=tuple(reasons for _bonus, reasons in group_bonuses),
+        pair_synergy=pair_synergy,
+        pair_matchup=pair_matchup,
+    )
+
+
+def _pair_deltas(
+    pools: CompiledPools,
+    store: PairStatsStore,
+    our_picks: Set[int],
+    enemy_picks: Set[int],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """`PairStatsStore.deltas` for every row: same float32 values, added in the same (ascending id) order."""
+    offsets = store.offsets()
+    shape = (len(ROLE_ORDER), store.size, store.size)
+    columns = np.array([store.columns.get(champ_id, -1) for champ_id in pools.champion_ids], dtype=np.int64)
+    present = columns >= 0
+    rows = np.where(present, columns, 0)
+
+    def total(name: str, picks: Set[int]) -> np.ndarray:
+        matrix = np.frombuffer(store.buffer(), dtype=np.float32, count=math.prod(shape), offset=offsets[name])
+        matrix = matrix.reshape(shape)
+        acc = np.zeros(len(pools.roles), dtype=np.float64)
+        for champ_id in sorted(picks):
+            other = store.columns.get(champ_id)
+            if other is not None:
+                acc = acc + matrix[pools.role_codes, rows, other].astype(np.float64)
+        return np.where(present, acc, 0.0)
+
+    return total("role_ally", our_picks), total("role_opponent", enemy_picks)
+
+
+def _compile_pools(profiles: Iterable[RoleProfile]) -> CompiledPools:
+    entries = [(profile.role, entry) for profile in profiles for entry in profile.entries]
+    colors = tuple(entry.colors for _role, entry in entries)
+
+    color_names = tuple(sorted({color for row_colors in colors for color in row_colors}))
+    color_counts = np.zeros((len(entries), len(color_names)), dtype=np.int64)
+    for row, row_colors in enumerate(colors):
+        for color in row_colors:
+            color_counts[row, color_names.index(color)] += 1
+
+    group_colors = tuple(dict.fromkeys(colors))
+    group_lookup = {row_colors: idx for idx, row_colors in enumerate(group_colors)}
+
+    referenced_ids = sorted({
+        champ_id
+        for _role, entry in entries
+        for ids in (entry.synergy, entry.counters, entry.strong_into)
+        for champ_id in ids
+    })
+    id_columns = {champ_id: column for column, champ_id in enumerate(referenced_ids)}
+
+    return CompiledPools(
+        roles=tuple(role.value for role, _entry in entries),
+        role_codes=np.array([ROLE_ORDER.index(role) for role, _entry in entries], dtype=np.int64),
+        champion_ids=tuple(entry.id for _role, entry in entries),
+        how_good=np.array([entry.how_good for _role, entry in entries], dtype=np.float64),
+        meta=np.array([entry.meta for _role, entry in entries], dtype=np.float64),
+        how_good_raw=tuple(entry.how_good for _role, entry in entries),
+        meta_raw=tuple(entry.meta for _role, entry in entries),
+        colors=colors,
+        color_names=color_names,
+        color_counts=color_counts,
+        color_groups=np.array([group_lookup[row_colors] for row_colors in colors], dtype=np.int64),
+        group_colors=group_colors,
+        id_columns=id_columns,
+        synergy=_incidence_matrix([entry.synergy for _role, entry in entries], id_columns),
+        counters=_incidence_matrix([entry.counters for _role, entry in entries], id_columns),
+        strong_into=_incidence_matrix([entry.strong_into for _role, entry in entries], id_columns),
+    )
+
+
+def _incidence_matrix(reference_ids: List[Tuple[int, ...]], id_columns: Dict[int, int]) -> np.ndarray:
+    # Counts rather than booleans: `_matching_count` counts repeated ids.
+    matrix = np.zeros((len(reference_ids), len(id_columns)), dtype=np.int64)
+    for row, ids in enumerate(reference_ids):
+        for champ_id in ids:
+            matrix[row, id_columns[champ_id]] += 1
+    return matrix
+
+
+def _compile_color_rules(color_rules: Dict) -> CompiledColorRules:
+    defaults = _default_multipliers(color_rules)
+    colors = [color for color in color_rules if color != "defaults"] if color_rules else []
+    modifiers = np.full((len(colors), len(MULTIPLIER_KEYS)), -np.inf)
+    for idx, color in enumerate(colors):
+        color_modifiers = (color_rules.get(color, {}) or {}).get("modifiers", {})
+        for key_idx, key in enumerate(MULTIPLIER_KEYS):
+            if key in color_modifiers:
+                modifiers[idx, key_idx] = float(color_modifiers[key])
+    return CompiledColorRules(
+        colors=tuple(colors),
+        defaults=np.array([defaults[key] for key in MULTIPLIER_KEYS], dtype=np.float64),
+        modifiers=modifiers,
+    )
+
+
+def _row_multipliers(pools: CompiledPools, color_rules: CompiledColorRules) -> np.ndarray:
+    # `color_multipliers` keeps the max of the defaults and every modifier set by the champion's colors.
+    multipliers = np.tile(color_rules.defaults, (len(pools.roles), 1))
+    for rule_idx, color in enumerate(color_rules.colors):
+        if color not in pools.color_names:
+            continue
+        present = pools.color_counts[:, pools.color_names.index(color)] > 0
+        multipliers[present] = np.maximum(multipliers[present], color_rules.modifiers[rule_idx])
+    return multipliers
+
+
+def _role_multipliers(pools: CompiledPools, context: DraftContext) -> np.ndarray:
+    per_role = np.ones(len(ROLE_ORDER), dtype=np.float64)
+    for role_idx, role in enumerate(ROLE_ORDER):
+        multiplier = context.enemy_role_weights.get(role, 1.0)
+        if multiplier <= 1.0 and role == "adc":
+            multiplier = _weight(context.scoring_weights, "adcFlexMultiplier", 1.0)
+        per_role[role_idx] = multiplier
+    return per_role[pools.role_codes]
+
+
+def _row_reasons(pools: CompiledPools, components: ScoreComponents, context: DraftContext, row: int) -> List[str]:
+    reasons: List[str] = []
+    how_good = pools.how_good_raw[row]
+    meta = pools.meta_raw[row]
+    if how_good:
+        reasons.append(f"comfort {how_good}/10")
+    if meta:
+        reasons.append(f"meta {meta}/10")
+
+    if components.matched_colors[row]:
+        matched_colors = [color for color in pools.colors[row] if color in context.target_colors]
+        reasons.append(f"team colors: {', '.join(matched_colors)}")
+
+    role = pools.roles[row]
+    role_multiplier = components.role_multipliers[row]
+    if context.enemy_role_weights.get(role, 1.0) > 1.0:
+        reasons.append(f"role counter focus: {role}")
+    elif role == "adc" and role_multiplier > 1.0:
+        reasons.append("adc flex priority")
+
+    synergy = int(components.synergy[row])
+    if synergy:
+        reasons.append(f"synergy with {synergy} pick(s)")
+    counters = int(components.counters[row])
+    if counters:
+        reasons.append(f"countered by {counters} enemy pick(s)")
+    strong_into = int(components.strong_into[row])
+    if strong_into:
+        reasons.append(f"strong into {strong_into} enemy pick(s)")
+
+    if components.color_bonus[row]:
+        reasons.extend(components.color_reasons[pools.color_groups[row]])
+    if components.pair_synergy[row]:
+        reasons.append(f"history synergy {components.pair_synergy[row]:+.1%}")
+    if components.pair_matchup[row]:
+        reasons.append(f"history matchup {components.pair_matchup[row]:+.1%}")
+    reasons.append(f"role focus: {role}")
+    return reasons
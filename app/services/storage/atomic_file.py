@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks are process-local only.
+    fcntl = None
+
+# Section alignment of the memory-mapped files (pair statistics, compiled snapshot).
+ALIGNMENT = 64
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "wb", encoding: Optional[str] = None) -> Iterator[IO]:
+    """Open a file that replaces `path` atomically once the block exits cleanly.
+
+    The content goes to a uniquely named temp file in the same directory, is
+    fsynced, renamed over `path`, then the directory is fsynced so the rename
+    itself survives a crash. Readers see the old file or the new one, never a
+    partial write; on an exception the temp file is removed and `path` is untouched.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    fsync_dir(path.parent)
+
+
+def fsync_dir(directory: Path) -> None:
+    # Makes the rename itself durable; directories cannot be opened this way on Windows.
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def aligned(position: int, alignment: int = ALIGNMENT) -> int:
+    """`position` rounded up to a multiple of `alignment`, for sections of memory-mapped files."""
+    return -(-position // alignment) * alignment
+
+
+class FileLock:
+    """Reentrant lock for one file: a thread lock plus an advisory `flock` on a sidecar file."""
+
+    def __init__(self, path: Path):
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._lock_path = path.with_name(f".{path.name}.lock")
+        self._handle = None
+
+    def __enter__(self) -> "FileLock":
+        self._lock.acquire()
+        self._depth += 1
+        if self._depth == 1 and fcntl is not None:
+            try:
+                self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = self._lock_path.open("a")
+                fcntl.flock(self._handle, fcntl.LOCK_EX)
+            except BaseException:
+                if self._handle is not None:
+                    self._handle.close()
+                    self._handle = None
+                self._depth -= 1
+                self._lock.release()
+                raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._handle is not None:
+            fcntl.flock(self._handle, fcntl.LOCK_UN)
+            self._handle.close()
+            self._handle = None
+        self._lock.release()
+
+
+_FILE_LOCKS: Dict[Path, FileLock] = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+
+
+def file_lock(path: Path) -> FileLock:
+    """The process-wide `FileLock` of `path`; pass resolved paths so aliases share one lock."""
+    lock = _FILE_LOCKS.get(path)
+    if lock is None:
+        with _FILE_LOCKS_GUARD:
+            lock = _FILE_LOCKS.setdefault(path, FileLock(path))
+    return lock
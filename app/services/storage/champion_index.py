@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, accent-free, alphanumeric only: "Kai'Sa" -> "kaisa", "Dr. Mundo" -> "drmundo"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    ascii_text = decomposed.encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_ALNUM.sub("", ascii_text)
+
+
+class _TrieNode:
+    __slots__ = ("children", "matches")
+
+    def __init__(self):
+        self.children: Dict[str, _TrieNode] = {}
+        # Positions (in name order) of every champion with a key under this node.
+        self.matches: List[int] = []
+
+
+class ChampionIndex:
+    """Read-only lookup tables over `champions.json`, built once per file generation.
+
+    Search keys are the normalized full name, the slug and every word of the
+    name after the first ("fortune" finds Miss Fortune). Each trie node keeps
+    the sorted list of matching champions, so a prefix query costs
+    O(len(prefix)) plus the size of the returned page.
+    """
+
+    def __init__(self, champions: Iterable[dict]):
+        ordered = sorted(
+            (champion for champion in champions if champion.get("id") is not None),
+            key=lambda champion: (normalize_name(champion.get("name", "")), champion["id"]),
+        )
+        self.champions: Tuple[dict, ...] = tuple(ordered)
+        self.by_id: Dict[int, dict] = {champion["id"]: champion for champion in ordered}
+        self.by_slug: Dict[str, dict] = {
+            champion["slug"]: champion for champion in ordered if champion.get("slug")
+        }
+        self._roles: List[frozenset] = []
+        self._root = _TrieNode()
+
+        by_role: Dict[str, List[int]] = {}
+        for position, champion in enumerate(ordered):
+            roles = frozenset(champion.get("roles", []))
+            self._roles.append(roles)
+            for role in roles:
+                by_role.setdefault(role, []).append(position)
+            for key in _search_keys(champion):
+                self._insert(key, position)
+        # Positions per role, in name order.
+        self.by_role: Dict[str, Tuple[int, ...]] = {role: tuple(positions) for role, positions in by_role.items()}
+
+    def get(self, champion_id: int) -> Optional[dict]:
+        return self.by_id.get(champion_id)
+
+    def search(self, query: str = "", role: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """Champions whose name, slug or a name word starts with `query`, in name order."""
+        prefix = normalize_name(query)
+        if prefix:
+            node = self._root
+            for char in prefix:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            positions: Iterable[int] = node.matches
+            if role is not None:
+                positions = (position for position in positions if role in self._roles[position])
+        elif role is not None:
+            positions = self.by_role.get(role, ())
+        else:
+            positions = range(len(self.champions))
+
+        results: List[dict] = []
+        for position in positions:
+            if len(results) >= limit:
+                break
+            results.append(self.champions[position])
+        return results
+
+    def _insert(self, key: str, position: int) -> None:
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            # Positions arrive in ascending order, so a duplicate can only be the last one.
+            if not node.matches or node.matches[-1] != position:
+                node.matches.append(position)
+
+
+def _search_keys(champion: dict) -> List[str]:
+    name = champion.get("name", "")
+    keys = [normalize_name(name), normalize_name(champion.get("slug", ""))]
+    words = [normalize_name(word) for word in re.split(r"[\s.&'-]+", name)]
+    keys.extend(words[1:])
+    return [key for key in dict.fromkeys(keys) if key]
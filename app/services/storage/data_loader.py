@@ -1,18 +1,31 @@
+from app.services.storage.champion_index import ChampionIndex
+from app.services.storage.data_snapshot import DataSnapshot, get_snapshot
 from app.services.storage.json_repository import JsonRepository
 
 ROLE_ORDER = ["top", "jungle", "mid", "adc", "support"]
+ROLE_FILES = [f"roles/{role}.json" for role in ROLE_ORDER]
 
 
 class DataLoader:
-    def __init__(self, repo: JsonRepository):
+    def __init__(self, repo: JsonRepository, snapshot: DataSnapshot | None = None):
         self.repo = repo
+        self.snapshot = snapshot or get_snapshot(repo)
+
+    def data_version(self) -> int:
+        return self.snapshot.refresh()
 
     def champions(self):
-        return self.repo.read("champions.json")
+        return self.snapshot.read("champions.json")
+
+    def champion_index(self) -> ChampionIndex:
+        return self.snapshot.derive("champion_index", ["champions.json"], ChampionIndex)
 
     def role_store(self, role: str):
-        raw = self.repo.read(f"roles/{role}.json")
-        return _normalize_role_store(raw, role)
+        return self.snapshot.derive(
+            ("role_store", role),
+            [_role_path(role)],
+            lambda raw: _normalize_role_store(raw, role),
+        )
 
     def role_profile(self, role: str, profile_name: str | None = None):
         store = self.role_store(role)
@@ -23,6 +36,13 @@ class DataLoader:
         raise FileNotFoundError(f"Profile not found for role {role}: {target_profile}")
 
     def role_profiles(self):
+        return self.snapshot.derive(
+            "role_profiles",
+            ROLE_FILES,
+            lambda *_raw: self._validated_role_profiles(),
+        )
+
+    def _validated_role_profiles(self):
         profiles = []
         for role in ROLE_ORDER:
             profile = self.role_profile(role)
@@ -38,13 +58,17 @@ class DataLoader:
         return profiles
 
     def draft_formats(self):
-        return self.repo.read("configs/draft_formats.json")
+        return self.snapshot.read("configs/draft_formats.json")
 
     def scoring_weights(self):
-        return self.repo.read("configs/scoring_weights.json")
+        return self.snapshot.read("configs/scoring_weights.json")
 
     def color_rules(self):
-        return self.repo.read("configs/color_rules.json")
+        return self.snapshot.read("configs/color_rules.json")
+
+
+def _role_path(role: str) -> str:
+    return f"roles/{role}.json"
 
 
 def _normalize_role_store(raw: dict, role: str) -> dict:
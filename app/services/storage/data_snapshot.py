@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+from app.core.tracing import span
+from app.services.storage.json_repository import JsonRepository, add_write_listener
+
+# (st_mtime_ns, st_size) of a data file when it was last parsed.
+FileSignature = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    signature: FileSignature
+    generation: int
+    value: Any
+
+
+class DataSnapshot:
+    """Process-wide parsed view of one data directory.
+
+    Each file is parsed once and kept until its mtime/size changes or a
+    `JsonRepository.write` touches it. Values are shared between requests and
+    must be treated as read-only; callers that edit a store work on a copy.
+    """
+
+    def __init__(self, repo: JsonRepository):
+        self.repo = repo
+        self._lock = threading.RLock()
+        self._entries: Dict[str, _Entry] = {}
+        self._derived: Dict[Hashable, Tuple[Tuple[int, ...], Any]] = {}
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def read(self, relative_path: str) -> Any:
+        return self._entry(relative_path).value
+
+    def generation(self, relative_path: str) -> int:
+        return self._entry(relative_path).generation
+
+    def derive(
+        self,
+        key: Hashable,
+        relative_paths: Iterable[str],
+        build: Callable[..., Any],
+    ) -> Any:
+        """Return `build(*parsed_files)`, recomputed only when one of the files changes."""
+        entries = [self._entry(path) for path in relative_paths]
+        generations = tuple(entry.generation for entry in entries)
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] == generations:
+            return cached[1]
+        with span("snapshot.derive"):
+            value = build(*(entry.value for entry in entries))
+        with self._lock:
+            self._derived[key] = (generations, value)
+        return value
+
+    def refresh(self) -> int:
+        """Revalidate every tracked file and return the current data version."""
+        for relative_path in list(self._entries):
+            try:
+                self._entry(relative_path)
+            except FileNotFoundError:
+                continue
+        return self._version
+
+    def pin(self) -> "PinnedSnapshot":
+        return PinnedSnapshot(self)
+
+    def invalidate(self, relative_path: str | None = None) -> None:
+        with self._lock:
+            if relative_path is None:
+                self._entries.clear()
+                self._derived.clear()
+            elif self._entries.pop(_normalize_path(relative_path), None) is None:
+                return
+            self._version += 1
+
+    def _entry(self, relative_path: str) -> _Entry:
+        relative_path = _normalize_path(relative_path)
+        try:
+            signature = _signature(self.repo.base_dir / relative_path)
+        except FileNotFoundError:
+            self.invalidate(relative_path)
+            raise
+        entry = self._entries.get(relative_path)
+        if entry is not None and entry.signature == signature:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(relative_path)
+            if entry is not None and entry.signature == signature:
+                return entry
+            value = self.repo.read(relative_path)
+            self._version += 1
+            entry = _Entry(signature=signature, generation=self._version, value=value)
+            self._entries[relative_path] = entry
+            return entry
+
+
+class PinnedSnapshot(DataSnapshot):
+    """Consistent view of a snapshot for one unit of work (e.g. a batch request).
+
+    A file is revalidated on its first access only, so every later read in the
+    unit sees the same data. Derived values are shared with the parent snapshot.
+    """
+
+    def __init__(self, parent: DataSnapshot):
+        self.repo = parent.repo
+        self._lock = parent._lock
+        self._derived = parent._derived
+        self._entries = {}
+        self._parent = parent
+
+    @property
+    def version(self) -> int:
+        return self._parent.version
+
+    def refresh(self) -> int:
+        return self._parent.version
+
+    def invalidate(self, relative_path: str | None = None) -> None:
+        self._parent.invalidate(relative_path)
+
+    def _entry(self, relative_path: str) -> _Entry:
+        entry = self._entries.get(relative_path)
+        if entry is None:
+            entry = self._parent._entry(relative_path)
+            self._entries[relative_path] = entry
+        return entry
+
+
+def _signature(path: Path) -> FileSignature:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _normalize_path(relative_path: str) -> str:
+    return Path(relative_path).as_posix()
+
+
+_SNAPSHOTS: Dict[Path, DataSnapshot] = {}
+_SNAPSHOTS_LOCK = threading.Lock()
+
+
+def get_snapshot(repo: JsonRepository) -> DataSnapshot:
+    key = repo.base_dir.resolve()
+    snapshot = _SNAPSHOTS.get(key)
+    if snapshot is not None:
+        return snapshot
+    with _SNAPSHOTS_LOCK:
+        snapshot = _SNAPSHOTS.get(key)
+        if snapshot is None:
+            snapshot = DataSnapshot(JsonRepository(str(key)))
+            _SNAPSHOTS[key] = snapshot
+        return snapshot
+
+
+def _on_repository_write(base_dir: Path, relative_path: str) -> None:
+    snapshot = _SNAPSHOTS.get(base_dir.resolve())
+    if snapshot is not None:
+        snapshot.invalidate(relative_path)
+
+
+add_write_listener(_on_repository_write)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import copy
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.core.tracing import span
+
+
+class DraftConflictError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredDraft:
+    state: dict
+    version: int
+
+
+class DraftStore(ABC):
+    """Draft session storage with optimistic concurrency.
+
+    `save` only succeeds when `expected_version` is still the stored version;
+    otherwise another action won the race and `DraftConflictError` is raised.
+    Returned states are private copies that callers may mutate.
+    """
+
+    # Whether other worker processes see the same drafts (and may change them).
+    shared = False
+
+    @abstractmethod
+    def create(self, draft_id: str, state: dict) -> StoredDraft:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, draft_id: str) -> Optional[StoredDraft]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, draft_id: str, state: dict, expected_version: int) -> StoredDraft:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, draft_id: str) -> None:
+        raise NotImplementedError
+
+    def version(self, draft_id: str) -> Optional[int]:
+        """Current version of a draft, None if it does not exist (or expired)."""
+        stored = self.get(draft_id)
+        return None if stored is None else stored.version
+
+
+class MemoryDraftStore(DraftStore):
+    """Process-local store bounded by an LRU size limit and an idle TTL."""
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 6 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # draft_id -> (state, version, last access time), least recently used first.
+        self._drafts: "OrderedDict[str, tuple[dict, int, float]]" = OrderedDict()
+
+    def create(self, draft_id: str, state: dict) -> StoredDraft:
+        now = time.monotonic()
+        with self._lock:
+            self._drafts[draft_id] = (copy.deepcopy(state), 1, now)
+            self._drafts.move_to_end(draft_id)
+            self._evict(now)
+        return StoredDraft(state=copy.deepcopy(state), version=1)
+
+    def get(self, draft_id: str) -> Optional[StoredDraft]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._drafts.get(draft_id)
+            if entry is None:
+                return None
+            state, version, touched = entry
+            if now - touched > self.ttl_seconds:
+                del self._drafts[draft_id]
+                return None
+            self._drafts[draft_id] = (state, version, now)
+            self._drafts.move_to_end(draft_id)
+            return StoredDraft(state=copy.deepcopy(state), version=version)
+
+    def save(self, draft_id: str, state: dict, expected_version: int) -> StoredDraft:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._drafts.get(draft_id)
+            if entry is None or now - entry[2] > self.ttl_seconds:
+                raise KeyError(draft_id)
+            if entry[1] != expected_version:
+                raise DraftConflictError(f"Draft {draft_id} was modified concurrently")
+            version = expected_version + 1
+            self._drafts[draft_id] = (copy.deepcopy(state), version, now)
+            self._drafts.move_to_end(draft_id)
+        return StoredDraft(state=copy.deepcopy(state), version=version)
+
+    def delete(self, draft_id: str) -> None:
+        with self._lock:
+            self._drafts.pop(draft_id, None)
+
+    def _evict(self, now: float) -> None:
+        while self._drafts:
+            oldest_id, (_state, _version, touched) = next(iter(self._drafts.items()))
+            if len(self._drafts) <= self.max_entries and now - touched <= self.ttl_seconds:
+                break
+            del self._drafts[oldest_id]
+
+
+class SqliteDraftStore(DraftStore):
+    """SQLite store in WAL mode, shareable by several worker processes on one host."""
+
+    shared = True
+
+    def __init__(self, path: str, ttl_seconds: float = 6 * 3600, purge_interval: float = 60.0):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS drafts (
+                    draft_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS drafts_updated_at ON drafts (updated_at)")
+
+    def create(self, draft_id: str, state: dict) -> StoredDraft:
+        self._maybe_purge()
+        with span("draft_store.create"), self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO drafts (draft_id, version, state, updated_at) VALUES (?, 1, ?, ?)",
+                (draft_id, _encode(state), time.time()),
+            )
+        return StoredDraft(state=copy.deepcopy(state), version=1)
+
+    def get(self, draft_id: str) -> Optional[StoredDraft]:
+        with span("draft_store.get"):
+            row = self._connection().execute(
+                "SELECT state, version FROM drafts WHERE draft_id = ? AND updated_at >= ?",
+                (draft_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredDraft(state=json.loads(row[0]), version=row[1])
+
+    def version(self, draft_id: str) -> Optional[int]:
+        with span("draft_store.version"):
+            row = self._connection().execute(
+                "SELECT version FROM drafts WHERE draft_id = ? AND updated_at >= ?",
+                (draft_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def save(self, draft_id: str, state: dict, expected_version: int) -> StoredDraft:
+        with span("draft_store.save"), self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE drafts SET state = ?, version = version + 1, updated_at = ? "
+                "WHERE draft_id = ? AND version = ?",
+                (_encode(state), time.time(), draft_id, expected_version),
+            )
+            if cursor.rowcount == 0:
+                exists = conn.execute("SELECT 1 FROM drafts WHERE draft_id = ?", (draft_id,)).fetchone()
+                if exists is None:
+                    raise KeyError(draft_id)
+                raise DraftConflictError(f"Draft {draft_id} was modified concurrently")
+        return StoredDraft(state=copy.deepcopy(state), version=expected_version + 1)
+
+    def delete(self, draft_id: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM drafts WHERE draft_id = ?", (draft_id,))
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        with self._connection() as conn:
+            conn.execute("DELETE FROM drafts WHERE updated_at < ?", (now - self.ttl_seconds,))
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shared between threads; keep one per worker thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def _encode(state: dict) -> str:
+    return json.dumps(state, separators=(",", ":"))
+
+
+_store: Optional[DraftStore] = None
+_store_lock = threading.Lock()
+
+
+def build_draft_store(backend: str, path: str, max_entries: int, ttl_seconds: float) -> DraftStore:
+    if backend == "sqlite":
+        return SqliteDraftStore(path, ttl_seconds=ttl_seconds)
+    if backend == "memory":
+        return MemoryDraftStore(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    raise ValueError(f"Unknown draft store backend: {backend!r}")
+
+
+def get_draft_store() -> DraftStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = build_draft_store(
+                    settings.draft_store,
+                    settings.draft_store_path,
+                    settings.draft_max_entries,
+                    settings.draft_ttl_seconds,
+                )
+    return _store
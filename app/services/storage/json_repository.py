@@ -1,18 +1,124 @@
+import atexit
 import json
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.tracing import span
+from app.services.storage.atomic_file import atomic_write, file_lock
+
+WriteListener = Callable[[Path, str], None]
+
+_WRITE_LISTENERS: List[WriteListener] = []
+
+
+def add_write_listener(listener: WriteListener) -> None:
+    if listener not in _WRITE_LISTENERS:
+        _WRITE_LISTENERS.append(listener)
+
+
+# Write-behind buffer: absolute path -> (repository, relative path, payload) not yet on disk.
+_PENDING: Dict[Path, Tuple["JsonRepository", str, Any]] = {}
+_PENDING_TIMERS: Dict[Path, threading.Timer] = {}
+_PENDING_GUARD = threading.Lock()
+
 
 class JsonRepository:
-    def __init__(self, base_dir: str):
+    """JSON file access relative to `base_dir`.
+
+    Writes are atomic (temp file, fsync, rename). With a non-zero `write_delay`
+    they are also coalesced: the latest payload per file is kept in memory,
+    served by `read`, and written once the file has been quiet for the delay.
+    Use `lock()` around read-modify-write sequences.
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        write_delay: Optional[float] = None,
+        compact: Optional[bool] = None,
+    ):
         self.base_dir = Path(base_dir)
+        self.write_delay = settings.json_write_delay_ms / 1000.0 if write_delay is None else write_delay
+        self.compact = settings.json_compact_writes if compact is None else compact
 
     def read(self, relative_path: str) -> Any:
         path = self.base_dir / relative_path
-        with path.open("r", encoding="utf-8") as f:
+        pending = _PENDING.get(path.resolve()) if _PENDING else None
+        if pending is not None:
+            return pending[2]
+        with span("storage.read"), path.open("r", encoding="utf-8") as f:
             return json.load(f)
 
+    def has_pending_write(self, relative_path: str) -> bool:
+        """Whether `read` serves a buffered payload that is not on disk yet."""
+        return bool(_PENDING) and (self.base_dir / relative_path).resolve() in _PENDING
+
+    @contextmanager
+    def lock(self, relative_path: str) -> Iterator[None]:
+        """Serialize read-modify-write sequences on one file across threads and processes."""
+        with file_lock((self.base_dir / relative_path).resolve()):
+            yield
+
     def write(self, relative_path: str, payload: Any) -> None:
-        path = self.base_dir / relative_path
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        path = (self.base_dir / relative_path).resolve()
+        # A file that does not exist yet is written through so its first readers can stat it.
+        with span("storage.write"):
+            if self.write_delay > 0 and path.exists():
+                self._schedule(path, relative_path, payload)
+            else:
+                with file_lock(path):
+                    self._write_file(path, payload)
+        for listener in _WRITE_LISTENERS:
+            listener(self.base_dir, relative_path)
+
+    def _schedule(self, path: Path, relative_path: str, payload: Any) -> None:
+        with _PENDING_GUARD:
+            _PENDING[path] = (self, relative_path, payload)
+            timer = _PENDING_TIMERS.pop(path, None)
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(self.write_delay, _flush_path, args=(path,))
+            timer.daemon = True
+            _PENDING_TIMERS[path] = timer
+            timer.start()
+
+    def _write_file(self, path: Path, payload: Any) -> None:
+        if self.compact:
+            text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        else:
+            text = json.dumps(payload, ensure_ascii=False, indent=2)
+        with atomic_write(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _flush_path(path: Path) -> None:
+    with file_lock(path):
+        with _PENDING_GUARD:
+            pending = _PENDING.get(path)
+            _PENDING_TIMERS.pop(path, None)
+        if pending is None:
+            return
+        repo, _relative_path, payload = pending
+        repo._write_file(path, payload)
+        with _PENDING_GUARD:
+            # A newer payload may have been scheduled while this one was being written.
+            if _PENDING.get(path) is pending:
+                del _PENDING[path]
+
+
+def flush_pending_writes() -> None:
+    """Write every buffered payload now (used at shutdown)."""
+    with _PENDING_GUARD:
+        paths = list(_PENDING)
+        for path in paths:
+            timer = _PENDING_TIMERS.pop(path, None)
+            if timer is not None:
+                timer.cancel()
+    for path in paths:
+        _flush_path(path)
+
+
+atexit.register(flush_pending_writes)
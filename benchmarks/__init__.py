@@ -0,0 +1 @@
+"""Benchmarks for the scoring engine and data layer; run with `python -m benchmarks`."""
@@ -0,0 +1,188 @@
+"""Scoring benchmarks on synthetic data.
+
+    python -m benchmarks --champions 170 --pool-size 40 --output before.json
+    python -m benchmarks --champions 170 --pool-size 40 --compare before.json
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from dataclasses import asdict, fields
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import SyntheticScale, generate_dataset, generate_draft_requests, generate_match_export
+from benchmarks.timing import measure
+
+from app.services.draft_engine.format_engine import get_format_engine
+from app.services.history.match_ingest import ingest_matches
+from app.services.scoring.profile_comparison import compare_profiles
+from app.services.scoring.role_assignment import RoleSolver
+from app.services.scoring.scoring_engine import _load_champion_role_index, _pick_id_sequence, build_recommendations
+from app.services.scoring.shared_snapshot import SharedSnapshot, source_digest, write_shared_snapshot
+from app.services.storage.data_loader import DataLoader, ROLE_FILES
+from app.services.storage.json_repository import JsonRepository
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def build_benchmarks(loader: DataLoader, scale: SyntheticScale) -> Dict[str, Callable[[], object]]:
+    fmt = get_format_engine(loader)
+    requests = generate_draft_requests(scale, loader.champion_index(), fmt)
+    payloads = itertools.cycle(requests)
+
+    role_solver = RoleSolver(_load_champion_role_index(loader))
+    pick_sets = [
+        _pick_id_sequence(getattr(request.draftState.picks, side))
+        for request in requests
+        for side in ("blue", "red")
+    ]
+    uncached_picks = itertools.cycle(pick_sets)
+    distribution_picks = itertools.cycle([frozenset(picks) for picks in pick_sets])
+
+    turns = [(mode, idx) for mode in sorted(fmt.format_config) for idx in range(fmt.total_actions(mode) + 1)]
+
+    def role_profiles_cold():
+        for path in ROLE_FILES:
+            loader.snapshot.invalidate(path)
+        return loader.role_profiles()
+
+    def get_turns():
+        for mode, idx in turns:
+            fmt.get_turn(mode, idx)
+
+    match_export = loader.repo.base_dir / "matches.jsonl.gz"
+    match_stats = loader.repo.base_dir / "match_stats.npz"
+
+    shared_snapshot = loader.repo.base_dir / "compiled_snapshot.bin"
+
+    def shared_snapshot_attach():
+        if not shared_snapshot.exists():
+            write_shared_snapshot(loader, shared_snapshot, source_digest(loader), 1)
+        return SharedSnapshot(shared_snapshot)
+
+    def ingest():
+        # The export is written on first use, so other benchmarks do not pay for it.
+        if not match_export.exists():
+            generate_match_export(match_export, scale)
+        match_stats.unlink(missing_ok=True)
+        return ingest_matches([match_export], match_stats)
+
+    return {
+        "build_recommendations": lambda: build_recommendations(next(payloads), loader),
+        "build_recommendations.top10": lambda: build_recommendations(next(payloads), loader, limit=10),
+        # Every stored profile of each role; scale with --profiles-per-role.
+        "compare_profiles": lambda: compare_profiles(next(payloads), loader),
+        "role_assignment.locked_roles": lambda: role_solver._locked_roles(next(uncached_picks)),
+        "role_assignment.distribution": lambda: role_solver._distribution(next(distribution_picks)),
+        "DataLoader.role_profiles": loader.role_profiles,
+        "DataLoader.role_profiles.cold": role_profiles_cold,
+        # One call covers every action index of every format.
+        "FormatEngine.get_turn": get_turns,
+        # Mapping a generation another worker already compiled.
+        "SharedSnapshot.attach": shared_snapshot_attach,
+        # All of a fresh `--matches` export, gzip JSONL, into new statistics.
+        "ingest_matches": ingest,
+    }
+
+
+def run(scale: SyntheticScale, data_dir: Path, rounds: int, min_time: float, only: Optional[List[str]]) -> dict:
+    generate_dataset(data_dir, scale)
+    loader = DataLoader(JsonRepository(str(data_dir)))
+    results = {}
+    for name, func in build_benchmarks(loader, scale).items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results[name] = measure(func, rounds=rounds, min_time=min_time)
+        print(f"{name:32} median {_format_seconds(results[name]['median']):>10}"
+              f"  min {_format_seconds(results[name]['min']):>10}"
+              f"  ±{results[name]['rel_stdev'] * 100:.1f}%", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": asdict(scale),
+            "rounds": rounds,
+            "min_time": min_time,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    lines = [f"{'benchmark':32} {'baseline':>10} {'current':>10} {'ratio':>7}"]
+    if current["meta"]["scale"] != baseline["meta"].get("scale"):
+        lines.append("warning: the baseline was measured at a different scale")
+    for name, stats in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            lines.append(f"{name:32} {'-':>10} {_format_seconds(stats['median']):>10}")
+            continue
+        ratio = stats["median"] / before["median"] if before["median"] else float("inf")
+        lines.append(
+            f"{name:32} {_format_seconds(before['median']):>10} {_format_seconds(stats['median']):>10} {ratio:>6.2f}x"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    defaults = SyntheticScale()
+    for field in fields(SyntheticScale):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=int, default=getattr(defaults, field.name))
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per round")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--data-dir", type=Path, help="keep the generated dataset here instead of a temp dir")
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="previous results file to compare medians against")
+    args = parser.parse_args(argv)
+
+    scale = SyntheticScale(**{field.name: getattr(args, field.name) for field in fields(SyntheticScale)})
+    if args.data_dir is not None:
+        results = run(scale, args.data_dir, args.rounds, args.min_time, args.only)
+    else:
+        with tempfile.TemporaryDirectory(prefix="draftapi-bench-") as tmp:
+            results = run(scale, Path(tmp), args.rounds, args.min_time, args.only)
+
+    output = args.output or RESULTS_DIR / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"results written to {output}", file=sys.stderr)
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        print("\n".join(compare(results, baseline)))
+    return 0
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, factor in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= factor:
+            return f"{seconds / factor:.3f}{unit}"
+    return f"{seconds / 1e-9:.1f}ns"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+"""HTTP load test with a mixed draft workload, reporting latency percentiles per route.
+
+    python -m benchmarks.load --concurrency 16 --duration 30
+    python -m benchmarks.load --mix draft=4,recommend=4,browse=2,profile_write=0 --record traffic.jsonl
+    python -m benchmarks.load --replay traffic.jsonl --speed 2
+    python -m benchmarks.load --url http://127.0.0.1:8000 --duration 60
+
+With --url the default mix leaves out profile_write, which rewrites the server's
+profiles; name it in --mix to opt in.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TextIO
+
+import httpx
+
+from app.core.config import settings
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+ROLE_ORDER = ["top", "jungle", "mid", "adc", "support"]
+TEAM_SIZE = 5
+DEFAULT_MIX = "draft=4,recommend=4,browse=2,profile_write=1"
+# A running server keeps its data: profile writes are opt-in there.
+REMOTE_MIX = "draft=4,recommend=4,browse=2"
+
+# Segments replaced by `{id}` when a replayed line carries no route label.
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$")
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+
+    @property
+    def errors(self) -> int:
+        # Transport failures are counted under status 0.
+        return sum(count for status, count in self.statuses.items() if status == 0 or status >= 500)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "requests": len(ordered),
+            "throughput": len(ordered) / elapsed if elapsed else 0.0,
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+            "p99": _percentile(ordered, 99),
+            "max": ordered[-1] if ordered else 0.0,
+            "error_rate": self.errors / len(ordered) if ordered else 0.0,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+        }
+
+
+class LoadClient:
+    """Wraps an httpx client: times each request per route label and optionally records it for replay."""
+
+    def __init__(self, client: httpx.AsyncClient, record: Optional[TextIO] = None):
+        self.client = client
+        self.record = record
+        self.routes: Dict[str, RouteStats] = {}
+        self.started = time.perf_counter()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        route: str,
+        body: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[httpx.Response]:
+        sent = time.perf_counter()
+        response: Optional[httpx.Response] = None
+        try:
+            response = await self.client.request(method, path, json=body, params=params)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        latency = time.perf_counter() - sent
+        stats = self.routes.setdefault(f"{method} {route}", RouteStats())
+        stats.latencies.append(latency)
+        stats.statuses[status] += 1
+        if self.record is not None:
+            url = httpx.URL(path, params=params)
+            line = {"ts": round(sent - self.started, 6), "method": method, "path": str(url), "route": route}
+            if body is not None:
+                line["body"] = body
+            if route == "/drafts" and method == "POST" and response is not None and response.is_success:
+                line["draftId"] = response.json()["draftId"]
+            self.record.write(json.dumps(line) + "\n")
+        return response
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        total = RouteStats()
+        for stats in self.routes.values():
+            total.latencies.extend(stats.latencies)
+            total.statuses.update(stats.statuses)
+        return {
+            "elapsed": elapsed,
+            "total": total.summary(elapsed),
+            "routes": {route: stats.summary(elapsed) for route, stats in sorted(self.routes.items())},
+        }
+
+
+@dataclass
+class Catalog:
+    """What the scenarios need to know about the served data, read through the API once."""
+
+    champions: List[dict]
+    formats: Dict[str, dict]
+
+    @classmethod
+    async def load(cls, client: httpx.AsyncClient) -> "Catalog":
+        champions = (await client.get("/champions")).raise_for_status().json()
+        formats = (await client.get("/configs/draft-formats")).raise_for_status().json()
+        return cls(champions=champions, formats=formats)
+
+    def turns(self, mode: str) -> List[tuple]:
+        return [
+            (phase["type"], phase["side"])
+            for phase in self.formats[mode]["phases"]
+            for _ in range(phase["count"])
+        ]
+
+
+Scenario = Callable[[LoadClient, Catalog, random.Random], Awaitable[None]]
+
+
+async def draft_scenario(client: LoadClient, catalog: Catalog, rng: random.Random) -> None:
+    """Create a draft and play it to the end, asking for recommendations before each pick."""
+    response = await client.request("POST", "/drafts", "/drafts", body={"mode": rng.choice(sorted(catalog.formats))})
+    if response is None or not response.is_success:
+        return
+    draft = response.json()
+    draft_id = draft["draftId"]
+    taken = set()
+    while draft["status"] != "full":
+        turn = draft["turn"]
+        choice = None
+        if turn["type"] == "pick":
+            response = await client.request(
+                "GET",
+                f"/drafts/{draft_id}/recommendations",
+                "/drafts/{draft_id}/recommendations",
+                params={"side": turn["sideToAct"], "limit": 5},
+            )
+            if response is not None and response.is_success:
+                candidates = [item["championId"] for item in response.json()["recommendations"]]
+                choice = next((champ_id for champ_id in candidates if champ_id not in taken), None)
+        if choice is None:
+            choice = rng.choice([champion["id"] for champion in catalog.champions if champion["id"] not in taken])
+        response = await client.request(
+            "POST",
+            f"/drafts/{draft_id}/action",
+            "/drafts/{draft_id}/action",
+            body={
+                "type": turn["type"],
+                "side": turn["sideToAct"],
+                "championId": choice,
+                "expectedVersion": draft["version"],
+            },
+        )
+        if response is None or not response.is_success:
+            return
+        taken.add(choice)
+        draft = response.json()
+
+
+async def recommend_scenario(client: LoadClient, catalog: Catalog, rng: random.Random) -> None:
+    """One stateless POST /draft/recommendations for a random point of a random draft."""
+    mode = rng.choice(sorted(catalog.formats))
+    turns = catalog.turns(mode)
+    done = rng.randrange(len(turns))
+    champions = rng.sample(catalog.champions, done)
+    slots: Dict[str, Dict[str, list]] = {"picks": {"blue": [], "red": []}, "bans": {"blue": [], "red": []}}
+    for (action_type, side), champion in zip(turns, champions):
+        slots[f"{action_type}s"][side].append(
+            {"id": champion["id"], "name": champion["name"], "slug": champion["slug"]}
+        )
+    for side in ("blue", "red"):
+        slots["picks"][side] += [None] * (TEAM_SIZE - len(slots["picks"][side]))
+    action_type, side = turns[done]
+    filled = [slot for slot in slots[f"{action_type}s"][side] if slot is not None]
+    body = {
+        "format": mode,
+        "ourSide": rng.choice(("blue", "red")),
+        "draftState": slots,
+        "target": {"type": action_type, "side": side, "idx": len(filled)},
+    }
+    await client.request("POST", "/draft/recommendations", "/draft/recommendations", body=body, params={"limit": 10})
+
+
+async def browse_scenario(client: LoadClient, catalog: Catalog, rng: random.Random) -> None:
+    """Static reads a draft UI makes on load."""
+    path = rng.choice(["/champions", "/profiles/catalog", "/configs/draft-formats", f"/profiles/{rng.choice(ROLE_ORDER)}"])
+    route = "/profiles/{role}" if path.startswith("/profiles/") and path != "/profiles/catalog" else path
+    await client.request("GET", path, route)
+
+
+async def profile_write_scenario(client: LoadClient, catalog: Catalog, rng: random.Random) -> None:
+    """Read a role profile and rewrite one entry with a new meta rating."""
+    role = rng.choice(ROLE_ORDER)
+    response = await client.request("GET", f"/profiles/{role}", "/profiles/{role}")
+    if response is None or not response.is_success or not response.json()["champions"]:
+        return
+    profile = response.json()
+    entry = dict(rng.choice(profile["champions"]))
+    entry["meta"] = rng.randint(0, 10)
+    await client.request(
+        "PUT",
+        f"/profiles/entries/{entry['id']}",
+        "/profiles/entries/{champion_id}",
+        body={"profileName": profile["profile"], "role": role, "entry": entry},
+    )
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "draft": draft_scenario,
+    "recommend": recommend_scenario,
+    "browse": browse_scenario,
+    "profile_write": profile_write_scenario,
+}
+
+
+async def run_mix(
+    client: LoadClient,
+    mix: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> None:
+    """`concurrency` closed-loop users, each running weighted random scenarios until `duration` runs out."""
+    catalog = await Catalog.load(client.client)
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    deadline = time.perf_counter() + duration
+    client.started = time.perf_counter()
+
+    async def user(index: int) -> None:
+        rng = random.Random(seed * 1_000_003 + index)
+        while time.perf_counter() < deadline:
+            await SCENARIOS[rng.choices(names, weights)[0]](client, catalog, rng)
+
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+
+
+async def replay(client: LoadClient, lines: List[dict], concurrency: int, speed: float) -> None:
+    """Re-send a recorded log at its original pace times `speed` (0 = as fast as possible).
+
+    Lines that touch the same draft run one after another, and draft ids from
+    the log are mapped to the ids of the drafts created during the replay.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    draft_ids: Dict[str, str] = {}
+    previous: Dict[str, asyncio.Future] = {}
+    client.started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+
+    async def send(line: dict, after: Optional[asyncio.Future], done: Optional[asyncio.Future]) -> None:
+        try:
+            if speed > 0:
+                await asyncio.sleep(max(0.0, client.started + line["ts"] / speed - time.perf_counter()))
+            if after is not None:
+                await after
+            path = line["path"]
+            recorded = _draft_segment(path)
+            if recorded in draft_ids:
+                path = path.replace(f"/drafts/{recorded}", f"/drafts/{draft_ids[recorded]}", 1)
+            async with semaphore:
+                response = await client.request(line["method"], path, line.get("route") or _route_label(path), line.get("body"))
+            if line.get("draftId") and response is not None and response.is_success:
+                draft_ids[line["draftId"]] = response.json()["draftId"]
+        finally:
+            if done is not None:
+                done.set_result(None)
+
+    tasks = []
+    for line in sorted(lines, key=lambda item: item["ts"]):
+        session = line.get("draftId") or _draft_segment(line["path"])
+        after = previous.get(session) if session else None
+        done = loop.create_future() if session else None
+        if session:
+            previous[session] = done
+        tasks.append(asyncio.ensure_future(send(line, after, done)))
+    await asyncio.gather(*tasks)
+
+
+def prepare_in_process(work_dir: Path) -> httpx.AsyncClient:
+    """Serve the app in-process on a private copy of the data, history and draft store."""
+    shutil.copytree(DATA_DIR, work_dir / "data")
+    settings.data_dir = str(work_dir / "data")
+    settings.history_dir = str(work_dir / "history")
+    settings.draft_store = "memory"
+    from app.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest")
+
+
+async def run(args: argparse.Namespace, work_dir: Path) -> Dict[str, Any]:
+    if args.url:
+        http = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        http = prepare_in_process(work_dir)
+    record = args.record.open("w", encoding="utf-8") if args.record else None
+    try:
+        async with http:
+            client = LoadClient(http, record=record)
+            if args.replay:
+                lines = [json.loads(raw) for raw in args.replay.read_text(encoding="utf-8").splitlines() if raw.strip()]
+                await replay(client, lines, args.concurrency, args.speed)
+            else:
+                mix = args.mix or (REMOTE_MIX if args.url else DEFAULT_MIX)
+                await run_mix(client, parse_mix(mix), args.concurrency, args.duration, args.seed)
+            return client.report()
+    finally:
+        if record is not None:
+            record.close()
+
+
+def parse_mix(raw: str) -> Dict[str, int]:
+    mix = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}; expected one of {', '.join(SCENARIOS)}")
+        mix[name] = int(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("The mix needs at least one scenario with a positive weight")
+    return mix
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"{'route':48} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}"
+    ]
+    for route, stats in [*report["routes"].items(), ("total", report["total"])]:
+        lines.append(
+            f"{route:48} {stats['requests']:>7} {stats['throughput']:>8.1f}"
+            f" {stats['p50'] * 1000:>8.2f} {stats['p95'] * 1000:>8.2f} {stats['p99'] * 1000:>8.2f}"
+            f" {stats['max'] * 1000:>8.2f} {stats['error_rate'] * 100:>6.2f}%"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="target a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=8, help="simulated users (replay: in-flight requests)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of generated load")
+    parser.add_argument("--mix", help=f"scenario weights (default: {DEFAULT_MIX}; with --url: {REMOTE_MIX})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout with --url")
+    parser.add_argument("--record", type=Path, help="write every request to this JSONL log")
+    parser.add_argument("--replay", type=Path, help="replay a JSONL request log instead of the generated mix")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay pace multiplier (0: as fast as possible)")
+    parser.add_argument("--log-level", default="WARNING", help="app log level for the in-process app")
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    settings.log_level = args.log_level
+    with tempfile.TemporaryDirectory(prefix="draftapi-load-") as tmp:
+        report = asyncio.run(run(args, Path(tmp)))
+    print("\n".join(format_report(report)))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+def _percentile(ordered: List[float], percent: float) -> float:
+    # Nearest-rank percentile.
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _route_label(path: str) -> str:
+    segments = path.split("?", 1)[0].split("/")
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in segments)
+
+
+def _draft_segment(path: str) -> Optional[str]:
+    segments = path.split("?", 1)[0].split("/")
+    if len(segments) > 2 and segments[1] == "drafts":
+        return segments[2]
+    return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
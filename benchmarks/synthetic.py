@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import gzip
+import json
+import random
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from app.models.schemas.recommendation_schemas import DraftRecommendationRequest
+from app.services.draft_engine.draft_state import apply_draft_action, new_draft_state, recommendation_request
+from app.services.draft_engine.format_engine import FormatEngine
+from app.services.storage.champion_index import ChampionIndex
+from app.services.storage.data_loader import ROLE_ORDER
+
+CONFIG_FILES = ("draft_formats.json", "scoring_weights.json", "color_rules.json")
+DEFAULT_CONFIGS_DIR = Path(__file__).resolve().parent.parent / "data" / "configs"
+
+
+@dataclass(frozen=True)
+class SyntheticScale:
+    champions: int = 170
+    max_roles_per_champion: int = 3
+    pool_size: int = 40
+    profiles_per_role: int = 1
+    synergy: int = 3
+    counters: int = 4
+    strong_into: int = 3
+    drafts: int = 200
+    matches: int = 20_000
+    seed: int = 0
+
+
+def generate_dataset(target_dir: Path, scale: SyntheticScale, configs_dir: Path = DEFAULT_CONFIGS_DIR) -> None:
+    """Write champions.json, one profile catalog per role and the repo's configs under `target_dir`."""
+    rng = random.Random(scale.seed)
+    (target_dir / "configs").mkdir(parents=True, exist_ok=True)
+    (target_dir / "roles").mkdir(parents=True, exist_ok=True)
+    for name in CONFIG_FILES:
+        shutil.copyfile(configs_dir / name, target_dir / "configs" / name)
+    color_rules = json.loads((configs_dir / "color_rules.json").read_text(encoding="utf-8"))
+    colors = sorted(color for color in color_rules if color != "defaults")
+
+    champions = generate_champions(rng, scale)
+    _write_json(target_dir / "champions.json", champions)
+    ids = [champion["id"] for champion in champions]
+    for role in ROLE_ORDER:
+        # Role pools favour champions listing the role, as real profiles do.
+        in_role = [champion["id"] for champion in champions if role in champion["roles"]]
+        profiles = []
+        for idx in range(scale.profiles_per_role):
+            pool = _sample(rng, in_role, scale.pool_size)
+            if len(pool) < scale.pool_size:
+                pool += _sample(rng, [i for i in ids if i not in set(pool)], scale.pool_size - len(pool))
+            profiles.append({
+                "profile": f"synthetic-{idx}",
+                "role": role,
+                "champions": [_profile_entry(rng, champ_id, ids, colors, scale) for champ_id in pool],
+            })
+        _write_json(
+            target_dir / "roles" / f"{role}.json",
+            {"role": role, "activeProfile": profiles[0]["profile"], "profiles": profiles},
+        )
+
+
+def generate_champions(rng: random.Random, scale: SyntheticScale) -> List[dict]:
+    champions = []
+    for champ_id in range(1, scale.champions + 1):
+        role_count = rng.randint(1, max(1, min(scale.max_roles_per_champion, len(ROLE_ORDER))))
+        roles = sorted(rng.sample(ROLE_ORDER, role_count), key=ROLE_ORDER.index)
+        champions.append({
+            "id": champ_id,
+            "name": f"Champion {champ_id}",
+            "slug": f"champion-{champ_id}",
+            "roles": roles,
+            "img": "",
+        })
+    return champions
+
+
+def generate_draft_requests(
+    scale: SyntheticScale,
+    champion_index: ChampionIndex,
+    fmt: FormatEngine,
+) -> List[DraftRecommendationRequest]:
+    """Recommendation payloads taken at random points of random drafts, for every format and both sides."""
+    rng = random.Random(scale.seed + 1)
+    ids = [champion["id"] for champion in champion_index.champions]
+    modes = sorted(fmt.format_config)
+    requests = []
+    for draft in range(scale.drafts):
+        mode = modes[draft % len(modes)]
+        state = new_draft_state(f"synthetic-{draft}", mode)
+        stop = rng.randrange(fmt.total_actions(mode))
+        available = rng.sample(ids, len(ids))
+        for _action in range(stop):
+            turn = fmt.get_turn(mode, state["actionsDone"])
+            apply_draft_action(state, turn.action_type, turn.side_to_act, available.pop(), fmt)
+        requests.append(recommendation_request(state, rng.choice(("blue", "red")), champion_index, fmt))
+    return requests
+
+
+def generate_match_export(path: Path, scale: SyntheticScale, ban_count: int = 5) -> None:
+    """Write `scale.matches` finished matches as gzip JSONL, picks in lane order.
+
+    The winner leans towards the stronger lineup.
+    """
+    rng = random.Random(scale.seed + 2)
+    ids = list(range(1, scale.champions + 1))
+    strength = {champ_id: rng.gauss(0.0, 1.0) for champ_id in ids}
+    roles = [str(role) for role in ROLE_ORDER]
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        for match in range(scale.matches):
+            drawn = rng.sample(ids, 10 + 2 * ban_count)
+            blue, red = drawn[:5], drawn[5:10]
+            edge = sum(strength[champ_id] for champ_id in blue) - sum(strength[champ_id] for champ_id in red)
+            record = {
+                "id": f"synthetic-{match}",
+                "picks": {"blue": blue, "red": red},
+                "bans": {"blue": drawn[10:10 + ban_count], "red": drawn[10 + ban_count:]},
+                "roles": {"blue": roles, "red": roles},
+                "winner": "blue" if edge + rng.gauss(0.0, 2.0) > 0 else "red",
+            }
+            handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def _profile_entry(rng: random.Random, champ_id: int, ids: List[int], colors: List[str], scale: SyntheticScale) -> Dict:
+    return {
+        "id": champ_id,
+        "howGoodIAm": rng.randint(1, 10),
+        "colors": _sample(rng, colors, rng.randint(1, 2)),
+        "synergy": _sample(rng, ids, scale.synergy),
+        "counters": _sample(rng, ids, scale.counters),
+        "strongInto": _sample(rng, ids, scale.strong_into),
+        "meta": rng.randint(1, 10),
+    }
+
+
+def _sample(rng: random.Random, population: List, count: int) -> List:
+    return rng.sample(population, min(count, len(population)))
+
+
+def _write_json(path: Path, payload) -> None:
+    path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import math
+import statistics
+import timeit
+from typing import Callable, Dict
+
+
+def measure(func: Callable[[], object], rounds: int = 7, min_time: float = 0.2) -> Dict[str, float]:
+    """Per-call timings of `func` in seconds.
+
+    The loop count is calibrated so one round lasts at least `min_time`;
+    `rounds` rounds then run with the garbage collector disabled (`timeit`).
+    Compare runs on `median`; `min` is the least noisy lower bound.
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = math.ceil(number * min_time / max(elapsed, 1e-9))
+    per_call = [total / number for total in timer.repeat(repeat=rounds, number=number)]
+    median = statistics.median(per_call)
+    stdev = statistics.stdev(per_call) if len(per_call) > 1 else 0.0
+    return {
+        "rounds": rounds,
+        "number": number,
+        "min": min(per_call),
+        "median": median,
+        "mean": statistics.fmean(per_call),
+        "max": max(per_call),
+        "stdev": stdev,
+        "rel_stdev": stdev / median if median else 0.0,
+    }